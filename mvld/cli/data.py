@@ -0,0 +1,146 @@
+import typer
+from rich.console import Console
+from pathlib import Path
+
+from mvld.data.shards import SHARD_FORMATS
+
+app = typer.Typer()
+console = Console()
+
+@app.command("generate-bulk")
+def generate_bulk(
+    num: int = typer.Option(1000, "--num", "-n", help="Number of samples to generate"),
+    output: Path = typer.Option("data/synthetic_bulk", "--output", "-o", help="Directory for the shards and manifest.json"),
+    seed: int = typer.Option(0, "--seed", help="Seed of the run; same seed and options give identical shards"),
+    shard_size: int = typer.Option(100_000, "--shard-size", help="Maximum samples per shard"),
+    workers: int = typer.Option(0, "--workers", "-w", help="Generator processes (0 = all CPUs)"),
+    fmt: str = typer.Option("jsonl", "--format", "-f", help=f"Shard format ({', '.join(SHARD_FORMATS)})"),
+):
+    """
+    Generate synthetic (instruction, code) samples into sharded files.
+    """
+    from mvld.data.dataset import MVLDDataset
+
+    try:
+        manifest = MVLDDataset().generate_bulk_sharded(num, str(output), seed=seed, shard_size=shard_size, workers=workers or None, fmt=fmt)
+    except ValueError as e:
+        console.print(f"[bold red]{e}[/bold red]")
+        raise typer.Exit(code=1)
+
+    total_bytes = sum(e["bytes"] for e in manifest["shards"].values())
+    console.print(
+        f"[bold blue]Generated {manifest['num_rows']} samples[/bold blue] in {len(manifest['shards'])} "
+        f"{fmt} shards ({total_bytes / 1024 ** 2:.1f} MiB) under {output}"
+    )
+
+
+@app.command()
+def dedup(
+    input_dir: Path = typer.Argument(..., help="Shard directory (with manifest.json) to deduplicate"),
+    output: Path = typer.Option(..., "--output", "-o", help="Directory for the deduplicated shards"),
+    index_dir: Path = typer.Option("data/dedup_index", "--index", help="Persistent dedup index shared across runs"),
+    threshold: float = typer.Option(0.95, "--threshold", help="MinHash similarity at or above which samples are near duplicates"),
+):
+    """
+    Drop exact and near-duplicate samples; shards already indexed are skipped.
+    """
+    from mvld.data.dedup import DedupIndex, dedup_shards
+
+    try:
+        index = DedupIndex(str(index_dir), threshold=threshold)
+        manifest = dedup_shards(str(input_dir), str(output), index)
+    except (ValueError, FileNotFoundError) as e:
+        console.print(f"[bold red]{e}[/bold red]")
+        raise typer.Exit(code=1)
+
+    stats = index.stats()
+    console.print(
+        f"[bold blue]Kept {stats['unique']}/{stats['seen']} new samples[/bold blue] "
+        f"({stats['exact_duplicates']} exact, {stats['near_duplicates']} near duplicates, "
+        f"duplicate rate {stats['duplicate_rate']:.1%}); {manifest['num_rows']} samples in {output}, "
+        f"{stats['indexed']} in the index."
+    )
+
+
+@app.command()
+def contrastive(
+    input_dir: Path = typer.Argument(..., help="Shard directory (with manifest.json) of instruction/code samples"),
+    output: Path = typer.Option(..., "--output", "-o", help="Where to save the triplet dataset (save_to_disk format)"),
+    negatives: int = typer.Option(4, "--negatives", "-k", help="Negatives per sample, from one parse each"),
+    seed: int = typer.Option(0, "--seed", help="Mutation seed"),
+    workers: int = typer.Option(0, "--workers", "-w", help="Worker processes (0 = all CPUs)"),
+    verify: bool = typer.Option(False, "--verify", help="Render chosen and rejected and keep only pairs that look different"),
+    render_workers: int = typer.Option(4, "--render-workers", help="Persistent manim workers for --verify (0 = one subprocess per render)"),
+    geometry_only: bool = typer.Option(False, "--geometry-only", help="With --verify, compare scene graphs only (no frames)"),
+    media_dir: Path = typer.Option("media/pairs", "--media-dir", help="Render output directory for --verify"),
+    verdict_cache: Path = typer.Option("results/cache/pair_verdicts.sqlite", "--verdict-cache", help="Cache of pair verdicts reused across runs"),
+):
+    """
+    Build (prompt, chosen, rejected) DPO triplets with AST mutations.
+    """
+    import os
+    from collections import Counter
+    from mvld.data.contrastive import ContrastiveGenerator
+    from mvld.data.shards import load_shards
+
+    try:
+        samples = load_shards(str(input_dir))
+    except FileNotFoundError as e:
+        console.print(f"[bold red]{e}[/bold red]")
+        raise typer.Exit(code=1)
+
+    generator = ContrastiveGenerator(seed=seed, negatives_per_sample=negatives)
+    triplets = generator.build_dataset(samples, num_proc=workers or os.cpu_count())
+
+    if verify:
+        from mvld.data.pair_verifier import PairVerifier
+        from mvld.eval.verdict_cache import VerdictCache
+        from mvld.sandbox.executor import ManimSandbox
+
+        sandbox = ManimSandbox(output_dir=str(media_dir), workers=render_workers)
+        try:
+            verifier = PairVerifier(sandbox, cache=VerdictCache(str(verdict_cache)), geometry_only=geometry_only)
+            triplets = verifier.filter_dataset(triplets)
+        finally:
+            sandbox.close()
+        stats = verifier.stats()
+        console.print(
+            f"Verified {stats['verified']} pairs: kept {stats['kept']} ({stats['keep_rate']:.1%}); "
+            + ", ".join(f"{reason} {count}" for reason, count in sorted(stats["reasons"].items()))
+            + f". {stats['renders']} renders, {stats['cached_verdicts']} cached verdicts."
+        )
+
+    triplets.save_to_disk(str(output))
+
+    by_operator = Counter(triplets["operator"])
+    console.print(f"[bold blue]Built {len(triplets)} triplets[/bold blue] from {len(samples)} samples in {output}")
+    console.print(", ".join(f"{op} {count}" for op, count in by_operator.most_common()))
+
+
+@app.command()
+def pretraining(
+    input_dir: Path = typer.Argument(..., help="Directory of TikZ/SVG files, searched recursively"),
+    output: Path = typer.Option(..., "--output", "-o", help="Directory for the Arrow shards and manifest.json"),
+    file_type: str = typer.Option("tikz", "--type", "-t", help="File type to ingest (tikz, svg)"),
+    workers: int = typer.Option(0, "--workers", "-w", help="Parser processes (0 = all CPUs)"),
+    shard_size: int = typer.Option(10_000, "--shard-size", help="Maximum files per shard"),
+    recursive: bool = typer.Option(True, "--recursive/--no-recursive", help="Also ingest files in subdirectories"),
+):
+    """
+    Parse a TikZ/SVG corpus into layout pretraining shards; re-running resumes.
+    """
+    from mvld.data.pretraining import LayoutPretrainingScript
+
+    try:
+        manifest = LayoutPretrainingScript().process_directory_sharded(
+            str(input_dir), str(output), file_type, workers=workers or None, recursive=recursive, shard_size=shard_size
+        )
+    except ValueError as e:
+        console.print(f"[bold red]{e}[/bold red]")
+        raise typer.Exit(code=1)
+
+    total_bytes = sum(e["bytes"] for e in manifest["shards"].values())
+    console.print(
+        f"[bold blue]Ingested {manifest['num_rows']} {file_type} files[/bold blue] into {len(manifest['shards'])} shards "
+        f"({total_bytes / 1024 ** 2:.1f} MiB) under {output}; {manifest['num_errors']} files failed to parse."
+    )
@@ -1,6 +1,6 @@
 import typer
 from rich.console import Console
-from mvld.cli import render, evaluate, train
+from mvld.cli import render, evaluate, train, results, data
 
 app = typer.Typer(
     name="mvld",
@@ -10,6 +10,8 @@ app = typer.Typer(
 
 app.add_typer(render.app, name="render", help="Render Manim code")
 app.add_typer(evaluate.app, name="evaluate", help="Evaluate rendered output")
+app.add_typer(results.app, name="results", help="Query stored pipeline results")
+app.add_typer(data.app, name="data", help="Generate training data")
 # app.add_typer(train.app, name="train", help="Train post-training models")
 
 console = Console()
@@ -1,6 +1,9 @@
 import typer
 from rich.console import Console
 from pathlib import Path
+from typing import List
+
+from mvld.sandbox.profiles import DEFAULT_PROFILE, RENDER_PROFILES
 
 app = typer.Typer()
 console = Console()
@@ -10,26 +13,89 @@ def file(
     script: Path = typer.Option(..., "--script", "-s", help="Path to Manim script"),
     scene: str = typer.Option(None, "--scene", "-c", help="Scene class name"),
     output_dir: Path = typer.Option("media", "--output-dir", "-o", help="Output directory"),
+    workers: int = typer.Option(0, "--workers", "-w", help="Warm render workers (0 = plain manim subprocess)"),
+    cache_dir: Path = typer.Option(None, "--cache-dir", help="Reuse renders from this render cache"),
+    profile: str = typer.Option(DEFAULT_PROFILE, "--profile", "-p", help=f"Render profile ({', '.join(RENDER_PROFILES)})"),
+    timeout: float = typer.Option(120.0, "--timeout", help="Wall-clock budget per render in seconds"),
+    cpu_limit: int = typer.Option(120, "--cpu-limit", help="CPU-time budget per render in seconds"),
+    memory_limit: int = typer.Option(4096, "--memory-limit", help="Address-space budget per render in MiB"),
+    geometry_only: bool = typer.Option(False, "--geometry-only", help="Only extract the scene graph; no frames are rendered"),
 ):
     """
     Render a Manim script and capture metadata.
     """
+    from mvld.sandbox.budget import RenderBudget
+    from mvld.sandbox.cache import RenderCache
     from mvld.sandbox.executor import ManimSandbox
     import json
     
     console.print(f"[bold green]Rendering {script}...[/bold green]")
-    sandbox = ManimSandbox(output_dir=str(output_dir))
-    result = sandbox.run_script(script, scene_name=scene)
+    cache = RenderCache(str(cache_dir)) if cache_dir else None
+    budget = RenderBudget(timeout_s=timeout, cpu_seconds=cpu_limit, memory_bytes=memory_limit * 1024 ** 2)
+    sandbox = ManimSandbox(output_dir=str(output_dir), workers=workers, cache=cache, profile=profile, budget=budget)
+    result = sandbox.run_script(script, scene_name=scene, geometry_only=geometry_only)
     
     if result["success"]:
-        console.print(f"[bold blue]Success![/bold blue] Image saved to: {result['image_path']}")
+        if geometry_only:
+            console.print(f"[bold blue]Success![/bold blue] Extracted {len(result['scene_graph'] or [])} mobjects.")
+        else:
+            console.print(f"[bold blue]Success![/bold blue] Image saved to: {result['image_path']}")
         # Save structured output
         meta_path = Path(output_dir) / f"{script.stem}_meta.json"
         with open(meta_path, "w") as f:
             json.dump(result, f, indent=2)
         console.print(f"Metadata saved to: {meta_path}")
     else:
-        console.print("[bold red]Render Failed![/bold red]")
+        console.print(f"[bold red]Render Failed![/bold red] ({result['status']})")
         console.print(result["error"])
         raise typer.Exit(code=1)
 
+
+@app.command()
+def batch(
+    scripts: List[Path] = typer.Argument(..., help="Manim scripts to render"),
+    scene: str = typer.Option(None, "--scene", "-c", help="Scene class name"),
+    output_dir: Path = typer.Option("media", "--output-dir", "-o", help="Output directory"),
+    workers: int = typer.Option(4, "--workers", "-w", help="Number of warm render workers"),
+    cache_dir: Path = typer.Option(None, "--cache-dir", help="Reuse renders from this render cache"),
+    profile: str = typer.Option(DEFAULT_PROFILE, "--profile", "-p", help=f"Render profile ({', '.join(RENDER_PROFILES)})"),
+    timeout: float = typer.Option(120.0, "--timeout", help="Wall-clock budget per render in seconds"),
+    cpu_limit: int = typer.Option(120, "--cpu-limit", help="CPU-time budget per render in seconds"),
+    memory_limit: int = typer.Option(4096, "--memory-limit", help="Address-space budget per render in MiB"),
+):
+    """
+    Render many Manim scripts on a pool of warm render workers.
+    """
+    from mvld.sandbox.budget import RenderBudget
+    from mvld.sandbox.cache import RenderCache
+    from mvld.sandbox.executor import ManimSandbox
+    import json
+
+    console.print(f"[bold green]Rendering {len(scripts)} scripts on {workers} workers...[/bold green]")
+    cache = RenderCache(str(cache_dir)) if cache_dir else None
+    budget = RenderBudget(timeout_s=timeout, cpu_seconds=cpu_limit, memory_bytes=memory_limit * 1024 ** 2)
+    sandbox = ManimSandbox(output_dir=str(output_dir), workers=max(workers, 1), cache=cache, profile=profile, budget=budget)
+    futures = [sandbox.submit_script(script, scene) for script in scripts]
+
+    failures = 0
+    for script, future in zip(scripts, futures):
+        result = future.result()
+        meta_path = Path(output_dir) / f"{script.stem}_meta.json"
+        with open(meta_path, "w") as f:
+            json.dump(result, f, indent=2)
+
+        if result["success"]:
+            console.print(f"[bold blue]{script}[/bold blue] -> {result['image_path']}")
+        else:
+            failures += 1
+            console.print(f"[bold red]{script} failed ({result['status']})[/bold red]")
+    sandbox.close()
+
+    console.print(f"Rendered {len(scripts) - failures}/{len(scripts)} scripts. Metadata saved to {output_dir}")
+    for status, stats in sandbox.budget_stats().items():
+        console.print(f"  {status}: {stats['count']} renders, mean {stats['mean_s']:.2f}s, max {stats['max_s']:.2f}s")
+    if cache is not None:
+        stats = cache.stats()
+        console.print(f"Render cache hit rate: {stats['hit_rate']:.1%} ({stats['hits']} hits, {stats['misses']} misses)")
+    if failures:
+        raise typer.Exit(code=1)
@@ -1,40 +1,69 @@
 import json
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 import matplotlib.pyplot as plt
 
+from mvld.pipeline.aggregate import ResultsAggregator
+from mvld.pipeline.results_store import ResultsStore
+
+# Mergeable partial aggregate saved next to every report
+AGGREGATE_FILE = "aggregate.json"
+
 class ReportGenerator:
     """
     Generates summary reports and plots for research presentations.
     """
-    def generate_summary(self, results_path: str = "results/rft/rft_results.json", output_dir: str = "results/reports"):
+    def generate_summary(self, store_dir: str = "results/store", runs: Optional[List[str]] = None, output_dir: str = "results/reports") -> Dict[str, Any]:
+        """
+        Aggregates the results store in one streaming pass over the
+        `render_success`, `score` and `render_status` columns, then writes
+        the report. The partial aggregate is saved as aggregate.json so
+        reports for different shards can be combined with `merge_reports`.
+        """
+        store = ResultsStore(store_dir)
+        aggregator = ResultsAggregator()
+        for batch in store.scanner(columns=["render_success", "score", "render_status"], runs=runs).to_batches():
+            aggregator.update_batch(batch)
+        return self.write_report(aggregator, output_dir)
+
+    def merge_reports(self, report_dirs: List[str], output_dir: str = "results/reports") -> Dict[str, Any]:
+        """
+        Combines the aggregate.json partials of several reports into one.
+        """
+        partials = []
+        for report_dir in report_dirs:
+            with open(Path(report_dir) / AGGREGATE_FILE, "r") as f:
+                partials.append(ResultsAggregator.from_dict(json.load(f)))
+        return self.write_report(ResultsAggregator.merge_all(partials), output_dir)
+
+    def write_report(self, aggregator: ResultsAggregator, output_dir: str = "results/reports") -> Dict[str, Any]:
         out = Path(output_dir)
         out.mkdir(parents=True, exist_ok=True)
         
-        with open(results_path, "r") as f:
-            results = json.load(f)
-
-        scores = [r["score"] for r in results if r["render_success"]]
-        
         # Plot distribution
+        hist = aggregator.histogram
         plt.figure(figsize=(10, 6))
-        plt.hist(scores, bins=20, color='skyblue', edgecolor='black')
+        plt.stairs(hist.counts, hist.edges, fill=True, color='skyblue', edgecolor='black')
+        occupied = hist.counts.nonzero()[0]
+        if len(occupied):
+            # Zoom in on the filled bins; the full range is mostly empty
+            plt.xlim(hist.edges[max(occupied[0] - 1, 0)], hist.edges[min(occupied[-1] + 2, hist.bins)])
         plt.title("Distribution of Visual Alignment (CLIP) Scores")
         plt.xlabel("Score")
         plt.ylabel("Frequency")
         plt.savefig(out / "score_distribution.png")
+        plt.close()
         
         # Summary text
-        summary = {
-            "total_samples": len(results),
-            "render_success_rate": len(scores) / len(results) if results else 0,
-            "mean_clip_score": sum(scores) / len(scores) if scores else 0
-        }
+        summary = aggregator.summary()
         
         with open(out / "summary_metrics.json", "w") as f:
             json.dump(summary, f, indent=2)
+        with open(out / AGGREGATE_FILE, "w") as f:
+            json.dump(aggregator.to_dict(), f)
             
         print(f"Report generated in {output_dir}")
+        return summary
 
 if __name__ == "__main__":
     gen = ReportGenerator()
@@ -0,0 +1,74 @@
+import typer
+from rich.console import Console
+from rich.table import Table
+from pathlib import Path
+from typing import List
+
+app = typer.Typer()
+console = Console()
+
+@app.command()
+def query(
+    where: str = typer.Option(None, "--where", "-w", help="Filter, e.g. 'render_success and score <= 0.5'"),
+    columns: List[str] = typer.Option(None, "--column", "-c", help="Columns to return (repeatable; default all)"),
+    runs: List[str] = typer.Option(None, "--run", "-r", help="Only these runs (repeatable; default all)"),
+    limit: int = typer.Option(20, "--limit", "-n", help="Maximum rows to print (0 = no limit)"),
+    output_format: str = typer.Option("table", "--format", "-f", help="Output format (table or jsonl)"),
+    store_dir: Path = typer.Option("results/store", "--store", help="Results store directory"),
+):
+    """
+    Query pipeline results; the filter is pushed down into the Parquet scan.
+    """
+    from mvld.pipeline.results_store import ResultsStore
+    import json
+
+    if output_format not in ("table", "jsonl"):
+        raise typer.BadParameter(f"Unknown format '{output_format}'. Use table or jsonl.")
+
+    store = ResultsStore(str(store_dir))
+    try:
+        rows = store.iter_query(where, columns=columns or None, runs=runs or None)
+        if output_format == "jsonl":
+            for n, row in enumerate(rows):
+                if limit and n >= limit:
+                    break
+                print(json.dumps(row))
+            return
+
+        total = store.count(where, runs=runs or None)
+        table = Table(title=f"{total} matching results")
+        shown = []
+        for row in rows:
+            if limit and len(shown) >= limit:
+                break
+            shown.append(row)
+        for name in (shown[0] if shown else columns or []):
+            table.add_column(name)
+        for row in shown:
+            table.add_row(*(str(v)[:60] for v in row.values()))
+        console.print(table)
+    except ValueError as e:
+        console.print(f"[bold red]{e}[/bold red]")
+        raise typer.Exit(code=1)
+
+
+@app.command(name="import")
+def import_results(
+    results_path: Path = typer.Argument(..., help="rft_results.jsonl or legacy .json results file"),
+    run_id: str = typer.Option(None, "--run", "-r", help="Run id (default: the results file's directory name)"),
+    store_dir: Path = typer.Option("results/store", "--store", help="Results store directory"),
+):
+    """
+    Load a results file into the store, replacing the run if it exists.
+    """
+    from mvld.pipeline.results import resolve_results_path
+    from mvld.pipeline.results_store import ResultsStore
+
+    path = resolve_results_path(results_path)
+    if not path.exists():
+        console.print(f"[bold red]Results not found at {results_path}[/bold red]")
+        raise typer.Exit(code=1)
+
+    run_id = run_id or path.resolve().parent.name
+    stored = ResultsStore(str(store_dir)).import_results(run_id, path)
+    console.print(f"[bold blue]Stored {stored} results as run '{run_id}'.[/bold blue]")
@@ -1,5 +1,7 @@
 import typer
 from mvld.pipeline.base import PipelineRegistry
+from mvld.sandbox.budget import RenderBudget
+from mvld.sandbox.profiles import DEFAULT_PROFILE, RENDER_PROFILES
 
 app = typer.Typer()
 
@@ -8,8 +10,15 @@ def run_pipeline(
     name: str = typer.Argument(..., help="Algorithm name from registry"),
     num_samples: int = typer.Option(10, "--num-samples", "-n", help="Number of samples to process"),
     rft_threshold: float = typer.Option(0.7, "--rft-threshold", "-t", help="Threshold for RFT algorithm"),
+    workers: int = typer.Option(0, "--workers", "-w", help="Warm render workers (0 = one manim subprocess per sample)"),
+    geometry_only: bool = typer.Option(False, "--geometry-only", help="Skip rasterization and score spatial rewards only"),
+    profile: str = typer.Option(DEFAULT_PROFILE, "--profile", "-p", help=f"Render profile ({', '.join(RENDER_PROFILES)})"),
+    render_timeout: float = typer.Option(120.0, "--render-timeout", help="Wall-clock budget per render in seconds"),
+    render_memory: int = typer.Option(4096, "--render-memory", help="Address-space budget per render in MiB"),
+    resume: bool = typer.Option(False, "--resume", help="Skip samples that already have results from an earlier run"),
+    dedup: bool = typer.Option(False, "--dedup", help="Skip samples that duplicate an earlier one"),
 ):
     """Run a specific training algorithm from the registry."""
-    pipeline = PipelineRegistry.get(name)
-    pipeline.run(num_samples=num_samples, threshold=rft_threshold)
-```
+    budget = RenderBudget(timeout_s=render_timeout, cpu_seconds=int(render_timeout), memory_bytes=render_memory * 1024 ** 2)
+    pipeline = PipelineRegistry.get(name, workers=workers, profile=profile, render_budget=budget)
+    pipeline.run(num_samples=num_samples, threshold=rft_threshold, geometry_only=geometry_only, resume=resume, dedup=dedup)
@@ -1,15 +1,246 @@
+import ast
 import re
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Union
+
+# Manim direction constants and the unit vectors they stand for
+DIRECTIONS = {
+    "ORIGIN": (0.0, 0.0, 0.0),
+    "LEFT": (-1.0, 0.0, 0.0),
+    "RIGHT": (1.0, 0.0, 0.0),
+    "UP": (0.0, 1.0, 0.0),
+    "DOWN": (0.0, -1.0, 0.0),
+    "UL": (-1.0, 1.0, 0.0),
+    "UR": (1.0, 1.0, 0.0),
+    "DL": (-1.0, -1.0, 0.0),
+    "DR": (1.0, -1.0, 0.0),
+    "OUT": (0.0, 0.0, 1.0),
+    "IN": (0.0, 0.0, -1.0),
+}
+
+# Methods whose arguments are summed into one displacement, like Mobject.shift
+SUM_METHODS = {"shift"}
+
+# Calls whose positional arguments are positions or displacements; number
+# lists anywhere else (`Axes(x_range=[-3, 3])`, `color=[...]`) are not
+PLACEMENT_METHODS = SUM_METHODS | {"move_to", "next_to"}
+# Constructors with a position argument, by keyword (also accepted first)
+PLACEMENT_CONSTRUCTORS = {"Dot": "point"}
+
+# Methods that leave a mobject's center where it is
+KEEP_POSITION_METHODS = {"set_color", "set_fill", "set_stroke", "set_opacity", "set_z_index", "scale", "rotate"}
+
+# Containers are centered on their members, not on the origin
+GROUP_TYPES = {"VGroup", "Group", "VDict"}
+
+Vector = Tuple[float, float, float]
+
+
+class CoordinateExtractor(ast.NodeVisitor):
+    """
+    Collects the coordinates a Manim snippet places things at, in source
+    order, from a single walk over its AST.
+
+    `.shift(...)` arguments are summed into one displacement. Positional
+    arguments of the other placement calls (`.move_to`, `.next_to`) and the
+    point of a `Dot` are recorded if they evaluate to a vector. Elsewhere
+    only expressions built from direction constants count, so
+    `Axes(x_range=[-3, 3])` is not a coordinate but `to_edge(UP * 2)` is.
+    Vectors are number lists of length 2 or 3 and direction constants,
+    combined with `+`, `-`, `*`, `/` and unary minus, so `LEFT * 2 + UP`
+    resolves to (-2, 1, 0).
+    """
+    def __init__(self):
+        self.coords: Dict[Vector, None] = {}
+
+    def extract(self, tree: ast.AST) -> List[Vector]:
+        self.coords = {}
+        self.visit(tree)
+        return list(self.coords)
+
+    def visit_Call(self, node: ast.Call):
+        func = node.func
+        # Receiver first, so chained calls are recorded in source order
+        if isinstance(func, ast.Attribute):
+            self.visit(func.value)
+
+        if isinstance(func, ast.Attribute) and func.attr in SUM_METHODS and node.args:
+            total = self._sum([self.evaluate(arg) for arg in node.args])
+            if total is not None:
+                self._record(total)
+                return
+
+        if self._record_directional(node):
+            return
+
+        placements = []
+        if isinstance(func, ast.Attribute) and func.attr in PLACEMENT_METHODS:
+            placements = node.args
+        elif isinstance(func, ast.Name) and func.id in PLACEMENT_CONSTRUCTORS:
+            keyword = PLACEMENT_CONSTRUCTORS[func.id]
+            placements = node.args[:1] + [kw.value for kw in node.keywords if kw.arg == keyword]
+
+        for arg in list(node.args) + [kw.value for kw in node.keywords]:
+            if not (any(arg is p for p in placements) and self._record_vector(arg)):
+                self.visit(arg)
+
+    def visit_List(self, node: ast.List):
+        if not self._record_directional(node):
+            self.generic_visit(node)
+
+    visit_Tuple = visit_List
+    visit_BinOp = visit_List
+    visit_UnaryOp = visit_List
+
+    def visit_Name(self, node: ast.Name):
+        self._record_vector(node)
+
+    def evaluate(self, node: ast.AST) -> Union[Vector, float, None]:
+        """
+        Evaluates a constant vector or scalar expression; None if it is
+        anything else.
+        """
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+            return float(node.value)
+        if isinstance(node, ast.Name):
+            return DIRECTIONS.get(node.id)
+        if isinstance(node, (ast.List, ast.Tuple)) and len(node.elts) in (2, 3):
+            values = [self.evaluate(e) for e in node.elts]
+            if all(isinstance(v, float) for v in values):
+                return tuple(values + [0.0] * (3 - len(values)))
+            return None
+        if isinstance(node, ast.Call) and self._is_np_array(node.func) and len(node.args) == 1:
+            value = self.evaluate(node.args[0])
+            return value if isinstance(value, tuple) else None
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            value = self.evaluate(node.operand)
+            if value is None or isinstance(node.op, ast.UAdd):
+                return value
+            return -value if isinstance(value, float) else tuple(-v for v in value)
+        if isinstance(node, ast.BinOp):
+            return self._binop(node.op, self.evaluate(node.left), self.evaluate(node.right))
+        return None
+
+    def _binop(self, op: ast.operator, left, right):
+        if left is None or right is None:
+            return None
+        left_vec, right_vec = isinstance(left, tuple), isinstance(right, tuple)
+        if isinstance(op, (ast.Add, ast.Sub)):
+            if left_vec != right_vec:
+                return None
+            sign = 1.0 if isinstance(op, ast.Add) else -1.0
+            if not left_vec:
+                return left + sign * right
+            return tuple(a + sign * b for a, b in zip(left, right))
+        if isinstance(op, ast.Mult):
+            if left_vec and right_vec:
+                return None
+            if left_vec:
+                return tuple(a * right for a in left)
+            if right_vec:
+                return tuple(left * b for b in right)
+            return left * right
+        if isinstance(op, ast.Div) and not right_vec and right != 0:
+            return tuple(a / right for a in left) if left_vec else left / right
+        return None
+
+    def _sum(self, values: List[Any]) -> Optional[Vector]:
+        if not values or not all(isinstance(v, tuple) for v in values):
+            return None
+        return tuple(sum(axis) for axis in zip(*values))
+
+    def _record_directional(self, node: ast.AST) -> bool:
+        # Vectors that mention a direction constant are coordinates wherever they appear
+        if not any(isinstance(n, ast.Name) and n.id in DIRECTIONS for n in ast.walk(node)):
+            return False
+        return self._record_vector(node)
+
+    def _record_vector(self, node: ast.AST) -> bool:
+        value = self.evaluate(node)
+        if isinstance(value, tuple):
+            self._record(value)
+            return True
+        return False
+
+    def _record(self, vector: Vector):
+        # + 0.0 folds -0.0 into 0.0
+        self.coords.setdefault(tuple(v + 0.0 for v in vector), None)
+
+    @staticmethod
+    def _is_np_array(func: ast.AST) -> bool:
+        if isinstance(func, ast.Attribute):
+            return func.attr == "array" and isinstance(func.value, ast.Name) and func.value.id in ("np", "numpy")
+        return isinstance(func, ast.Name) and func.id == "array"
+
+
+class PlacementExtractor(ast.NodeVisitor):
+    """
+    Collects where a Manim snippet puts the mobjects it constructs: one
+    (type, position) per constructor call chained into constant `.shift`
+    and `.move_to` calls, e.g. `Square(color=BLUE).shift(LEFT * 2)` gives
+    ("Square", (-2, 0, 0)). Chains through any other method (`next_to`,
+    `to_edge`, ...) do not have a known position and are skipped.
+    """
+    def __init__(self):
+        self.coordinates = CoordinateExtractor()
+        self.placements: List[Tuple[str, Vector]] = []
+
+    def extract(self, tree: ast.AST) -> List[Tuple[str, Vector]]:
+        self.placements = []
+        self.visit(tree)
+        return self.placements
+
+    def visit_Call(self, node: ast.Call):
+        placement = self._resolve(node)
+        if placement is not None and isinstance(node.func, ast.Attribute):
+            self.placements.append(placement)
+            # The chain itself is resolved; only its arguments may nest more
+            while isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+                for arg in list(node.args) + [kw.value for kw in node.keywords]:
+                    self.visit(arg)
+                node = node.func.value
+            if isinstance(node, ast.Call):
+                for arg in list(node.args) + [kw.value for kw in node.keywords]:
+                    self.visit(arg)
+            return
+        self.generic_visit(node)
+
+    def _resolve(self, node: ast.AST) -> Optional[Tuple[str, Vector]]:
+        if not isinstance(node, ast.Call):
+            return None
+        func = node.func
+        if isinstance(func, ast.Name):
+            # Mobject constructors are the capitalized calls
+            if not func.id[:1].isupper() or func.id in GROUP_TYPES:
+                return None
+            return (func.id, (0.0, 0.0, 0.0))
+        if not isinstance(func, ast.Attribute):
+            return None
+        base = self._resolve(func.value)
+        if base is None:
+            return None
+        if func.attr in SUM_METHODS:
+            values = [self.coordinates.evaluate(arg) for arg in node.args]
+            total = self.coordinates._sum([base[1]] + values) if values else None
+            return None if total is None else (base[0], tuple(v + 0.0 for v in total))
+        if func.attr == "move_to" and len(node.args) == 1:
+            target = self.coordinates.evaluate(node.args[0])
+            return (base[0], tuple(v + 0.0 for v in target)) if isinstance(target, tuple) else None
+        if func.attr in KEEP_POSITION_METHODS:
+            return base
+        return None
+
 
 class CoordinateAugmenter:
     """
     Utility to augment (instruction, code) pairs with explicit coordinates.
     """
-    def __init__(self):
-        # Pattern to find .shift(), .move_to(), or [x,y,z] in code
-        self.shift_pattern = re.compile(r'\.shift\((.*?)\)')
-        self.move_to_pattern = re.compile(r'\.move_to\((.*?)\)')
+    def __init__(self, max_coordinates: int = 5):
+        self.max_coordinates = max_coordinates
+        self.extractor = CoordinateExtractor()
+        self.placement_extractor = PlacementExtractor()
+        # Fallback for snippets that do not parse: [x,y,z] or np.array([...]) literals
         self.vector_pattern = re.compile(r'np\.array\(\[(.*?)\]\)|\[\s*([-+]?\d*\.?\d+)\s*,\s*([-+]?\d*\.?\d+)\s*,\s*([-+]?\d*\.?\d+)\s*\]')
+        self.direction_pattern = re.compile(r'\b(' + "|".join(DIRECTIONS) + r')\b')
 
     def augment_instruction(self, instruction: str, code: str) -> str:
         """
@@ -18,48 +249,72 @@ class CoordinateAugmenter:
         coords = self.extract_coordinates(code)
         if not coords:
             return instruction
-        
+
         coord_strings = [f"[{c[0]:.2f}, {c[1]:.2f}]" for c in coords]
         spatial_note = " with coordinates: " + ", ".join(coord_strings)
-        
+
         return instruction + spatial_note
 
     def extract_coordinates(self, code: str) -> List[List[float]]:
         """
-        Basic extraction of coordinates from Manim code.
-        Supports .shift(), .move_to(), and explicit lists [x, y, z].
+        Coordinates from Manim code, in source order without duplicates:
+        `.shift()` displacements, `.move_to()`/`.next_to()` and `Dot` points,
+        and direction-constant expressions (see CoordinateExtractor). Code that does not parse falls back to
+        matching literals and whole-word direction names.
         """
-        coords = []
-        
-        # 1. Simple coordinate lists [x, y, z]
-        vec_matches = self.vector_pattern.findall(code)
-        for match in vec_matches:
-            # match is a tuple (array_content, x, y, z)
-            if match[1]: # Literal [x,y,z]
-                coords.append([float(match[1]), float(match[2]), float(match[3])])
-            elif match[0]: # np.array([x,y,z])
-                # Try to split by comma
-                inner = match[0].split(',')
-                if len(inner) >= 2:
-                    try:
-                        coords.append([float(i.strip()) for i in inner[:3]])
-                    except:
-                        pass
-
-        # 2. Heuristics for named directions (approximation)
-        if "LEFT" in code: coords.append([-1.0, 0.0, 0.0])
-        if "RIGHT" in code: coords.append([1.0, 0.0, 0.0])
-        if "UP" in code: coords.append([0.0, 1.0, 0.0])
-        if "DOWN" in code: coords.append([0.0, -1.0, 0.0])
-        if "ORIGIN" in code: coords.append([0.0, 0.0, 0.0])
-
-        # Remove duplicates while preserving order
-        unique_coords = []
-        for c in coords:
-            if c not in unique_coords:
-                unique_coords.append(c)
-                
-        return unique_coords[:5] # Limit to 5 for instruction brevity
+        try:
+            coords = self.extractor.extract(ast.parse(code))
+        except SyntaxError:
+            coords = self._extract_with_patterns(code)
+        return [list(c) for c in coords[:self.max_coordinates]]
+
+    def extract_placements(self, code: str) -> List[Dict[str, Any]]:
+        """
+        `{"type", "position"}` for every mobject the code places at a
+        constant position (see PlacementExtractor), in source order; the
+        shape of SpatialEvaluator's `positions` constraints. Empty if the
+        code does not parse.
+        """
+        try:
+            placements = self.placement_extractor.extract(ast.parse(code))
+        except SyntaxError:
+            return []
+        return [{"type": t, "position": list(position)} for t, position in placements]
+
+    def augment_batch(self, batch: Dict[str, List[Any]]) -> Dict[str, List[str]]:
+        """
+        `datasets.map(batched=True)` function: augments every instruction
+        in the batch from its code.
+        """
+        return {
+            "instruction": [
+                self.augment_instruction(instruction, code)
+                for instruction, code in zip(batch["instruction"], batch["code"])
+            ]
+        }
+
+    def augment_dataset(self, dataset, num_proc: Optional[int] = None, batch_size: int = 1000):
+        """
+        Augments the `instruction` column of a datasets.Dataset in batches,
+        spread over `num_proc` processes.
+        """
+        return dataset.map(self.augment_batch, batched=True, batch_size=batch_size, num_proc=num_proc, desc="Augmenting coordinates")
+
+    def _extract_with_patterns(self, code: str) -> List[Vector]:
+        coords: Dict[Vector, None] = {}
+        for match in self.vector_pattern.findall(code):
+            try:
+                if match[1]:
+                    values = [float(match[1]), float(match[2]), float(match[3])]
+                else:
+                    values = [float(v) for v in match[0].split(",")[:3]]
+            except ValueError:
+                continue
+            if len(values) >= 2:
+                coords.setdefault(tuple(values + [0.0] * (3 - len(values))), None)
+        for name in self.direction_pattern.findall(code):
+            coords.setdefault(DIRECTIONS[name], None)
+        return list(coords)
 
 if __name__ == "__main__":
     augmenter = CoordinateAugmenter()
@@ -1,63 +1,268 @@
-import re
+import ast
 import random
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
+
+from mvld.data.augmenter import DIRECTIONS
+
+# Mutation operators ErrorSeeder can apply
+OP_DIRECTION_FLIP = "direction_flip"
+OP_COLOR_SWAP = "color_swap"
+OP_SHAPE_SWAP = "shape_swap"
+OP_COORDINATE_PERTURBATION = "coordinate_perturbation"
+OP_ORDERING_SWAP = "ordering_swap"
+OPERATORS = (OP_DIRECTION_FLIP, OP_COLOR_SWAP, OP_SHAPE_SWAP, OP_COORDINATE_PERTURBATION, OP_ORDERING_SWAP)
+
+DIRECTION_FLIPS = {
+    "LEFT": "RIGHT", "RIGHT": "LEFT", "UP": "DOWN", "DOWN": "UP",
+    "UL": "DR", "DR": "UL", "UR": "DL", "DL": "UR", "OUT": "IN", "IN": "OUT"
+}
+COLORS = ("RED", "BLUE", "GREEN", "YELLOW", "ORANGE", "PURPLE", "PINK", "WHITE", "GRAY", "TEAL", "GOLD", "MAROON")
+SHAPES = ("Circle", "Square", "Triangle", "Rectangle", "Star", "Dot", "Ellipse", "RegularPolygon")
+# Keyword arguments each shape's constructor takes on top of the styling
+# ones every VMobject accepts. A shape swap is only offered when the new
+# shape accepts every keyword of the call, so the negative still constructs.
+SHAPE_KWARGS = {
+    "Circle": {"radius"},
+    "Square": {"side_length"},
+    "Triangle": set(),
+    "Rectangle": {"width", "height", "grid_xstep", "grid_ystep"},
+    "Star": {"n", "outer_radius", "inner_radius", "density", "start_angle"},
+    "Dot": {"point", "radius"},
+    "Ellipse": {"width", "height"},
+    "RegularPolygon": {"n", "radius", "start_angle"},
+}
+STYLE_KWARGS = {"color", "fill_color", "fill_opacity", "stroke_color", "stroke_width", "stroke_opacity", "z_index", "name"}
+COORDINATE_DELTAS = (-2.0, -1.0, -0.5, 0.5, 1.0, 2.0)
+# Statements whose order changes what is drawn on top or what plays first
+ORDERED_CALLS = {"add", "play", "bring_to_front", "bring_to_back"}
+
+# A mutation site: (operator, [(start, end, replacement candidates)], label)
+Site = Tuple[str, List[Tuple[int, int, Tuple[str, ...]]], str]
+
+
+class MutationSites(ast.NodeVisitor):
+    """
+    Finds every place a typed mutation can change a program, in one walk
+    over its AST. Spans are byte offsets into the UTF-8 source, so
+    mutations splice exactly the node they target (never `Circle` inside
+    `Circles`, never a number in an import line).
+    """
+    def __init__(self, source: bytes):
+        self.source = source
+        self.line_starts = [0]
+        for line in source.splitlines(keepends=True):
+            self.line_starts.append(self.line_starts[-1] + len(line))
+        self.sites: List[Site] = []
+
+    def span(self, node: ast.AST) -> Tuple[int, int]:
+        return (
+            self.line_starts[node.lineno - 1] + node.col_offset,
+            self.line_starts[node.end_lineno - 1] + node.end_col_offset
+        )
+
+    def text(self, node: ast.AST) -> str:
+        start, end = self.span(node)
+        return self.source[start:end].decode("utf-8")
+
+    def visit_Name(self, node: ast.Name):
+        if not isinstance(node.ctx, ast.Load):
+            return
+        start, end = self.span(node)
+        if node.id in DIRECTION_FLIPS:
+            self.sites.append((OP_DIRECTION_FLIP, [(start, end, (DIRECTION_FLIPS[node.id],))], node.id))
+        elif node.id in COLORS:
+            self.sites.append((OP_COLOR_SWAP, [(start, end, tuple(c for c in COLORS if c != node.id))], node.id))
+
+    def visit_Call(self, node: ast.Call):
+        if isinstance(node.func, ast.Name) and node.func.id in SHAPES:
+            start, end = self.span(node.func)
+            candidates = _swappable_shapes(node)
+            if candidates:
+                self.sites.append((OP_SHAPE_SWAP, [(start, end, candidates)], node.func.id))
+            for arg in node.args + [kw.value for kw in node.keywords]:
+                self.visit(arg)
+            return
+        self.generic_visit(node)
+
+    def visit_List(self, node: ast.List):
+        # x and y of vector literals, e.g. .shift([1.5, -2, 0]); z does not
+        # move anything in a 2D frame
+        if 2 <= len(node.elts) <= 3 and all(_number(e) is not None for e in node.elts):
+            for elt in node.elts[:2]:
+                self._coordinate_site(elt)
+            return
+        self.generic_visit(node)
+
+    visit_Tuple = visit_List
+
+    def visit_BinOp(self, node: ast.BinOp):
+        # Scalar multipliers of directions, e.g. LEFT * 2
+        if isinstance(node.op, ast.Mult):
+            for scalar, other in ((node.left, node.right), (node.right, node.left)):
+                if _number(scalar) is not None and isinstance(other, ast.Name) and other.id in DIRECTIONS:
+                    self._coordinate_site(scalar)
+        self.generic_visit(node)
+
+    def generic_visit(self, node: ast.AST):
+        for field in ("body", "orelse", "finalbody"):
+            body = getattr(node, field, None)
+            if isinstance(body, list):
+                self._ordering_sites(body)
+        super().generic_visit(node)
+
+    def _coordinate_site(self, node: ast.AST):
+        value = _number(node)
+        start, end = self.span(node)
+        candidates = tuple(dict.fromkeys(_format_number(value + d) for d in COORDINATE_DELTAS))
+        candidates = tuple(c for c in candidates if float(c) != value)
+        self.sites.append((OP_COORDINATE_PERTURBATION, [(start, end, candidates)], self.text(node)))
+
+    def _ordering_sites(self, body: List[ast.stmt]):
+        for first, second in zip(body, body[1:]):
+            if not (_ordered_call(first) and _ordered_call(second)):
+                continue
+            a, b = self.text(first), self.text(second)
+            if a == b:
+                continue
+            (a_start, a_end), (b_start, b_end) = self.span(first), self.span(second)
+            self.sites.append((OP_ORDERING_SWAP, [(a_start, a_end, (b,)), (b_start, b_end, (a,))], f"lines {first.lineno} and {second.lineno}"))
+
+
+def _number(node: ast.AST) -> Optional[float]:
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        value = _number(node.operand)
+        return -value if value is not None else None
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        return float(node.value)
+    return None
+
+
+def _swappable_shapes(node: ast.Call) -> Tuple[str, ...]:
+    """
+    The shapes `node`'s arguments are valid for, other than its own.
+    Positional arguments mean different things per shape (Circle's radius,
+    Star's n, Dot's point) and `**kwargs` cannot be checked, so calls with
+    either are never swapped.
+    """
+    if node.args or any(kw.arg is None for kw in node.keywords):
+        return ()
+    kwargs = {kw.arg for kw in node.keywords} - STYLE_KWARGS
+    return tuple(s for s in SHAPES if s != node.func.id and kwargs <= SHAPE_KWARGS[s])
+
+
+def _format_number(value: float) -> str:
+    return f"{round(value, 2):g}"
+
+
+def _ordered_call(stmt: ast.stmt) -> bool:
+    return (
+        isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Call)
+        and isinstance(stmt.value.func, ast.Attribute) and stmt.value.func.attr in ORDERED_CALLS
+    )
+
 
 class ErrorSeeder:
     """
     Introduces "visual logic bugs" into Manim code to create contrastive pairs.
+
+    Each program is parsed once into its mutation sites (see MutationSites)
+    and negatives are drawn from those sites with typed operators:
+    direction flips, color swaps, shape swaps, coordinate perturbations
+    and swaps of consecutive `self.add`/`self.play` calls. Every negative
+    differs from the input and from the other negatives of the same input.
     """
-    def __init__(self):
-        # Swap mappings for common visual logic
-        self.swaps = {
-            "LEFT": "RIGHT",
-            "RIGHT": "LEFT",
-            "UP": "DOWN",
-            "DOWN": "UP",
-            "BLUE": "RED",
-            "RED": "BLUE",
-            "GREEN": "YELLOW",
-            "YELLOW": "GREEN",
-            "Circle": "Square",
-            "Square": "Circle",
-            "shift": "move_to",
-            "move_to": "next_to"
-        }
+    def __init__(self, seed: Optional[int] = None, operators: Tuple[str, ...] = OPERATORS):
+        unknown = set(operators) - set(OPERATORS)
+        if unknown:
+            raise ValueError(f"Unknown mutation operators: {', '.join(sorted(unknown))}. Available: {', '.join(OPERATORS)}")
+        self.seed = seed
+        self.operators = operators
+        self.rng = random.Random(seed)
+
+    def sites(self, code: str) -> List[Site]:
+        source = code.encode("utf-8")
+        try:
+            tree = ast.parse(source)
+        except SyntaxError:
+            return []
+        finder = MutationSites(source)
+        finder.visit(tree)
+        return [site for site in finder.sites if site[0] in self.operators]
 
-    def generate_negative(self, code: str) -> Tuple[str, str]:
+    def generate_negatives(self, code: str, k: int = 1, rng: Optional[random.Random] = None) -> List[Tuple[str, str, str]]:
         """
-        Takes valid code and returns a (negative_code, error_description) pair.
+        Returns up to `k` distinct (negative_code, error_description,
+        operator) triples from a single parse of `code`, cycling over the
+        operators that have sites so the negatives are mixed.
         """
-        negative_code = code
-        applied_errors = []
-        
-        # Try to replace at least one occurrence of a swappable keyword
-        for key, val in self.swaps.items():
-            if key in negative_code and random.random() > 0.5:
-                # Replace only one occurrence to keep it subtle
-                negative_code = negative_code.replace(key, val, 1)
-                applied_errors.append(f"Swapped {key} with {val}")
-                break # Just one error for now
-        
-        if not applied_errors:
-            # Fallback: Just jitter a number
-            num_match = re.search(r'([-+]?\d*\.?\d+)', negative_code)
-            if num_match:
-                val = float(num_match.group(1))
-                new_val = val + random.choice([-1.0, 1.0, 2.0])
-                negative_code = negative_code.replace(str(val), f"{new_val:.1f}", 1)
-                applied_errors.append(f"Jittered coordinate {val} to {new_val}")
-
-        return negative_code, "; ".join(applied_errors)
+        rng = rng or self.rng
+        by_operator: Dict[str, List[Site]] = {}
+        for site in self.sites(code):
+            by_operator.setdefault(site[0], []).append(site)
+        for sites in by_operator.values():
+            rng.shuffle(sites)
+        order = list(by_operator)
+        rng.shuffle(order)
+
+        source = code.encode("utf-8")
+        negatives: Dict[str, Tuple[str, str]] = {}
+        while len(negatives) < k and any(by_operator.values()):
+            for op in order:
+                if not by_operator[op] or len(negatives) >= k:
+                    continue
+                _, edits, label = by_operator[op].pop()
+                chosen = [(start, end, rng.choice(candidates)) for start, end, candidates in edits]
+                negative = _splice(source, chosen)
+                if negative != code and negative not in negatives:
+                    negatives[negative] = (_describe(op, label, chosen[0][2]), op)
+        return [(negative, description, op) for negative, (description, op) in negatives.items()]
+
+    def generate_negative(self, code: str) -> Optional[Tuple[str, str]]:
+        """
+        Takes valid code and returns a (negative_code, error_description)
+        pair, or None if the code has nothing to mutate.
+        """
+        negatives = self.generate_negatives(code, 1)
+        if not negatives:
+            return None
+        return negatives[0][0], negatives[0][1]
+
+
+def _splice(source: bytes, edits: List[Tuple[int, int, str]]) -> str:
+    for start, end, replacement in sorted(edits, reverse=True):
+        source = source[:start] + replacement.encode("utf-8") + source[end:]
+    return source.decode("utf-8")
+
+
+def _describe(op: str, label: str, replacement: str) -> str:
+    if op == OP_DIRECTION_FLIP:
+        return f"Flipped direction {label} to {replacement}"
+    if op == OP_COLOR_SWAP:
+        return f"Swapped color {label} with {replacement}"
+    if op == OP_SHAPE_SWAP:
+        return f"Swapped shape {label} with {replacement}"
+    if op == OP_COORDINATE_PERTURBATION:
+        return f"Jittered coordinate {label} to {replacement}"
+    return f"Swapped order of {label}"
+
 
 class ContrastiveGenerator:
     """
     Creates (prompt, positive_code, negative_code) triplets.
     """
-    def __init__(self):
-        self.seeder = ErrorSeeder()
+    def __init__(self, seed: Optional[int] = None, negatives_per_sample: int = 1):
+        self.seeder = ErrorSeeder(seed)
+        self.negatives_per_sample = negatives_per_sample
 
-    def create_triplet(self, prompt: str, code: str) -> Dict[str, str]:
-        negative_code, error = self.seeder.generate_negative(code)
+    def create_triplet(self, prompt: str, code: str) -> Optional[Dict[str, str]]:
+        """
+        One triplet for `code`, or None if it cannot be mutated (a pair
+        with chosen == rejected teaches nothing).
+        """
+        negative = self.seeder.generate_negative(code)
+        if negative is None:
+            return None
+        negative_code, error = negative
         return {
             "prompt": prompt,
             "chosen": code,
@@ -65,10 +270,45 @@ class ContrastiveGenerator:
             "error_type": error
         }
 
+    def create_triplets(self, prompt: str, code: str) -> List[Dict[str, str]]:
+        """
+        Up to `negatives_per_sample` triplets for one program, none if it
+        cannot be mutated. The RNG is seeded from (seed, code), so results
+        do not depend on batching or on which worker runs them.
+        """
+        rng = random.Random(f"{self.seeder.seed}:{code}")
+        return [
+            {"prompt": prompt, "chosen": code, "rejected": negative, "error_type": error, "operator": op}
+            for negative, error, op in self.seeder.generate_negatives(code, self.negatives_per_sample, rng)
+        ]
+
+    def triplets_batch(self, batch: Dict[str, List[Any]]) -> Dict[str, List[str]]:
+        """
+        `datasets.map(batched=True)` function: expands a batch of
+        instruction/code rows into triplet rows (the row count changes).
+        """
+        columns = {"prompt": [], "chosen": [], "rejected": [], "error_type": [], "operator": []}
+        for prompt, code in zip(batch["instruction"], batch["code"]):
+            for triplet in self.create_triplets(prompt, code):
+                for name, value in triplet.items():
+                    columns[name].append(value)
+        return columns
+
+    def build_dataset(self, dataset, num_proc: Optional[int] = None, batch_size: int = 1000):
+        """
+        Builds a DPO triplet dataset from a datasets.Dataset with
+        instruction/code columns, in batches over `num_proc` processes.
+        """
+        return dataset.map(
+            self.triplets_batch, batched=True, batch_size=batch_size, num_proc=num_proc,
+            remove_columns=dataset.column_names, desc="Seeding errors"
+        )
+
 if __name__ == "__main__":
     cg = ContrastiveGenerator()
     test_code = "obj.shift(LEFT).set_color(BLUE)"
     triplet = cg.create_triplet("Move object left and make it blue", test_code)
+    assert triplet is not None
     print("Chosen:", triplet["chosen"])
     print("Rejected:", triplet["rejected"])
     print("Reason:", triplet["error_type"])
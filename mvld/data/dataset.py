@@ -1,9 +1,45 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datasets import Dataset
 import jsonlines
+import numpy as np
+import os
+import pyarrow as pa
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import random
 
+from mvld.data.shards import ShardWriter, completed_shards, load_manifest, save_manifest, shard_name
+
+# Row layout of bulk synthetic shards
+SYNTHETIC_SCHEMA = pa.schema([
+    ("instruction", pa.string()),
+    ("code", pa.string()),
+    ("metadata", pa.struct([("id", pa.int64()), ("source", pa.string())]))
+])
+
+
+def _generate_synthetic_shard(output_dir: str, index: int, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Writes shard `index` of a bulk synthetic run. The shard's RNG is the
+    index-th child of the run seed, so its contents depend only on the
+    run parameters, not on which worker produced it or when.
+    """
+    from mvld.data.generator import SyntheticGenerator
+
+    gen = SyntheticGenerator()
+    rng = np.random.default_rng(np.random.SeedSequence(params["seed"], spawn_key=(index,)))
+    first = index * params["shard_size"]
+    count = min(params["shard_size"], params["num_samples"] - first)
+
+    path = Path(output_dir) / shard_name(index, params["format"])
+    with ShardWriter(path, params["format"], batch_rows=params["batch_size"], schema=SYNTHETIC_SCHEMA) as writer:
+        for offset in range(0, count, params["batch_size"]):
+            batch = gen.generate_batch(rng, min(params["batch_size"], count - offset), relational_fraction=params["relational_fraction"])
+            for k, sample in enumerate(batch):
+                sample["metadata"] = {"id": first + offset + k, "source": "synthetic_bulk"}
+                writer.write(sample)
+        return writer.close()
+
 
 class MVLDDataset:
     """
@@ -37,9 +73,10 @@ class MVLDDataset:
 
 
 
-    def generate_bulk_synthetic(self, num_samples: int = 100) -> Dataset:
+    def generate_bulk_synthetic(self, num_samples: int = 100, num_proc: Optional[int] = None) -> Dataset:
         """
         Generates a large number of synthetic samples using the generator.
+        Coordinate augmentation runs as a batched map over `num_proc` processes.
         """
         from mvld.data.generator import SyntheticGenerator
         from mvld.data.augmenter import CoordinateAugmenter
@@ -55,16 +92,74 @@ class MVLDDataset:
             else:
                 sample = gen.generate_relational_scene()
             
-            # Augment with coordinates
-            sample["instruction"] = augmenter.augment_instruction(sample["instruction"], sample["code"])
-            
             data.append({
                 "instruction": sample["instruction"],
                 "code": sample["code"],
                 "metadata": {"id": i, "source": "synthetic_bulk"}
             })
             
-        return Dataset.from_list(data)
+        # Augment with coordinates
+        return augmenter.augment_dataset(Dataset.from_list(data), num_proc=num_proc)
+
+    def generate_bulk_sharded(self, num_samples: int, output_dir: str, seed: int = 0, shard_size: int = 100_000, workers: Optional[int] = None, fmt: str = "jsonl", batch_size: int = 4096, relational_fraction: float = 0.3) -> Dict[str, Any]:
+        """
+        Generates `num_samples` synthetic samples into `part-*.{fmt}` shards
+        of at most `shard_size` rows under `output_dir`, spread over
+        `workers` processes (default: all CPUs), and returns the manifest.
+
+        Output is reproducible: the same parameters give byte-identical
+        shards whatever the worker count. Memory is bounded by one batch
+        per worker. Re-running with the same parameters only generates
+        shards that are missing; load the result with `load_shards`.
+        """
+        out = Path(output_dir)
+        out.mkdir(parents=True, exist_ok=True)
+        params = {
+            "num_samples": num_samples, "seed": seed, "shard_size": shard_size, "format": fmt,
+            "batch_size": batch_size, "relational_fraction": relational_fraction, "generator": "synthetic_batch_v1"
+        }
+
+        manifest = load_manifest(out)
+        if manifest is not None and manifest["params"] != params:
+            raise ValueError(f"{out} holds shards generated with different parameters: {manifest['params']}")
+        manifest = {"format": fmt, "params": params, "shards": completed_shards(out, manifest)}
+
+        num_shards = -(-num_samples // shard_size)
+        todo = [i for i in range(num_shards) if str(i) not in manifest["shards"]]
+        workers = min(workers or os.cpu_count() or 1, max(len(todo), 1))
+
+        def record(index: int, entry: Dict[str, Any]):
+            manifest["shards"][str(index)] = entry
+            save_manifest(out, manifest)
+
+        save_manifest(out, manifest)
+        if workers <= 1:
+            for i in todo:
+                record(i, _generate_synthetic_shard(str(out), i, params))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(_generate_synthetic_shard, str(out), i, params): i for i in todo}
+                for future in as_completed(futures):
+                    record(futures[future], future.result())
+
+        manifest["num_rows"] = sum(e["rows"] for e in manifest["shards"].values())
+        save_manifest(out, manifest)
+        return manifest
+
+    def deduplicate(self, dataset: Dataset, index_dir: Optional[str] = None) -> Dataset:
+        """
+        Drops exact and near-duplicate (instruction, code) rows, keeping the
+        first occurrence. With `index_dir`, rows are also checked against,
+        and added to, the persistent index there.
+        """
+        from mvld.data.dedup import DedupIndex
+
+        index = DedupIndex(index_dir)
+        deduped = index.deduplicate(dataset)
+        index.save()
+        stats = index.stats()
+        print(f"Dedup: kept {stats['unique']}/{stats['seen']} samples ({stats['exact_duplicates']} exact, {stats['near_duplicates']} near duplicates).")
+        return deduped
 
     def save_to_jsonl(self, dataset: List[Dict[str, Any]], output_path: str):
 
@@ -0,0 +1,321 @@
+import hashlib
+import json
+import re
+import zlib
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+
+from mvld.data.shards import ShardWriter, load_manifest, save_manifest, shard_name
+
+STATUS_UNIQUE = "unique"
+STATUS_EXACT = "exact"
+STATUS_NEAR = "near"
+
+# Universal hashing modulus for MinHash permutations (a Mersenne prime, so
+# a * x + b stays below 2**63 for 32-bit shingle hashes)
+MERSENNE_PRIME = (1 << 31) - 1
+BAND_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+TOKEN_PATTERN = re.compile(r"[A-Za-z_]\w*|\d+\.?\d*|\.\d+|\S")
+NUMBER_PATTERN = re.compile(r"\d+\.?\d*|\.\d+")
+COMMENT_PATTERN = re.compile(r"#[^\n]*")
+# Scene boilerplate every sample shares: imports, the class line and the
+# construct signature. Left in, it dominates the shingle sets of short
+# scenes and makes unrelated samples look alike.
+BOILERPLATE_PATTERN = re.compile(r"^\s*(?:from\s+\S+\s+import\b.*|import\b.*|class\s+\w+.*:|def\s+construct\s*\(self\)\s*:)\s*$", re.MULTILINE)
+
+
+def exact_hash(instruction: str, code: str) -> int:
+    """
+    64-bit hash of the pair with whitespace runs collapsed.
+    """
+    text = " ".join(instruction.split()) + "\x00" + " ".join(code.split())
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class DedupIndex:
+    """
+    Exact and near-duplicate index over (instruction, code) pairs.
+
+    Exact duplicates are caught by a 64-bit hash of the whitespace-normalized
+    pair. Near duplicates are found with MinHash signatures over token
+    shingles of the normalized instruction and code (comments and scene
+    boilerplate dropped, numbers rounded to `number_precision` decimals),
+    bucketed by LSH bands.
+    A band collision counts as a duplicate when the estimated Jaccard
+    similarity is at least `threshold`.
+
+    Samples are checked and added in order, so the first occurrence is kept.
+    With `root`, signatures and hashes are appended to flat files there and
+    reloaded on open, so the index grows across runs and shards; `save`
+    marks the rows that are durable, and anything appended after the last
+    `save` is discarded on reload.
+    """
+    META_FILE = "meta.json"
+    SIGNATURE_FILE = "signatures.u32"
+    EXACT_FILE = "exact.u64"
+
+    def __init__(self, root: Optional[str] = None, num_perm: int = 128, bands: int = 16, threshold: float = 0.95, shingle_size: int = 3, number_precision: int = 1, seed: int = 0):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands}).")
+        self.params = {
+            "num_perm": num_perm, "bands": bands, "threshold": threshold,
+            "shingle_size": shingle_size, "number_precision": number_precision, "seed": seed
+        }
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.number_precision = number_precision
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self._band_weights = BAND_MULTIPLIER ** np.arange(1, self.rows_per_band + 1, dtype=np.uint64)
+
+        self._matrix = np.zeros((0, num_perm), dtype=np.uint32)
+        self._hashes: List[int] = []
+        self._exact: Dict[int, int] = {}
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(bands)]
+        self.rows = 0
+        self.processed: List[str] = []
+        self.counts = {STATUS_UNIQUE: 0, STATUS_EXACT: 0, STATUS_NEAR: 0}
+
+        self.root = Path(root) if root else None
+        self._saved_rows = 0
+        if self.root:
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._load()
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def tokens(self, text: str) -> List[str]:
+        text = COMMENT_PATTERN.sub("", text).lower()
+        return [
+            f"{float(t):.{self.number_precision}f}" if NUMBER_PATTERN.fullmatch(t) else t
+            for t in TOKEN_PATTERN.findall(text)
+        ]
+
+    def shingle_hashes(self, instruction: str, code: str) -> np.ndarray:
+        tokens = self.tokens(instruction) + ["\x00"] + self.tokens(BOILERPLATE_PATTERN.sub("", code))
+        k = min(self.shingle_size, len(tokens))
+        shingles = {" ".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)}
+        return np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+    def signatures(self, instructions: Sequence[str], codes: Sequence[str], chunk_shingles: int = 1 << 16) -> np.ndarray:
+        """
+        (len(instructions), num_perm) uint32 MinHash signatures, computed a
+        chunk of documents at a time with one min-reduction per chunk.
+        """
+        hashes = [self.shingle_hashes(i, c) for i, c in zip(instructions, codes)]
+        out = np.empty((len(hashes), self.num_perm), dtype=np.uint32)
+
+        start = 0
+        while start < len(hashes):
+            end = start + 1
+            size = len(hashes[start])
+            while end < len(hashes) and size + len(hashes[end]) <= chunk_shingles:
+                size += len(hashes[end])
+                end += 1
+            chunk = hashes[start:end]
+            lengths = np.fromiter((len(h) for h in chunk), dtype=np.int64, count=len(chunk))
+            offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+            values = (self._a[:, None] * np.concatenate(chunk)[None, :] + self._b[:, None]) % MERSENNE_PRIME
+            out[start:end] = np.minimum.reduceat(values, offsets, axis=1).T
+            start = end
+        return out
+
+    def band_keys(self, signatures: np.ndarray) -> np.ndarray:
+        """
+        (n, bands) uint64 bucket keys, one per LSH band.
+        """
+        banded = signatures.astype(np.uint64).reshape(len(signatures), self.bands, self.rows_per_band)
+        return (banded * self._band_weights).sum(axis=2, dtype=np.uint64)
+
+    def add_batch(self, instructions: Sequence[str], codes: Sequence[str]) -> List[Tuple[str, int]]:
+        """
+        Checks each pair against the index (and the earlier pairs of the
+        batch) and adds the unique ones. Returns `(status, row)` per pair,
+        where `row` is the new row for unique pairs and the matched row for
+        duplicates.
+        """
+        results = []
+        exact = [exact_hash(i, c) for i, c in zip(instructions, codes)]
+        todo = [k for k, h in enumerate(exact) if h not in self._exact]
+        signatures = self.signatures([instructions[k] for k in todo], [codes[k] for k in todo]) if todo else None
+        keys = self.band_keys(signatures).tolist() if todo else []
+        near = dict(zip(todo, range(len(todo))))
+
+        for k, h in enumerate(exact):
+            if h in self._exact:
+                results.append((STATUS_EXACT, self._exact[h]))
+                self.counts[STATUS_EXACT] += 1
+                continue
+
+            j = near[k]
+            match = self._near_match(signatures[j], keys[j])
+            if match is not None:
+                results.append((STATUS_NEAR, match))
+                self.counts[STATUS_NEAR] += 1
+                continue
+
+            row = self._append(h, signatures[j], keys[j])
+            results.append((STATUS_UNIQUE, row))
+            self.counts[STATUS_UNIQUE] += 1
+        return results
+
+    def filter(self, samples: Iterable[Dict[str, Any]], batch_size: int = 1024) -> Iterator[Dict[str, Any]]:
+        """
+        Streams the samples that are not duplicates, adding them as it goes.
+        """
+        batch = []
+        for sample in samples:
+            batch.append(sample)
+            if len(batch) >= batch_size:
+                yield from self._filter_batch(batch)
+                batch = []
+        if batch:
+            yield from self._filter_batch(batch)
+
+    def keep_mask(self, instructions: Sequence[str], codes: Sequence[str], batch_size: int = 1024) -> np.ndarray:
+        keep = np.zeros(len(instructions), dtype=bool)
+        for start in range(0, len(instructions), batch_size):
+            statuses = self.add_batch(instructions[start:start + batch_size], codes[start:start + batch_size])
+            keep[start:start + len(statuses)] = [s == STATUS_UNIQUE for s, _ in statuses]
+        return keep
+
+    def deduplicate(self, dataset, batch_size: int = 1024):
+        """
+        Returns `dataset` (a datasets.Dataset with instruction/code columns)
+        without the rows that duplicate the index or an earlier row.
+        """
+        keep = self.keep_mask(dataset["instruction"], dataset["code"], batch_size)
+        return dataset.select(np.flatnonzero(keep))
+
+    def stats(self) -> Dict[str, Any]:
+        seen = sum(self.counts.values())
+        duplicates = self.counts[STATUS_EXACT] + self.counts[STATUS_NEAR]
+        return {
+            "seen": seen,
+            "unique": self.counts[STATUS_UNIQUE],
+            "exact_duplicates": self.counts[STATUS_EXACT],
+            "near_duplicates": self.counts[STATUS_NEAR],
+            "duplicate_rate": duplicates / seen if seen else 0.0,
+            "indexed": self.rows
+        }
+
+    def save(self):
+        if not self.root:
+            return
+        if self.rows > self._saved_rows:
+            with open(self.root / self.SIGNATURE_FILE, "ab") as f:
+                f.write(self._matrix[self._saved_rows:self.rows].astype("<u4").tobytes())
+            with open(self.root / self.EXACT_FILE, "ab") as f:
+                f.write(np.asarray(self._hashes[self._saved_rows:], dtype="<u8").tobytes())
+        meta = {"params": self.params, "rows": self.rows, "processed": self.processed}
+        tmp_path = self.root / f".{self.META_FILE}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f, indent=2)
+        tmp_path.replace(self.root / self.META_FILE)
+        self._saved_rows = self.rows
+
+    def _filter_batch(self, batch: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        statuses = self.add_batch([s["instruction"] for s in batch], [s["code"] for s in batch])
+        for sample, (status, _) in zip(batch, statuses):
+            if status == STATUS_UNIQUE:
+                yield sample
+
+    def _near_match(self, signature: np.ndarray, keys: List[int]) -> Optional[int]:
+        buckets = [self._buckets[band][key] for band, key in enumerate(keys) if key in self._buckets[band]]
+        if not buckets:
+            return None
+        candidates = np.unique(np.concatenate(buckets))
+        similarity = (self._matrix[candidates] == signature).mean(axis=1)
+        best = int(np.argmax(similarity))
+        return int(candidates[best]) if similarity[best] >= self.threshold else None
+
+    def _append(self, exact: int, signature: np.ndarray, keys: List[int]) -> int:
+        row = self.rows
+        if row == len(self._matrix):
+            grown = np.zeros((max(1024, 2 * row), self.num_perm), dtype=np.uint32)
+            grown[:row] = self._matrix
+            self._matrix = grown
+        self._matrix[row] = signature
+        self._hashes.append(exact)
+        self._exact[exact] = row
+        for band, key in enumerate(keys):
+            self._buckets[band].setdefault(key, []).append(row)
+        self.rows += 1
+        return row
+
+    def _load(self):
+        meta_path = self.root / self.META_FILE
+        if not meta_path.exists():
+            return
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+        # The threshold only affects lookups, so it may change between runs
+        if {k: v for k, v in meta["params"].items() if k != "threshold"} != {k: v for k, v in self.params.items() if k != "threshold"}:
+            raise ValueError(f"Dedup index at {self.root} was built with different parameters: {meta['params']}")
+
+        # Rows past the last save belong to an interrupted batch; drop them
+        rows = meta["rows"]
+        for name, itemsize in ((self.SIGNATURE_FILE, 4 * self.num_perm), (self.EXACT_FILE, 8)):
+            with open(self.root / name, "ab") as f:
+                f.truncate(rows * itemsize)
+        signatures = np.fromfile(self.root / self.SIGNATURE_FILE, dtype="<u4").reshape(rows, self.num_perm)
+        exact = np.fromfile(self.root / self.EXACT_FILE, dtype="<u8").tolist()
+
+        for h, signature, keys in zip(exact, signatures, self.band_keys(signatures).tolist()):
+            self._append(h, signature, keys)
+        self.processed = meta["processed"]
+        self._saved_rows = self.rows
+
+
+def dedup_shards(input_dir: str, output_dir: str, index: DedupIndex, batch_size: int = 1024) -> Dict[str, Any]:
+    """
+    Deduplicates a sharded dataset (see mvld.data.shards) shard by shard
+    into `output_dir`, against `index`. Shards the index has already
+    processed are skipped, so this can run again as new shards arrive.
+    Returns the output manifest, with per-shard duplicate counts.
+    """
+    manifest = load_manifest(input_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"No manifest in {input_dir}")
+    fmt = manifest["format"]
+    out_manifest = load_manifest(output_dir) or {"format": fmt, "params": {"source": str(input_dir), **index.params}, "shards": {}}
+
+    for key in sorted(manifest["shards"], key=int):
+        name = f"{input_dir}:{manifest['shards'][key]['path']}"
+        if name in index.processed:
+            continue
+        before = dict(index.counts)
+        with ShardWriter(Path(output_dir) / shard_name(int(key), fmt), fmt) as writer:
+            writer.write_all(index.filter(_read_shard(Path(input_dir) / manifest["shards"][key]["path"], fmt), batch_size))
+            entry = writer.close()
+        entry["exact_duplicates"] = index.counts[STATUS_EXACT] - before[STATUS_EXACT]
+        entry["near_duplicates"] = index.counts[STATUS_NEAR] - before[STATUS_NEAR]
+        out_manifest["shards"][key] = entry
+        index.processed.append(name)
+        save_manifest(output_dir, out_manifest)
+        index.save()
+
+    out_manifest["num_rows"] = sum(e["rows"] for e in out_manifest["shards"].values())
+    save_manifest(output_dir, out_manifest)
+    return out_manifest
+
+
+def _read_shard(path: Path, fmt: str) -> Iterator[Dict[str, Any]]:
+    if fmt == "jsonl":
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+        return
+
+    import pyarrow as pa
+    with pa.OSFile(str(path), "rb") as f:
+        for batch in pa.ipc.open_stream(f):
+            yield from batch.to_pylist()
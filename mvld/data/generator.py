@@ -1,6 +1,20 @@
 import random
 from typing import List, Dict, Any, Tuple
 import json
+import numpy as np
+
+# Relations drawn for relational scenes, and the coordinate each one
+# contributes to an augmented instruction
+RELATIONS = ("LEFT", "RIGHT", "UP", "DOWN")
+DIRECTION_VECTORS = {"LEFT": (-1.0, 0.0), "RIGHT": (1.0, 0.0), "UP": (0.0, 1.0), "DOWN": (0.0, -1.0)}
+
+# Code templates generate_batch fills in; the output matches _assemble_code
+CODE_HEADER = "from mvld.sandbox.base import MVLDScene\nfrom manim import *\nclass Scene(MVLDScene):\n    def construct(self):\n"
+OBJECT_TEMPLATE = "        {ref} = {type}(color={color}).shift([{x}, {y}, 0])\n        self.add({ref})"
+RELATIONAL_TEMPLATE = (
+    "        obj_a = {type_a}(color={color_a}).shift([0, 0, 0])\n        self.add(obj_a)\n"
+    "        obj_b = {type_b}(color={color_b}).next_to(obj_a, {rel})\n        self.add(obj_b)"
+)
 
 class SyntheticGenerator:
     """
@@ -68,6 +82,56 @@ class SyntheticGenerator:
             "code": code
         }
 
+    def generate_batch(self, rng: np.random.Generator, batch_size: int, max_objects: int = 4, relational_fraction: float = 0.3, augment: bool = True) -> List[Dict[str, str]]:
+        """
+        Generates `batch_size` scenes with every random draw (scene kind,
+        object counts, shapes, colors, positions, relations) made for the
+        whole batch at once from `rng`; the same generator state always
+        yields the same batch.
+
+        Mixes random scenes (1 to `max_objects` objects) and relational
+        scenes like `generate_random_scene`/`generate_relational_scene`.
+        With `augment`, instructions carry the same coordinate note
+        CoordinateAugmenter would add, built from the drawn positions
+        instead of re-parsing the code.
+        """
+        relational = rng.random(batch_size) < relational_fraction
+        num_objects = np.where(relational, 2, rng.integers(1, max_objects + 1, batch_size))
+        total = int(num_objects.sum())
+
+        shapes = np.asarray(self.shapes)[rng.integers(0, len(self.shapes), total)].tolist()
+        colors = np.asarray(self.colors)[rng.integers(0, len(self.colors), total)].tolist()
+        positions = np.round(rng.uniform(-self.grid_extents, self.grid_extents, (total, 2)), 2).tolist()
+        relations = np.asarray(RELATIONS)[rng.integers(0, len(RELATIONS), batch_size)].tolist()
+
+        samples = []
+        start = 0
+        for k, (count, is_relational) in enumerate(zip(num_objects.tolist(), relational.tolist())):
+            rows = range(start, start + count)
+            start += count
+
+            if is_relational:
+                a, b = rows
+                rel = relations[k]
+                code = CODE_HEADER + RELATIONAL_TEMPLATE.format(type_a=shapes[a], color_a=colors[a], type_b=shapes[b], color_b=colors[b], rel=rel)
+                instruction = f"Draw a {colors[a].lower()} {shapes[a].lower()} and place a {colors[b].lower()} {shapes[b].lower()} to its {rel.lower()}."
+                # obj_a is shifted by [0, 0, 0]
+                coords = [(0.0, 0.0), DIRECTION_VECTORS[rel]]
+            else:
+                code = CODE_HEADER + "\n".join(
+                    OBJECT_TEMPLATE.format(ref=f"obj_{j}", type=shapes[i], color=colors[i], x=positions[i][0], y=positions[i][1])
+                    for j, i in enumerate(rows)
+                )
+                parts = [f"a {colors[i].lower()} {shapes[i].lower()} at {positions[i]}" for i in rows]
+                instruction = "Draw " + (", ".join(parts[:-1]) + " and " if len(parts) > 1 else "") + parts[-1] + "."
+                coords = list(dict.fromkeys(tuple(positions[i]) for i in rows))[:5]
+
+            if augment:
+                # + 0.0 prints -0.0 as 0.00, as CoordinateAugmenter does
+                instruction += " with coordinates: " + ", ".join(f"[{x + 0.0:.2f}, {y + 0.0:.2f}]" for x, y in coords)
+            samples.append({"instruction": instruction, "code": code})
+        return samples
+
     def _assemble_code(self, objects: List[Dict[str, Any]]) -> str:
         lines = [
             "from mvld.sandbox.base import MVLDScene",
@@ -1,7 +1,13 @@
+import io
 import re
 import xml.etree.ElementTree as ET
 from pathlib import Path
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Iterator, Tuple, Optional, Union
+
+from mvld.data.svg_path import path_geometry
+
+# Paths whose geometry SVGLoader computes in one vectorized call
+PATH_BATCH = 1024
 
 class TikZLoader:
     """
@@ -46,58 +52,113 @@ class TikZLoader:
 class SVGLoader:
     """
     Parses SVG files to extract basic spatial primitives.
+
+    Primitives are the circle, rect and path elements that are children of
+    the root or of nested <g> groups, in document order. `iter_file` and
+    `iter_string` stream them with `iterparse`, so memory stays bounded by
+    the nesting depth and PATH_BATCH primitives rather than the file size.
+
+    Paths keep their `d` string and, when they draw anything, get the
+    exact `bbox`, `center`, `width` and `height` of their geometry (see
+    mvld.data.svg_path), computed for PATH_BATCH paths at a time.
     """
     def parse_file(self, file_path: Path) -> List[Dict[str, Any]]:
-        tree = ET.parse(file_path)
-        root = tree.getroot()
-        # Remove namespace for easier querying
-        for el in root.iter():
-            if '}' in el.tag:
-                el.tag = el.tag.split('}', 1)[1]
-        
-        return self._parse_element(root)
+        return list(self.iter_file(file_path))
 
     def parse_string(self, content: str) -> List[Dict[str, Any]]:
         root = ET.fromstring(content)
         for el in root.iter():
             if '}' in el.tag:
                 el.tag = el.tag.split('}', 1)[1]
-        return self._parse_element(root)
+        return self._add_path_geometry(self._parse_element(root))
+
+    def iter_file(self, file_path: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+        """
+        Yields the primitives of an SVG file as they are parsed; same
+        output as `parse_string` on its content. A malformed file raises
+        ET.ParseError once the parser reaches the error.
+        """
+        with open(file_path, "rb") as f:
+            yield from self._iterparse(f)
+
+    def iter_string(self, content: str) -> Iterator[Dict[str, Any]]:
+        yield from self._iterparse(io.StringIO(content))
+
+    def _iterparse(self, source) -> Iterator[Dict[str, Any]]:
+        # Per open element: the element and whether its children are
+        # collected (true for the root and <g> groups under collected parents)
+        stack: List[Tuple[ET.Element, bool]] = []
+        # Primitives held back, in document order, until the paths among
+        # them get their geometry; at most PATH_BATCH of any type
+        pending: List[Dict[str, Any]] = []
+        for event, element in ET.iterparse(source, events=("start", "end")):
+            tag = element.tag.split('}', 1)[1] if '}' in element.tag else element.tag
+            if event == "start":
+                collected = not stack or stack[-1][1]
+                # Attributes are complete at "start"; children are not needed
+                if stack and collected:
+                    data = self._primitive(tag, element)
+                    if data is not None:
+                        if tag != "path" and not pending:
+                            yield data
+                        else:
+                            pending.append(data)
+                    if len(pending) >= PATH_BATCH:
+                        yield from self._add_path_geometry(pending)
+                        pending = []
+                stack.append((element, collected and (not stack or tag == "g")))
+            else:
+                stack.pop()
+                element.clear()
+                # Detach it, so the tree never holds more than the open path
+                if stack:
+                    stack[-1][0].remove(element)
+        yield from self._add_path_geometry(pending)
 
     def _parse_element(self, element: ET.Element) -> List[Dict[str, Any]]:
         results = []
         
         for child in element:
-            tag = child.tag
-            data = {"type": tag, "raw_attrs": dict(child.attrib)}
-            
-            if tag == "circle":
-                data.update({
-                    "center": [float(child.get("cx", 0)), float(child.get("cy", 0))],
-                    "radius": float(child.get("r", 0))
-                })
-                results.append(data)
-            elif tag == "rect":
-                w, h = float(child.get("width", 0)), float(child.get("height", 0))
-                x, y = float(child.get("x", 0)), float(child.get("y", 0))
-                data.update({
-                    "center": [x + w/2, y + h/2],
-                    "width": w,
-                    "height": h
-                })
-                results.append(data)
-            elif tag == "path":
-                # Path parsing is complex; for pretraining we might just take 
-                # a bounding box or starting point.
-                data["d"] = child.get("d")
+            data = self._primitive(child.tag, child)
+            if data is not None:
                 results.append(data)
                 
             # Recursive for groups <g>
-            if tag == "g":
+            if child.tag == "g":
                 results.extend(self._parse_element(child))
                 
         return results
 
+    def _add_path_geometry(self, primitives: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        paths = [data for data in primitives if data["type"] == "path"]
+        for data, geometry in zip(paths, path_geometry([data["d"] for data in paths])):
+            if geometry is not None:
+                data.update(geometry)
+        return primitives
+
+    def _primitive(self, tag: str, element: ET.Element) -> Optional[Dict[str, Any]]:
+        data = {"type": tag, "raw_attrs": dict(element.attrib)}
+
+        if tag == "circle":
+            data.update({
+                "center": [float(element.get("cx", 0)), float(element.get("cy", 0))],
+                "radius": float(element.get("r", 0))
+            })
+        elif tag == "rect":
+            w, h = float(element.get("width", 0)), float(element.get("height", 0))
+            x, y = float(element.get("x", 0)), float(element.get("y", 0))
+            data.update({
+                "center": [x + w/2, y + h/2],
+                "width": w,
+                "height": h
+            })
+        elif tag == "path":
+            # Geometry is added in batches by _add_path_geometry
+            data["d"] = element.get("d")
+        else:
+            return None
+        return data
+
 if __name__ == "__main__":
     # Quick test
     tikz_data = r"\draw (0,0) circle (1); \draw[blue] (2,2) rectangle (4,4);"
@@ -0,0 +1,222 @@
+import hashlib
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+from PIL import Image
+
+from mvld.eval.verdict_cache import VerdictCache
+from mvld.sandbox.budget import STATUS_OK, STATUS_ERROR
+from mvld.sandbox.executor import ManimSandbox
+
+# Why a pair was kept or dropped
+REASON_KEPT = "visual_difference"
+REASON_NO_DIFFERENCE = "no_visual_difference"
+REASON_CHOSEN_FAILED = "chosen_failed"
+REASON_REJECTED_FAILED = "rejected_failed"
+
+# Rejected-code render outcomes that repeat for the same code; budget
+# kills (timeout, cpu_limit, oom) may not, so those verdicts are not cached
+DETERMINISTIC_STATUSES = {STATUS_OK, STATUS_ERROR}
+
+SCRIPTS_DIR = "pair_scripts"
+
+
+def scene_graph_difference(chosen: List[Dict[str, Any]], rejected: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Compares two scene graphs independently of mobject order.
+
+    `unmatched` counts mobjects whose (type, color) has no counterpart in
+    the other graph. When every mobject matches, rows are paired up in
+    (type, color, position) order and `max_displacement`/`max_resize` are
+    the largest position and width/height changes between pairs.
+    """
+    def key(m: Dict[str, Any]) -> Tuple[str, str]:
+        return (str(m.get("type")), str(m.get("color")))
+
+    chosen_keys, rejected_keys = Counter(map(key, chosen)), Counter(map(key, rejected))
+    unmatched = sum((chosen_keys - rejected_keys).values()) + sum((rejected_keys - chosen_keys).values())
+    diff = {"unmatched": unmatched, "max_displacement": None, "max_resize": None}
+    if unmatched or not chosen:
+        return diff
+
+    def columns(graph: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+        rows = sorted(graph, key=lambda m: (key(m), tuple(m.get("position") or (0.0, 0.0, 0.0))))
+        positions = np.asarray([m.get("position") or (0.0, 0.0, 0.0) for m in rows], dtype=np.float64).reshape(-1, 3)
+        sizes = np.asarray([(m.get("width") or 0.0, m.get("height") or 0.0) for m in rows], dtype=np.float64)
+        return positions, sizes
+
+    chosen_positions, chosen_sizes = columns(chosen)
+    rejected_positions, rejected_sizes = columns(rejected)
+    diff["max_displacement"] = float(np.linalg.norm(chosen_positions - rejected_positions, axis=1).max())
+    diff["max_resize"] = float(np.abs(chosen_sizes - rejected_sizes).max())
+    return diff
+
+
+def image_difference(chosen_path: str, rejected_path: str, tolerance: int = 8) -> Optional[float]:
+    """
+    Fraction of pixels where any RGB channel differs by more than
+    `tolerance` (out of 255); 1.0 if the frame sizes differ, None if either
+    image cannot be read.
+    """
+    try:
+        with Image.open(chosen_path) as a, Image.open(rejected_path) as b:
+            chosen = np.asarray(a.convert("RGB"), dtype=np.int16)
+            rejected = np.asarray(b.convert("RGB"), dtype=np.int16)
+    except OSError:
+        return None
+    if chosen.shape != rejected.shape:
+        return 1.0
+    return float((np.abs(chosen - rejected).max(axis=2) > tolerance).mean())
+
+
+class PairVerifier:
+    """
+    Keeps only contrastive pairs whose rejected code renders and looks
+    measurably different from the chosen code.
+
+    Chosen and rejected programs are rendered through the sandbox (in
+    parallel when it has a worker pool), each distinct program once per
+    batch. With images, a pair is kept when at least `min_pixel_diff` of
+    the pixels change; without them (`geometry_only`, unreadable frames)
+    when the scene graphs differ in their mobjects or by at least
+    `min_displacement` in position or size. Verdicts are cached by
+    (chosen, rejected, render config, thresholds), so regenerating a
+    dataset only renders new pairs.
+    """
+    def __init__(self, sandbox: ManimSandbox, cache: Optional[VerdictCache] = None, geometry_only: bool = False, min_pixel_diff: float = 0.001, pixel_tolerance: int = 8, min_displacement: float = 0.05, batch_size: int = 64):
+        self.sandbox = sandbox
+        self.cache = cache
+        self.geometry_only = geometry_only
+        self.min_pixel_diff = min_pixel_diff
+        self.pixel_tolerance = pixel_tolerance
+        self.min_displacement = min_displacement
+        self.batch_size = batch_size
+        self.scripts_dir = sandbox.output_dir / SCRIPTS_DIR
+        self.scripts_dir.mkdir(parents=True, exist_ok=True)
+        self.reasons: Counter = Counter()
+        self.renders = 0
+        self.cached = 0
+
+    def verify(self, triplets: Iterable[Dict[str, Any]]) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """
+        Yields (triplet, verdict) for each triplet with `chosen`/`rejected`
+        code, in input order. A verdict has `keep`, `reason`, both render
+        statuses, the scene graph diff and the changed-pixel fraction.
+        """
+        batch = []
+        for triplet in triplets:
+            batch.append(triplet)
+            if len(batch) >= self.batch_size:
+                yield from self._verify_batch(batch)
+                batch = []
+        if batch:
+            yield from self._verify_batch(batch)
+
+    def keep_mask(self, dataset) -> np.ndarray:
+        """
+        Boolean mask over a triplet dataset (chosen/rejected columns) of the
+        pairs to keep.
+        """
+        triplets = ({"chosen": c, "rejected": r} for c, r in zip(dataset["chosen"], dataset["rejected"]))
+        return np.fromiter((verdict["keep"] for _, verdict in self.verify(triplets)), dtype=bool, count=len(dataset))
+
+    def filter_dataset(self, dataset):
+        """
+        The rows of a triplet dataset whose pairs pass verification.
+        """
+        return dataset.select(np.flatnonzero(self.keep_mask(dataset)))
+
+    def stats(self) -> Dict[str, Any]:
+        verified = sum(self.reasons.values())
+        return {
+            "verified": verified,
+            "kept": self.reasons[REASON_KEPT],
+            "keep_rate": self.reasons[REASON_KEPT] / verified if verified else 0.0,
+            "reasons": dict(self.reasons),
+            "renders": self.renders,
+            "cached_verdicts": self.cached
+        }
+
+    def _key(self, chosen: str, rejected: str) -> str:
+        thresholds = (self.min_pixel_diff, self.pixel_tolerance, self.min_displacement)
+        return VerdictCache.make_key("pair_verifier", chosen, rejected, self.sandbox.render_config(self.geometry_only), thresholds)
+
+    def _verify_batch(self, batch: List[Dict[str, Any]]) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        keys = [self._key(t["chosen"], t["rejected"]) for t in batch]
+        verdicts = [self.cache.get(key) if self.cache is not None else None for key in keys]
+
+        # Render every distinct program of the uncached pairs once
+        codes = list(dict.fromkeys(
+            code for t, verdict in zip(batch, verdicts) if verdict is None
+            for code in (t["chosen"], t["rejected"])
+        ))
+        scripts = [self._write_script(code) for code in codes]
+        renders = dict(zip(codes, self.sandbox.map_scripts(scripts, geometry_only=self.geometry_only)))
+        self.renders += len(codes)
+        for script in scripts:
+            script.unlink(missing_ok=True)
+
+        for t, key, verdict in zip(batch, keys, verdicts):
+            if verdict is not None:
+                self.cached += 1
+            else:
+                chosen, rejected = renders[t["chosen"]], renders[t["rejected"]]
+                verdict = self._judge(chosen, rejected)
+                # A failing chosen program points at the sandbox rather than the pair
+                if self.cache is not None and chosen["success"] and rejected["status"] in DETERMINISTIC_STATUSES:
+                    self.cache.put(key, verdict)
+            self.reasons[verdict["reason"]] += 1
+            yield t, verdict
+
+    def _judge(self, chosen: Dict[str, Any], rejected: Dict[str, Any]) -> Dict[str, Any]:
+        verdict = {
+            "keep": False,
+            "reason": REASON_NO_DIFFERENCE,
+            "chosen_status": chosen["status"],
+            "rejected_status": rejected["status"],
+            "scene_graph_diff": None,
+            "pixel_diff": None
+        }
+        if not chosen["success"]:
+            verdict["reason"] = REASON_CHOSEN_FAILED
+            return verdict
+        if not rejected["success"]:
+            verdict["reason"] = REASON_REJECTED_FAILED
+            return verdict
+
+        if chosen["scene_graph"] is not None and rejected["scene_graph"] is not None:
+            verdict["scene_graph_diff"] = scene_graph_difference(chosen["scene_graph"], rejected["scene_graph"])
+        if chosen["image_path"] and rejected["image_path"]:
+            verdict["pixel_diff"] = image_difference(chosen["image_path"], rejected["image_path"], self.pixel_tolerance)
+
+        # The frame is what the model is judged on; the scene graph decides
+        # only when there is no frame to compare
+        if verdict["pixel_diff"] is not None:
+            different = verdict["pixel_diff"] >= self.min_pixel_diff
+        else:
+            diff = verdict["scene_graph_diff"]
+            different = diff is not None and (
+                diff["unmatched"] > 0
+                or (diff["max_displacement"] or 0.0) >= self.min_displacement
+                or (diff["max_resize"] or 0.0) >= self.min_displacement
+            )
+        if different:
+            verdict["keep"] = True
+            verdict["reason"] = REASON_KEPT
+        return verdict
+
+    def _write_script(self, code: str) -> Path:
+        # Named by content so the same program always maps to the same
+        # images dir under the sandbox
+        digest = hashlib.sha1(code.encode("utf-8")).hexdigest()[:16]
+        script_path = self.scripts_dir / f"pair_{digest}.py"
+        with open(script_path, "w") as f:
+            f.write(code)
+        return script_path
+
+if __name__ == "__main__":
+    chosen = [{"type": "Circle", "color": "#FF0000", "position": [0.0, 0.0, 0.0], "width": 2.0, "height": 2.0}]
+    rejected = [{"type": "Circle", "color": "#FF0000", "position": [-1.0, 0.0, 0.0], "width": 2.0, "height": 2.0}]
+    print(scene_graph_difference(chosen, rejected))
+    print("PairVerifier ready.")
@@ -1,54 +1,188 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datasets import Dataset
+import pyarrow as pa
 from mvld.data.loaders import TikZLoader, SVGLoader
+from mvld.data.shards import ShardWriter, completed_shards, load_manifest, load_shards, save_manifest, shard_name
 import json
+import os
+
+FILE_EXTENSIONS = {"tikz": ".tikz", "svg": ".svg"}
+
+# Row layout of pretraining shards
+PRETRAINING_SCHEMA = pa.schema([
+    ("instruction", pa.string()),
+    ("code", pa.string()),
+    ("scene_graph", pa.string()),
+    ("metadata", pa.struct([("source", pa.string()), ("type", pa.string())]))
+])
+
+
+def discover_files(input_dir: str, file_type: str, recursive: bool = True) -> List[str]:
+    """
+    Paths (relative to `input_dir`, POSIX style, sorted) of the files of
+    `file_type` under `input_dir`, walking subdirectories with `recursive`.
+    """
+    if file_type not in FILE_EXTENSIONS:
+        raise ValueError(f"Unknown file type '{file_type}'. Available: {', '.join(FILE_EXTENSIONS)}")
+    ext = FILE_EXTENSIONS[file_type]
+    root = Path(input_dir)
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        if not recursive:
+            dirnames.clear()
+        rel = Path(dirpath).relative_to(root)
+        files.extend((rel / name).as_posix() for name in filenames if name.endswith(ext))
+    return sorted(files)
+
+
+def _ingest_shard(input_dir: str, output_dir: str, index: int, files: List[str], file_type: str, fmt: str) -> Dict[str, Any]:
+    """
+    Parses `files` into shard `index`. A file that cannot be read or parsed
+    is recorded in the entry's `errors` instead of failing the shard.
+    """
+    script = LayoutPretrainingScript()
+    errors = {}
+    path = Path(output_dir) / shard_name(index, fmt)
+    with ShardWriter(path, fmt, schema=PRETRAINING_SCHEMA) as writer:
+        for name in files:
+            try:
+                writer.write(script.process_file(Path(input_dir), name, file_type))
+            except Exception as e:
+                errors[name] = f"{type(e).__name__}: {e}"
+        entry = writer.close()
+    entry["files"] = len(files)
+    # Resume reads the covered files from here instead of the shard's rows
+    entry["sources"] = list(files)
+    entry["errors"] = errors
+    return entry
+
 
 class LayoutPretrainingScript:
     """
-    Converts a directory of TikZ/SVG files into a Hugging Face Dataset 
+    Converts a directory of TikZ/SVG files into a Hugging Face Dataset
     for layout pretraining.
     """
     def __init__(self):
         self.tikz_loader = TikZLoader()
         self.svg_loader = SVGLoader()
 
-    def process_directory(self, input_dir: str, file_type: str = "tikz") -> Dataset:
+    def process_file(self, root: Path, name: str, file_type: str) -> Dict[str, Any]:
+        content = (root / name).read_text()
+        if file_type == "tikz":
+            graph = self.tikz_loader.parse_string(content)
+        else:
+            # Streamed: a large SVG never becomes a full element tree
+            graph = list(self.svg_loader.iter_string(content))
+
+        # Instruction: Describe the layout
+        # In pretraining, we often use the code as the target.
+        instruction = f"Reconstruct the layout defined in this {file_type} snippet."
+
+        return {
+            "instruction": instruction,
+            "code": content,
+            "scene_graph": json.dumps(graph),
+            "metadata": {"source": name, "type": file_type}
+        }
+
+    def process_directory(self, input_dir: str, file_type: str = "tikz", output_dir: Optional[str] = None, workers: Optional[int] = None, recursive: bool = False, shard_size: int = 10_000) -> Dataset:
+        """
+        Parses the TikZ/SVG files in `input_dir` (with `recursive`, in its
+        subdirectories too) into a Dataset.
+
+        Without `output_dir` everything is parsed in this process and held
+        in memory, which suits small directories. With it, ingestion runs
+        sharded across processes (see `process_directory_sharded`) and the
+        shards are opened as the returned Dataset.
+        """
+        if output_dir is not None:
+            self.process_directory_sharded(input_dir, output_dir, file_type, workers=workers, recursive=recursive, shard_size=shard_size)
+            return load_shards(output_dir)
+
         path = Path(input_dir)
+        files = discover_files(input_dir, file_type, recursive)
         samples = []
-        
-        # Determine extension based on type
-        ext = "*.tikz" if file_type == "tikz" else "*.svg"
-        files = list(path.glob(ext))
-        
+
         print(f"Processing {len(files)} {file_type} files...")
-        
-        for i, file in enumerate(files):
+
+        for name in files:
             try:
-                content = file.read_text()
-                if file_type == "tikz":
-                    graph = self.tikz_loader.parse_string(content)
-                else:
-                    graph = self.svg_loader.parse_string(content)
-                
-                # Instruction: Describe the layout
-                # In pretraining, we often use the code as the target.
-                instruction = f"Reconstruct the layout defined in this {file_type} snippet."
-                
-                samples.append({
-                    "instruction": instruction,
-                    "code": content,
-                    "scene_graph": json.dumps(graph),
-                    "metadata": {"source": file.name, "type": file_type}
-                })
+                samples.append(self.process_file(path, name, file_type))
             except Exception as e:
-                print(f"Error processing {file.name}: {e}")
-                
+                print(f"Error processing {name}: {e}")
+
         return Dataset.from_list(samples)
 
+    def process_directory_sharded(self, input_dir: str, output_dir: str, file_type: str = "tikz", workers: Optional[int] = None, recursive: bool = True, shard_size: int = 10_000, fmt: str = "arrow") -> Dict[str, Any]:
+        """
+        Parses every `file_type` file under `input_dir` into shards of at
+        most `shard_size` files in `output_dir`, spread over `workers`
+        processes (default: all CPUs), and returns the manifest.
+
+        Each file is parsed in isolation: failures are listed under the
+        shard's `errors` and counted in `num_errors`. Progress is recorded
+        per shard: re-running skips the files of completed shards (parsed
+        or failed) and packs the rest into new shards, so a shard that was
+        interrupted is parsed again from its first file. Lower `shard_size`
+        to lose less work to an interruption. Memory is bounded by one
+        shard per worker; load the result with `load_shards`.
+        """
+        out = Path(output_dir)
+        out.mkdir(parents=True, exist_ok=True)
+        # Completed shards are matched to files by name, not by position, so
+        # shard_size may change between runs
+        params = {"input_dir": str(Path(input_dir).resolve()), "file_type": file_type, "recursive": recursive, "format": fmt}
+
+        manifest = load_manifest(out)
+        if manifest is not None and manifest["params"] != params:
+            raise ValueError(f"{out} holds shards ingested with different parameters: {manifest['params']}")
+        manifest = {"format": fmt, "params": params, "shards": completed_shards(out, manifest)}
+
+        done = self._ingested_files(manifest)
+        files = [name for name in discover_files(input_dir, file_type, recursive) if name not in done]
+        start = max((int(i) + 1 for i in manifest["shards"]), default=0)
+        chunks = [(start + k, files[offset:offset + shard_size]) for k, offset in enumerate(range(0, len(files), shard_size))]
+        workers = min(workers or os.cpu_count() or 1, max(len(chunks), 1))
+
+        print(f"Processing {len(files)} {file_type} files ({len(done)} already ingested) into {len(chunks)} shards...")
+
+        def record(index: int, entry: Dict[str, Any]):
+            manifest["shards"][str(index)] = entry
+            save_manifest(out, manifest)
+            for name, error in list(entry["errors"].items())[:5]:
+                print(f"Error processing {name}: {error}")
+
+        save_manifest(out, manifest)
+        if workers <= 1:
+            for index, chunk in chunks:
+                record(index, _ingest_shard(input_dir, str(out), index, chunk, file_type, fmt))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(_ingest_shard, input_dir, str(out), index, chunk, file_type, fmt): index for index, chunk in chunks}
+                for future in as_completed(futures):
+                    record(futures[future], future.result())
+
+        manifest["num_rows"] = sum(e["rows"] for e in manifest["shards"].values())
+        manifest["num_errors"] = sum(len(e["errors"]) for e in manifest["shards"].values())
+        save_manifest(out, manifest)
+        return manifest
+
+    def _ingested_files(self, manifest: Dict[str, Any]) -> set:
+        """
+        Files covered by the completed shards (parsed or failed), as listed
+        in their manifest entries.
+        """
+        done = set()
+        for entry in manifest["shards"].values():
+            done.update(entry["sources"])
+        return done
+
 if __name__ == "__main__":
     # Example usage:
     # script = LayoutPretrainingScript()
     # dataset = script.process_directory("data/pretraining/tikz", "tikz")
     # dataset.save_to_disk("data/pretraining_dataset")
+    # manifest = script.process_directory_sharded("data/pretraining/svg", "data/pretraining_shards/svg", "svg")
     print("Bulk loader ready. Run with actual data directories to generate pretraining sets.")
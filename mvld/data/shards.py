@@ -0,0 +1,139 @@
+import json
+import os
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional, Union
+
+import pyarrow as pa
+
+SHARD_FORMATS = ("jsonl", "arrow")
+MANIFEST_FILE = "manifest.json"
+
+
+def shard_name(index: int, fmt: str) -> str:
+    return f"part-{index:05d}.{fmt}"
+
+
+class ShardWriter:
+    """
+    Writes one dataset shard as JSONL or an Arrow IPC stream (the format
+    `datasets.Dataset.from_file` reads). Rows are buffered `batch_rows` at a
+    time and the file is written under a temporary name, then renamed on
+    close, so a shard on disk is always complete.
+    """
+    def __init__(self, path: Union[str, Path], fmt: str = "jsonl", batch_rows: int = 8192, schema: Optional[pa.Schema] = None):
+        if fmt not in SHARD_FORMATS:
+            raise ValueError(f"Unknown shard format '{fmt}'. Available: {', '.join(SHARD_FORMATS)}")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fmt = fmt
+        self.batch_rows = batch_rows
+        self.schema = schema
+        self.rows = 0
+        self._tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        self._buffer: List[Dict[str, Any]] = []
+        self._stream = None
+        self.entry: Optional[Dict[str, Any]] = None
+        self._file = open(self._tmp_path, "w" if fmt == "jsonl" else "wb")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is not None:
+            self.abort()
+        elif self.entry is None:
+            self.close()
+
+    def write(self, row: Dict[str, Any]):
+        self._buffer.append(row)
+        if len(self._buffer) >= self.batch_rows:
+            self._flush()
+
+    def write_all(self, rows: Iterable[Dict[str, Any]]):
+        for row in rows:
+            self.write(row)
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Publishes the shard and returns its manifest entry.
+        """
+        if self.entry is not None:
+            return self.entry
+        self._flush()
+        if self._stream is not None:
+            self._stream.close()
+        elif self.fmt == "arrow" and self.schema is not None:
+            # Empty shard: still a valid stream with the schema
+            pa.ipc.new_stream(self._file, self.schema).close()
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+        self.entry = {"path": self.path.name, "rows": self.rows, "bytes": self.path.stat().st_size}
+        return self.entry
+
+    def abort(self):
+        if self._stream is not None:
+            self._stream.close()
+        self._file.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        if self.fmt == "jsonl":
+            self._file.write("".join(json.dumps(row) + "\n" for row in self._buffer))
+        else:
+            batch = pa.RecordBatch.from_pylist(self._buffer, schema=self.schema)
+            if self._stream is None:
+                self.schema = batch.schema
+                self._stream = pa.ipc.new_stream(self._file, self.schema)
+            self._stream.write_batch(batch)
+        self.rows += len(self._buffer)
+        self._buffer = []
+
+
+def load_manifest(output_dir: Union[str, Path]) -> Optional[Dict[str, Any]]:
+    path = Path(output_dir) / MANIFEST_FILE
+    if not path.exists():
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_manifest(output_dir: Union[str, Path], manifest: Dict[str, Any]):
+    path = Path(output_dir) / MANIFEST_FILE
+    tmp_path = path.with_name(f".{MANIFEST_FILE}.tmp")
+    # Shards complete in any order; keep the file stable
+    manifest["shards"] = dict(sorted(manifest.get("shards", {}).items(), key=lambda item: int(item[0])))
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def completed_shards(output_dir: Union[str, Path], manifest: Optional[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Manifest entries (by shard index) whose files are still on disk.
+    """
+    if not manifest:
+        return {}
+    return {
+        index: entry for index, entry in manifest.get("shards", {}).items()
+        if (Path(output_dir) / entry["path"]).exists()
+    }
+
+
+def load_shards(output_dir: Union[str, Path]):
+    """
+    Opens the shards listed in a manifest, in shard order, as one Dataset.
+    Arrow shards are memory-mapped rather than loaded.
+    """
+    from datasets import Dataset, concatenate_datasets
+
+    manifest = load_manifest(output_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"No {MANIFEST_FILE} in {output_dir}")
+    paths = [str(Path(output_dir) / manifest["shards"][k]["path"]) for k in sorted(manifest["shards"], key=int)]
+    if not paths:
+        return Dataset.from_list([])
+    if manifest["format"] == "arrow":
+        return concatenate_datasets([Dataset.from_file(p) for p in paths])
+    return Dataset.from_json(paths)
@@ -0,0 +1,303 @@
+import re
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+
+# One command letter and its argument text
+SEGMENT_RE = re.compile(r"([MmLlHhVvCcSsQqTtAaZz])([^MmLlHhVvCcSsQqTtAaZz]*)")
+NUMBER_RE = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+# Arc flags are single 0/1 characters and may be written without separators ("a5 5 0 01 10 10")
+_NUM = r"([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)"
+_SEP = r"[\s,]*"
+ARC_RE = re.compile(_SEP.join([_NUM, _NUM, _NUM, "([01])", "([01])", _NUM, _NUM]))
+
+# Anything that cannot appear in well-formed path data
+INVALID_RE = re.compile(r"[^MmLlHhVvCcSsQqTtAaZz\d\s,.eE+-]")
+
+# Arguments per command
+ARITY = {"M": 2, "L": 2, "H": 1, "V": 1, "C": 6, "S": 4, "Q": 4, "T": 2, "A": 7, "Z": 0}
+# Floats per parsed segment, by kind
+SEGMENT_WIDTHS = {"lines": 4, "quads": 6, "cubics": 8, "arcs": 9}
+
+
+class PathSegments:
+    """
+    Absolute-coordinate segments of one or more SVG paths, grouped by kind
+    into NumPy arrays, with `*_owner` giving the path each row came from:
+
+    - `lines` (N, 2, 2): start and end point
+    - `quads` (N, 3, 2) and `cubics` (N, 4, 2): Bézier control points
+    - `arcs` (N, 9): x0, y0, rx, ry, x-axis rotation (degrees),
+      large-arc flag, sweep flag, x1, y1 (SVG endpoint form)
+
+    H/V become lines, S/T are expanded to full control points, relative
+    commands are resolved and closepaths are dropped (their end points are
+    already subpath starts). Degenerate arcs follow the SVG rules: zero
+    length arcs are dropped, zero radii become lines.
+    """
+    def __init__(self, num_paths: int, lines: np.ndarray, quads: np.ndarray, cubics: np.ndarray, arcs: np.ndarray, line_owner: np.ndarray, quad_owner: np.ndarray, cubic_owner: np.ndarray, arc_owner: np.ndarray):
+        self.num_paths = num_paths
+        self.lines = lines
+        self.quads = quads
+        self.cubics = cubics
+        self.arcs = arcs
+        self.line_owner = line_owner
+        self.quad_owner = quad_owner
+        self.cubic_owner = cubic_owner
+        self.arc_owner = arc_owner
+
+    def __len__(self) -> int:
+        return len(self.lines) + len(self.quads) + len(self.cubics) + len(self.arcs)
+
+
+def parse_paths(paths: Sequence[Optional[str]]) -> PathSegments:
+    """
+    Parses path data strings into one PathSegments. Parsing of a path
+    stops at its first malformed command, keeping what came before, as
+    SVG renderers do; None and empty strings give no segments.
+    """
+    out = {kind: [] for kind in SEGMENT_WIDTHS}
+    # Per path, the length of each flat list after it was parsed
+    ends = {kind: [] for kind in SEGMENT_WIDTHS}
+    for d in paths:
+        if d:
+            _parse_path(d, out)
+        for kind, rows in out.items():
+            ends[kind].append(len(rows))
+
+    arrays = {}
+    for kind, width in SEGMENT_WIDTHS.items():
+        counts = np.diff(np.asarray([0] + ends[kind], dtype=np.int64)) // width
+        arrays[kind] = np.asarray(out[kind], dtype=np.float64).reshape(-1, width)
+        arrays[kind + "_owner"] = np.repeat(np.arange(len(paths), dtype=np.int64), counts)
+
+    return PathSegments(
+        len(paths),
+        arrays["lines"].reshape(-1, 2, 2), arrays["quads"].reshape(-1, 3, 2),
+        arrays["cubics"].reshape(-1, 4, 2), arrays["arcs"],
+        arrays["lines_owner"], arrays["quads_owner"], arrays["cubics_owner"], arrays["arcs_owner"]
+    )
+
+
+def _parse_path(d: str, out: Dict[str, List[float]]):
+    # Paths of only path-data characters skip the per-command leftover check
+    strict = INVALID_RE.search(d) is not None
+    # Flat coordinate lists, reshaped by parse_paths
+    lines, quads, cubics, arcs = out["lines"], out["quads"], out["cubics"], out["arcs"]
+    x = y = start_x = start_y = 0.0
+    # Last control point of the previous C/S or Q/T, for smooth commands
+    cubic_ctrl = quad_ctrl = None
+    first = True
+    for command, args in SEGMENT_RE.findall(d):
+        upper = command.upper()
+        relative = command != upper
+        if first and upper != "M":
+            return
+        first = False
+
+        if upper == "Z":
+            x, y = start_x, start_y
+            cubic_ctrl = quad_ctrl = None
+            continue
+
+        if upper == "A":
+            groups = ARC_RE.findall(args)
+            values = [float(v) for group in groups for v in group]
+            complete = len(groups) > 0 and not ARC_RE.sub("", args).strip(" \t\r\n,")
+        else:
+            values = list(map(float, NUMBER_RE.findall(args)))
+            complete = len(values) > 0 and len(values) % ARITY[upper] == 0
+            if complete and strict:
+                complete = not NUMBER_RE.sub("", args).strip(" \t\r\n,")
+
+        arity = ARITY[upper]
+        for k in range(0, len(values) - arity + 1, arity):
+            v = values[k:k + arity]
+            ox, oy = (x, y) if relative else (0.0, 0.0)
+            next_cubic = next_quad = None
+            if upper == "M":
+                if k == 0:
+                    x, y = v[0] + ox, v[1] + oy
+                    start_x, start_y = x, y
+                    continue
+                # Further pairs after a moveto are implicit linetos
+                nx, ny = v[0] + ox, v[1] + oy
+                lines.extend((x, y, nx, ny))
+            elif upper == "L":
+                nx, ny = v[0] + ox, v[1] + oy
+                lines.extend((x, y, nx, ny))
+            elif upper == "H":
+                nx, ny = v[0] + (x if relative else 0.0), y
+                lines.extend((x, y, nx, ny))
+            elif upper == "V":
+                nx, ny = x, v[0] + (y if relative else 0.0)
+                lines.extend((x, y, nx, ny))
+            elif upper == "C":
+                c1x, c1y, c2x, c2y = v[0] + ox, v[1] + oy, v[2] + ox, v[3] + oy
+                nx, ny = v[4] + ox, v[5] + oy
+                cubics.extend((x, y, c1x, c1y, c2x, c2y, nx, ny))
+                next_cubic = (c2x, c2y)
+            elif upper == "S":
+                c1x, c1y = (2 * x - cubic_ctrl[0], 2 * y - cubic_ctrl[1]) if cubic_ctrl else (x, y)
+                c2x, c2y = v[0] + ox, v[1] + oy
+                nx, ny = v[2] + ox, v[3] + oy
+                cubics.extend((x, y, c1x, c1y, c2x, c2y, nx, ny))
+                next_cubic = (c2x, c2y)
+            elif upper == "Q":
+                cx, cy = v[0] + ox, v[1] + oy
+                nx, ny = v[2] + ox, v[3] + oy
+                quads.extend((x, y, cx, cy, nx, ny))
+                next_quad = (cx, cy)
+            elif upper == "T":
+                cx, cy = (2 * x - quad_ctrl[0], 2 * y - quad_ctrl[1]) if quad_ctrl else (x, y)
+                nx, ny = v[0] + ox, v[1] + oy
+                quads.extend((x, y, cx, cy, nx, ny))
+                next_quad = (cx, cy)
+            else:
+                rx, ry = abs(v[0]), abs(v[1])
+                nx, ny = v[5] + ox, v[6] + oy
+                if (nx, ny) != (x, y):
+                    if rx == 0 or ry == 0:
+                        lines.extend((x, y, nx, ny))
+                    else:
+                        arcs.extend((x, y, rx, ry, v[2], v[3], v[4], nx, ny))
+            x, y = nx, ny
+            cubic_ctrl, quad_ctrl = next_cubic, next_quad
+
+        if not complete:
+            return
+
+
+def cubic_extrema(cubics: np.ndarray) -> np.ndarray:
+    """
+    (N, 4, 2) points where each cubic's x or y derivative vanishes inside
+    (0, 1); NaN where there is no such root.
+    """
+    p0, p1, p2, p3 = (cubics[:, i] for i in range(4))
+    # B'(t) / 3 = a t^2 + b t + c per axis
+    a = -p0 + 3 * p1 - 3 * p2 + p3
+    b = 2 * (p0 - 2 * p1 + p2)
+    c = p1 - p0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sq = np.sqrt(b * b - 4 * a * c)
+        linear = np.abs(a) < 1e-12
+        t = np.stack([
+            np.where(linear, -c / b, (-b + sq) / (2 * a)),
+            np.where(linear, np.nan, (-b - sq) / (2 * a))
+        ], axis=1).reshape(len(cubics), 4)
+    t = np.where((t > 0) & (t < 1), t, np.nan)[:, :, None]
+    mt = 1 - t
+    return (
+        mt ** 3 * p0[:, None] + 3 * mt ** 2 * t * p1[:, None]
+        + 3 * mt * t ** 2 * p2[:, None] + t ** 3 * p3[:, None]
+    )
+
+
+def quad_extrema(quads: np.ndarray) -> np.ndarray:
+    """
+    (N, 2, 2) points where each quadratic's x or y derivative vanishes
+    inside (0, 1); NaN where there is no such root.
+    """
+    p0, p1, p2 = (quads[:, i] for i in range(3))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = (p0 - p1) / (p0 - 2 * p1 + p2)
+    t = np.where((t > 0) & (t < 1), t, np.nan)[:, :, None]
+    mt = 1 - t
+    return mt ** 2 * p0[:, None] + 2 * mt * t * p1[:, None] + t ** 2 * p2[:, None]
+
+
+def arc_extrema(arcs: np.ndarray) -> np.ndarray:
+    """
+    (N, 4, 2) axis-extreme points of each elliptical arc that lie on the
+    swept part of the ellipse; NaN for the others. Converts the endpoint
+    form to center form as in the SVG spec (F.6.5), scaling radii that
+    are too small to reach the end point.
+    """
+    x0, y0, rx, ry, angle, large, sweep, x1, y1 = arcs.T
+    phi = np.radians(angle)
+    cos, sin = np.cos(phi), np.sin(phi)
+    dx, dy = (x0 - x1) / 2, (y0 - y1) / 2
+    x1p = cos * dx + sin * dy
+    y1p = -sin * dx + cos * dy
+
+    scale = np.sqrt(np.maximum(x1p ** 2 / rx ** 2 + y1p ** 2 / ry ** 2, 1.0))
+    rx, ry = rx * scale, ry * scale
+    num = rx ** 2 * ry ** 2 - rx ** 2 * y1p ** 2 - ry ** 2 * x1p ** 2
+    den = rx ** 2 * y1p ** 2 + ry ** 2 * x1p ** 2
+    coef = np.sqrt(np.maximum(num, 0.0) / den) * np.where(large == sweep, -1.0, 1.0)
+    cxp, cyp = coef * rx * y1p / ry, -coef * ry * x1p / rx
+    cx = cos * cxp - sin * cyp + (x0 + x1) / 2
+    cy = sin * cxp + cos * cyp + (y0 + y1) / 2
+
+    theta1 = np.arctan2((y1p - cyp) / ry, (x1p - cxp) / rx)
+    theta2 = np.arctan2((-y1p - cyp) / ry, (-x1p - cxp) / rx)
+    delta = theta2 - theta1
+    delta = np.where((sweep == 0) & (delta > 0), delta - 2 * np.pi, delta)
+    delta = np.where((sweep == 1) & (delta < 0), delta + 2 * np.pi, delta)
+
+    # Angles where dx/dtheta = 0 and dy/dtheta = 0, each with its opposite
+    tx = np.arctan2(-ry * sin, rx * cos)
+    ty = np.arctan2(ry * cos, rx * sin)
+    theta = np.stack([tx, tx + np.pi, ty, ty + np.pi], axis=1)
+    swept = np.mod((theta - theta1[:, None]) * np.where(delta < 0, -1.0, 1.0)[:, None], 2 * np.pi) <= np.abs(delta)[:, None]
+
+    ct, st = np.cos(theta), np.sin(theta)
+    points = np.stack([
+        cx[:, None] + rx[:, None] * cos[:, None] * ct - ry[:, None] * sin[:, None] * st,
+        cy[:, None] + rx[:, None] * sin[:, None] * ct + ry[:, None] * cos[:, None] * st
+    ], axis=2)
+    return np.where(swept[:, :, None], points, np.nan)
+
+
+def bounding_boxes(segments: PathSegments) -> np.ndarray:
+    """
+    Exact (num_paths, 4) [xmin, ymin, xmax, ymax] boxes: segment end points
+    plus the curve extrema; NaN rows for paths without segments.
+    """
+    parts = [
+        (segments.lines.reshape(-1, 2), np.repeat(segments.line_owner, 2)),
+        (segments.quads[:, [0, 2]].reshape(-1, 2), np.repeat(segments.quad_owner, 2)),
+        (quad_extrema(segments.quads).reshape(-1, 2), np.repeat(segments.quad_owner, 2)),
+        (segments.cubics[:, [0, 3]].reshape(-1, 2), np.repeat(segments.cubic_owner, 2)),
+        (cubic_extrema(segments.cubics).reshape(-1, 2), np.repeat(segments.cubic_owner, 4)),
+        (segments.arcs[:, [0, 1, 7, 8]].reshape(-1, 2), np.repeat(segments.arc_owner, 2)),
+        (arc_extrema(segments.arcs).reshape(-1, 2), np.repeat(segments.arc_owner, 4)),
+    ]
+    points = np.concatenate([p for p, _ in parts])
+    owner = np.concatenate([o for _, o in parts])
+    valid = ~np.isnan(points).any(axis=1)
+    points, owner = points[valid], owner[valid]
+
+    boxes = np.full((segments.num_paths, 4), np.nan)
+    if len(points) == 0:
+        return boxes
+    order = np.argsort(owner, kind="stable")
+    points, owner = points[order], owner[order]
+    starts = np.flatnonzero(np.r_[True, owner[1:] != owner[:-1]])
+    paths = owner[starts]
+    boxes[paths, :2] = np.minimum.reduceat(points, starts)
+    boxes[paths, 2:] = np.maximum.reduceat(points, starts)
+    return boxes
+
+
+def path_geometry(paths: Sequence[Optional[str]]) -> List[Optional[Dict[str, List[float]]]]:
+    """
+    Per path data string, its bounding box, center, width and height (the
+    keys SVGLoader adds to path primitives), or None if it draws nothing.
+    """
+    boxes = bounding_boxes(parse_paths(paths))
+    geometry = []
+    for xmin, ymin, xmax, ymax in boxes.tolist():
+        if xmin != xmin:
+            geometry.append(None)
+            continue
+        geometry.append({
+            "bbox": [xmin, ymin, xmax, ymax],
+            "center": [(xmin + xmax) / 2, (ymin + ymax) / 2],
+            "width": xmax - xmin,
+            "height": ymax - ymin
+        })
+    return geometry
+
+if __name__ == "__main__":
+    print(path_geometry(["M 10 80 C 40 10, 65 10, 95 80 S 150 150, 180 80", "M 80 80 A 45 45 0 0 0 125 125 L 125 80 Z"]))
+    print("SVG path geometry ready.")
@@ -0,0 +1,80 @@
+import hashlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+import torch
+
+
+class TextEmbeddingCache:
+    """
+    LRU cache of CLIP text embeddings keyed by (model name, prompt).
+
+    The in-memory tier holds at most `max_entries` embeddings. If `cache_dir`
+    is given, every embedding is also written there so later runs can skip
+    `clip.tokenize`/`encode_text` for prompts they have already seen.
+    """
+    def __init__(self, max_entries: int = 4096, cache_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self._entries: "OrderedDict[Tuple[str, str], torch.Tensor]" = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, model_name: str, prompt: str) -> Optional[torch.Tensor]:
+        key = (model_name, prompt)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+        if self.cache_dir:
+            path = self._disk_path(model_name, prompt)
+            if path.exists():
+                try:
+                    features = torch.load(path, map_location="cpu", weights_only=True)
+                except Exception:
+                    features = None
+                if features is not None:
+                    self._remember(key, features)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return features
+
+        self.misses += 1
+        return None
+
+    def put(self, model_name: str, prompt: str, features: torch.Tensor):
+        features = features.detach().cpu().clone()
+        self._remember((model_name, prompt), features)
+
+        if self.cache_dir:
+            path = self._disk_path(model_name, prompt)
+            if not path.exists():
+                # Write then rename so a concurrent reader never sees a partial file
+                tmp_path = path.with_suffix(".tmp")
+                torch.save(features, tmp_path)
+                tmp_path.replace(path)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries)
+        }
+
+    def _remember(self, key: Tuple[str, str], features: torch.Tensor):
+        self._entries[key] = features
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_path(self, model_name: str, prompt: str) -> Path:
+        digest = hashlib.sha256(f"{model_name}\0{prompt}".encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{digest}.pt"
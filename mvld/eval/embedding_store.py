@@ -0,0 +1,240 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Union
+import numpy as np
+
+
+class ImageEmbeddingStore:
+    """
+    Persistent store of normalized CLIP image features keyed by the SHA-256
+    of the image file's bytes.
+
+    Vectors live in a flat float32 file (`embeddings.f32`) that is read
+    through a memory map. `index.json` maps content hashes to row numbers
+    as of the last `close`/`compact`; appends and removals since then go
+    to the append-only `index.log` (one JSON line per change), so a batch
+    costs O(batch), not O(store). `close` folds the log into index.json.
+    The store belongs to a single CLIP model: opening it with a different
+    `model_name` discards the existing vectors. Intended for a single writer.
+    """
+    INDEX_FILE = "index.json"
+    LOG_FILE = "index.log"
+    DATA_FILE = "embeddings.f32"
+
+    def __init__(self, root: str, model_name: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.model_name = model_name
+
+        self.dim: Optional[int] = None
+        self.rows = 0
+        self.entries: Dict[str, int] = {}
+        self._mmap: Optional[np.memmap] = None
+
+        self._load_index()
+
+    @staticmethod
+    def content_hash(image_path: Union[str, Path]) -> str:
+        with open(image_path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, digest: str) -> bool:
+        return digest in self.entries
+
+    def get(self, digest: str) -> Optional[np.ndarray]:
+        row = self.entries.get(digest)
+        if row is None:
+            return None
+        return np.array(self._vectors()[row])
+
+    def matrix(self, digests: Sequence[str]) -> np.ndarray:
+        """
+        Returns the stacked vectors for `digests` (all must be present), ready
+        for a single dot product against text features.
+        """
+        rows = [self.entries[d] for d in digests]
+        if not rows:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+        return np.asarray(self._vectors()[rows])
+
+    def append(self, digests: Sequence[str], vectors: np.ndarray):
+        """
+        Appends normalized feature rows. Digests that are already stored (or
+        repeated within the call) are skipped.
+        """
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(digests), -1)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Embedding dim {vectors.shape[1]} does not match store dim {self.dim}.")
+
+        new_rows = []
+        new_entries = []
+        for digest, vector in zip(digests, vectors):
+            if digest in self.entries:
+                continue
+            self.entries[digest] = self.rows + len(new_rows)
+            new_entries.append({"digest": digest, "row": self.entries[digest], "dim": self.dim})
+            new_rows.append(vector)
+
+        if not new_rows:
+            return
+
+        # Data before log: a crash in between leaves rows the log does not
+        # reference, which the next open truncates
+        with open(self.root / self.DATA_FILE, "ab") as f:
+            f.write(np.stack(new_rows).tobytes())
+        self.rows += len(new_rows)
+        self._mmap = None
+        self._log(new_entries)
+
+    def remove(self, digests: Iterable[str]):
+        """
+        Drops entries from the index. Their rows stay on disk until `compact`.
+        """
+        removed = [digest for digest in digests if self.entries.pop(digest, None) is not None]
+        if removed:
+            self._log([{"digest": digest, "row": None} for digest in removed])
+
+    def compact(self):
+        """
+        Rewrites the data file with only the live rows, in index order.
+        """
+        if len(self.entries) == self.rows:
+            return
+
+        digests = list(self.entries)
+        live = self.matrix(digests)
+        tmp_path = self.root / (self.DATA_FILE + ".tmp")
+        live.astype(np.float32).tofile(tmp_path)
+
+        self._mmap = None
+        tmp_path.replace(self.root / self.DATA_FILE)
+        self.entries = {digest: row for row, digest in enumerate(digests)}
+        self.rows = len(digests)
+        self._save_index()
+
+    def invalidate(self):
+        """
+        Discards every stored vector (e.g. after switching CLIP models).
+        """
+        self._mmap = None
+        data_path = self.root / self.DATA_FILE
+        if data_path.exists():
+            data_path.unlink()
+        self.dim = None
+        self.rows = 0
+        self.entries = {}
+        self._save_index()
+
+    def close(self):
+        """
+        Folds the append log into index.json.
+        """
+        if (self.root / self.LOG_FILE).exists():
+            self._save_index()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model_name": self.model_name,
+            "entries": len(self.entries),
+            "rows_on_disk": self.rows,
+            "dim": self.dim
+        }
+
+    def _vectors(self) -> np.memmap:
+        if self._mmap is None:
+            self._mmap = np.memmap(self.root / self.DATA_FILE, dtype=np.float32, mode="r", shape=(self.rows, self.dim))
+        return self._mmap
+
+    def _load_index(self):
+        index_path = self.root / self.INDEX_FILE
+        if not index_path.exists():
+            # A new store: the header records which model the log belongs to
+            self.invalidate()
+            return
+
+        try:
+            with open(index_path, "r") as f:
+                index = json.load(f)
+        except Exception:
+            index = {}
+
+        data_path = self.root / self.DATA_FILE
+        dim, rows = index.get("dim"), index.get("rows", 0)
+        consistent = (
+            index.get("model_name") == self.model_name
+            and (rows == 0 or (dim and data_path.exists() and data_path.stat().st_size >= rows * dim * 4))
+        )
+        if not consistent:
+            self.invalidate()
+            return
+
+        self.dim = dim
+        self.rows = rows
+        self.entries = index.get("entries", {})
+        clean = self._replay_log(data_path)
+
+        # Drop rows appended by a writer that died before logging them
+        expected_size = self.rows * (self.dim or 0) * 4
+        if data_path.exists() and data_path.stat().st_size > expected_size:
+            with open(data_path, "r+b") as f:
+                f.truncate(expected_size)
+        if not clean:
+            # Later appends must not land behind a torn record
+            self._save_index()
+
+    def _log(self, records: List[Dict[str, Any]]):
+        with open(self.root / self.LOG_FILE, "a") as f:
+            f.write("".join(json.dumps(record) + "\n" for record in records))
+
+    def _replay_log(self, data_path: Path) -> bool:
+        """
+        Applies index.log on top of index.json; False if it stopped at a
+        torn or dangling record.
+        """
+        log_path = self.root / self.LOG_FILE
+        if not log_path.exists():
+            return True
+        with open(log_path, "r") as f:
+            lines = f.read().splitlines()
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Torn last line of a writer that died mid-append
+                return False
+            if record["row"] is None:
+                self.entries.pop(record["digest"], None)
+                continue
+            dim = self.dim or record["dim"]
+            # Only rows whose bytes made it to the data file
+            if record["dim"] != dim or not data_path.exists() or data_path.stat().st_size < (record["row"] + 1) * dim * 4:
+                return False
+            self.dim = dim
+            self.entries[record["digest"]] = record["row"]
+            self.rows = max(self.rows, record["row"] + 1)
+        return True
+
+    def _save_index(self):
+        index = {
+            "model_name": self.model_name,
+            "dim": self.dim,
+            "rows": self.rows,
+            "entries": self.entries
+        }
+        tmp_path = self.root / (self.INDEX_FILE + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(index, f)
+        tmp_path.replace(self.root / self.INDEX_FILE)
+        (self.root / self.LOG_FILE).unlink(missing_ok=True)
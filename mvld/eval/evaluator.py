@@ -1,42 +1,176 @@
 import torch
 import clip
+import numpy as np
 from PIL import Image
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Union, Dict, Any
+from typing import List, Union, Dict, Any, Optional, Sequence, Tuple
 from mvld.eval.base import BaseEvaluator, EvaluatorRegistry
+from mvld.eval.cache import TextEmbeddingCache
+from mvld.eval.embedding_store import ImageEmbeddingStore
+from mvld.eval.scene_batch import PackedSceneGraphs
+from mvld.sandbox.scene_graph import SceneGraphArrays
+
+# (image path, content hash or None, preprocessed tensor or None if stored)
+PreparedImage = Tuple[Union[str, Path], Optional[str], Optional[torch.Tensor]]
+
+# Default radius (scene units) for "positions" constraints
+DEFAULT_POSITION_TOLERANCE = 0.5
 
 @EvaluatorRegistry.register("clip")
 class CLIPScorer(BaseEvaluator):
-    def __init__(self, model_name: str = "ViT-B/32", device: str = None):
+    def __init__(self, model_name: str = "ViT-B/32", device: str = None, text_cache: Optional[TextEmbeddingCache] = None, image_store: Optional[ImageEmbeddingStore] = None):
         if device is None:
             self.device = "cuda" if torch.cuda.is_available() else "cpu"
         else:
             self.device = device
             
+        self.model_name = model_name
         self.model, self.preprocess = clip.load(model_name, device=self.device)
+        self.text_cache = text_cache if text_cache is not None else TextEmbeddingCache()
+        self.image_store = image_store
+        if self.image_store is not None and self.image_store.model_name != model_name:
+            raise ValueError(f"Image embedding store belongs to '{self.image_store.model_name}', not '{model_name}'.")
+
+    def evaluate(self, image_path: Union[str, Path] = None, prompt: str = None, **kwargs) -> Dict[str, Any]:
+        return {"clip_similarity": self.score(image_path, prompt)}
 
     @torch.no_grad()
     def score(self, image_path: Union[str, Path], prompt: str) -> float:
         """
         Calculates the cosine similarity between an image and a text prompt.
         """
-        image = self.preprocess(Image.open(image_path)).unsqueeze(0).to(self.device)
-        text = clip.tokenize([prompt]).to(self.device)
-
-        image_features = self.model.encode_image(image)
-        text_features = self.model.encode_text(text)
+        image_features = self._encode_images([self._prepare_image(image_path)])
+        text_features = self._encode_texts([prompt]).float()
 
         # Normalize features
-        image_features /= image_features.norm(dim=-1, keepdim=True)
         text_features /= text_features.norm(dim=-1, keepdim=True)
 
         similarity = (100.0 * image_features @ text_features.T).item()
         return similarity
 
+    @torch.no_grad()
+    def score_batch(self, image_paths: Sequence[Union[str, Path]], prompts: Sequence[str], batch_size: int = 32, num_workers: int = 4) -> List[float]:
+        """
+        Calculates the cosine similarity for each (image, prompt) pair.
+        Images are hashed, decoded and preprocessed on a thread pool (the next
+        batch is prepared while the current one is encoded) and both towers
+        run on whole batches. Images already in the embedding store are not
+        decoded at all.
+        """
+        if len(image_paths) != len(prompts):
+            raise ValueError(f"score_batch got {len(image_paths)} images but {len(prompts)} prompts.")
+
+        similarities = []
+        starts = range(0, len(image_paths), batch_size)
+
+        with ThreadPoolExecutor(max_workers=num_workers) as pool:
+            def prefetch(start):
+                return [pool.submit(self._prepare_image, p) for p in image_paths[start:start + batch_size]]
+
+            pending = prefetch(0) if len(image_paths) else []
+            for start in starts:
+                current = pending
+                if start + batch_size < len(image_paths):
+                    pending = prefetch(start + batch_size)
+
+                image_features = self._encode_images([f.result() for f in current])
+                text_features = self._encode_texts(prompts[start:start + batch_size]).float()
+                text_features /= text_features.norm(dim=-1, keepdim=True)
+
+                # Row-wise dot product: each image against its own prompt
+                batch_sim = 100.0 * (image_features * text_features).sum(dim=-1)
+                similarities.extend(batch_sim.tolist())
+
+        return similarities
+
+    def _prepare_image(self, image_path: Union[str, Path]) -> PreparedImage:
+        """
+        Returns (path, content hash, preprocessed tensor). The tensor is None
+        when the embedding store already holds this image.
+        """
+        digest = None
+        if self.image_store is not None:
+            digest = ImageEmbeddingStore.content_hash(image_path)
+            if digest in self.image_store:
+                return image_path, digest, None
+
+        return image_path, digest, self._load_image(image_path)
+
+    def _load_image(self, image_path: Union[str, Path]) -> torch.Tensor:
+        with Image.open(image_path) as image:
+            return self.preprocess(image)
+
+    def _encode_images(self, prepared: List[PreparedImage]) -> torch.Tensor:
+        """
+        Returns normalized float32 image features for prepared images, taking
+        stored vectors from the embedding store and encoding the rest in one
+        batch (which are then appended to the store).
+        """
+        features: List[Optional[torch.Tensor]] = [None] * len(prepared)
+
+        to_encode = []
+        for k, (image_path, digest, tensor) in enumerate(prepared):
+            if tensor is None:
+                vector = self.image_store.get(digest)
+                if vector is not None:
+                    features[k] = torch.from_numpy(vector)
+                    continue
+                # Dropped from the store since it was prefetched
+                tensor = self._load_image(image_path)
+            to_encode.append((k, digest, tensor))
+
+        if to_encode:
+            images = torch.stack([tensor for _, _, tensor in to_encode]).to(self.device)
+            encoded = self.model.encode_image(images).float()
+            encoded /= encoded.norm(dim=-1, keepdim=True)
+            if self.image_store is not None:
+                self.image_store.append([digest for _, digest, _ in to_encode], encoded.cpu().numpy())
+            for (k, _, _), vector in zip(to_encode, encoded):
+                features[k] = vector
+
+        return torch.stack([f.to(self.device) for f in features])
+
+    def _encode_texts(self, prompts: Sequence[str]) -> torch.Tensor:
+        """
+        Returns un-normalized text features for `prompts` (a fresh tensor the
+        caller may modify). Each distinct prompt is looked up in the text
+        cache; only misses go through tokenize/encode_text.
+        """
+        unique = list(dict.fromkeys(prompts))
+        cached = {p: self.text_cache.get(self.model_name, p) for p in unique}
+        missing = [p for p in unique if cached[p] is None]
+
+        if missing:
+            features = self.model.encode_text(clip.tokenize(missing).to(self.device))
+            for prompt, feature in zip(missing, features):
+                self.text_cache.put(self.model_name, prompt, feature)
+                cached[prompt] = feature
+
+        return torch.stack([cached[p].to(self.device) for p in prompts])
+
+    def cache_stats(self) -> Dict[str, Any]:
+        stats = {"text_embeddings": self.text_cache.stats()}
+        if self.image_store is not None:
+            stats["image_embeddings"] = self.image_store.stats()
+        return stats
+
+    def close(self):
+        """
+        Persists the image store's index; call once scoring is done.
+        """
+        if self.image_store is not None:
+            self.image_store.close()
+
 @EvaluatorRegistry.register("spatial")
 class SpatialEvaluator(BaseEvaluator):
     """
     Evaluates layout and spatial constraints.
+
+    Supported constraints: "count" (total mobjects), "types" ({type: count},
+    case-insensitive) and "positions" (a list of {"type", "position": [x, y],
+    "tolerance"}; each needs some mobject of that type within `tolerance`
+    of the point in the xy-plane).
     """
     def evaluate(self, scene_graph: List[Dict[str, Any]], expected_constraints: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -61,32 +195,193 @@ class SpatialEvaluator(BaseEvaluator):
             if actual != count:
                 type_match = False
                 break
+
+        position_match = True
+        for constraint in expected_constraints.get("positions", []):
+            t = constraint["type"].lower()
+            x, y = constraint["position"][0], constraint["position"][1]
+            tol2 = self._tol2(constraint)
+            if not any(
+                m["type"].lower() == t and self._dist2(m["position"], x, y) <= tol2
+                for m in scene_graph
+            ):
+                position_match = False
+                break
         
-        drift_score = 0.0 if (counts_match and type_match) else 1.0
+        drift_score = 0.0 if (counts_match and type_match and position_match) else 1.0
 
         return {
             "spatial_drift_score": drift_score,
             "object_count": obj_count,
             "counts_match": counts_match,
             "type_match": type_match,
+            "position_match": position_match,
             "mobjects": [m["type"] for m in scene_graph]
         }
 
+    def evaluate_batch(self, scene_graphs: Union[Sequence[Optional[List[Dict[str, Any]]]], Sequence[Optional[SceneGraphArrays]], PackedSceneGraphs], expected_constraints: Union[Dict[str, Any], Sequence[Dict[str, Any]], None] = None) -> List[Dict[str, Any]]:
+        """
+        Vectorized `evaluate` over many scene graphs; returns exactly the
+        dicts `evaluate` would, in order. Scene graphs may be JSON lists or
+        SceneGraphArrays (packed without touching individual mobjects).
+        `expected_constraints` is either one dict shared by every scene or
+        one dict per scene.
+        """
+        if isinstance(scene_graphs, PackedSceneGraphs):
+            packed = scene_graphs
+        elif any(isinstance(g, SceneGraphArrays) for g in scene_graphs):
+            packed = PackedSceneGraphs.from_arrays(scene_graphs)
+        else:
+            packed = PackedSceneGraphs(scene_graphs)
+        n = len(packed)
+        if expected_constraints is None or isinstance(expected_constraints, dict):
+            shared = expected_constraints or {}
+            per_scene = None
+        else:
+            per_scene = list(expected_constraints)
+            if len(per_scene) != n:
+                raise ValueError("evaluate_batch needs one constraint dict per scene graph.")
+
+        counts = packed.counts
+
+        # Count: NaN marks scenes without a count constraint
+        if per_scene is None:
+            expected_count = np.full(n, np.nan if shared.get("count") is None else shared["count"], dtype=np.float64)
+        else:
+            expected_count = np.array([
+                np.nan if c.get("count") is None else c["count"] for c in per_scene
+            ], dtype=np.float64)
+        counts_match = np.isnan(expected_count) | (counts == expected_count)
+
+        # Types: one (scene, type, count) row per constraint, looked up in a
+        # single scene x type count matrix
+        rows, (keys, wanted) = self._constraint_rows(
+            n, shared if per_scene is None else per_scene,
+            lambda c: [(packed.key_of(t), count) for t, count in c.get("types", {}).items()],
+            fields=2
+        )
+        type_match = np.ones(n, dtype=bool)
+        if len(rows):
+            keys = keys.astype(np.int64)
+            actual = np.where(keys >= 0, packed.key_counts()[rows, np.maximum(keys, 0)], 0)
+            type_match = np.bincount(rows[actual != wanted], minlength=n) == 0
+
+        # Positions: pair every constraint with every mobject of its scene
+        rows, (keys, xs, ys, tol2) = self._constraint_rows(
+            n, shared if per_scene is None else per_scene,
+            lambda c: [
+                (packed.key_of(p["type"]), p["position"][0], p["position"][1], self._tol2(p))
+                for p in c.get("positions", [])
+            ],
+            fields=4
+        )
+        position_match = np.ones(n, dtype=bool)
+        if len(rows):
+            lengths = counts[rows]
+            pair_constraint = np.repeat(np.arange(len(rows)), lengths)
+            pair_start = np.repeat(np.cumsum(lengths) - lengths, lengths)
+            pair_object = packed.offsets[rows][pair_constraint] + np.arange(len(pair_constraint)) - pair_start
+
+            dx = packed.positions[pair_object, 0] - xs[pair_constraint]
+            dy = packed.positions[pair_object, 1] - ys[pair_constraint]
+            hit = (packed.object_keys[pair_object] == keys[pair_constraint]) & (dx * dx + dy * dy <= tol2[pair_constraint])
+
+            satisfied = np.bincount(pair_constraint[hit], minlength=len(rows)) > 0
+            position_match = np.bincount(rows[~satisfied], minlength=n) == 0
+
+        drift = np.where(counts_match & type_match & position_match, 0.0, 1.0)
+
+        results = []
+        for valid, drift_score, obj_count, c_ok, t_ok, p_ok, mobjects in zip(
+            packed.valid.tolist(), drift.tolist(), counts.tolist(), counts_match.tolist(),
+            type_match.tolist(), position_match.tolist(), packed.scene_types()
+        ):
+            if not valid:
+                results.append({"spatial_drift_score": 1.0, "error": "No scene graph data"})
+                continue
+            results.append({
+                "spatial_drift_score": drift_score,
+                "object_count": obj_count,
+                "counts_match": c_ok,
+                "type_match": t_ok,
+                "position_match": p_ok,
+                "mobjects": mobjects
+            })
+        return results
+
+    @staticmethod
+    def _constraint_rows(n: int, constraints: Union[Dict[str, Any], List[Dict[str, Any]]], expand, fields: int) -> Tuple[np.ndarray, List[np.ndarray]]:
+        """
+        Flattens constraints into a scene-index array plus one float64 array
+        per tuple field returned by `expand`. A shared dict is expanded once
+        and tiled over all `n` scenes.
+        """
+        if isinstance(constraints, dict):
+            items = expand(constraints)
+            rows = np.repeat(np.arange(n, dtype=np.int64), len(items))
+            columns = [np.tile(np.asarray(col, dtype=np.float64), n) for col in zip(*items)]
+        else:
+            rows, items = [], []
+            for i, c in enumerate(constraints):
+                expanded = expand(c)
+                rows.extend([i] * len(expanded))
+                items.extend(expanded)
+            rows = np.asarray(rows, dtype=np.int64)
+            columns = [np.asarray(col, dtype=np.float64) for col in zip(*items)]
+        return rows, columns or [np.zeros(0, dtype=np.float64)] * fields
+
+    @staticmethod
+    def _tol2(constraint: Dict[str, Any]) -> float:
+        tolerance = constraint.get("tolerance", DEFAULT_POSITION_TOLERANCE)
+        return tolerance * tolerance
+
+    @staticmethod
+    def _dist2(position: Sequence[float], x: float, y: float) -> float:
+        dx = position[0] - x
+        dy = position[1] - y
+        return dx * dx + dy * dy
+
 
 
 class VisualEvaluator:
-    def __init__(self, device: str = None):
-        self.clip_scorer = CLIPScorer(device=device)
+    def __init__(self, device: str = None, model_name: str = "ViT-B/32", text_cache_dir: Optional[str] = None, image_store_dir: Optional[str] = None):
+        image_store = ImageEmbeddingStore(image_store_dir, model_name) if image_store_dir else None
+        self.clip_scorer = CLIPScorer(
+            model_name=model_name,
+            device=device,
+            text_cache=TextEmbeddingCache(cache_dir=text_cache_dir),
+            image_store=image_store
+        )
         self.spatial_evaluator = SpatialEvaluator()
 
-    def evaluate_render(self, image_path: str, prompt: str, scene_graph: List[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def evaluate_render(self, image_path: str, prompt: str, scene_graph: List[Dict[str, Any]] = None, constraints: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         clip_score = self.clip_scorer.score(image_path, prompt)
-        
-        # Spatial evaluation if scene graph is available
-        spatial_results = {}
-        if scene_graph:
-            spatial_results = self.spatial_evaluator.evaluate(scene_graph, {})
-            
+        spatial_results = self.spatial_evaluator.evaluate(scene_graph, constraints or {}) if scene_graph else {}
+        return self._combine(clip_score, spatial_results)
+
+    def evaluate_renders(self, image_paths: List[str], prompts: List[str], scene_graphs: Optional[List[List[Dict[str, Any]]]] = None, batch_size: int = 32, constraints: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """
+        Batch version of `evaluate_render`; returns one result per image in
+        order. `constraints` holds one SpatialEvaluator constraint dict per
+        image.
+        """
+        clip_scores = self.clip_scorer.score_batch(image_paths, prompts, batch_size=batch_size)
+        if scene_graphs is None:
+            scene_graphs = [None] * len(clip_scores)
+        if constraints is None:
+            constraints = [{}] * len(clip_scores)
+
+        # Spatial evaluation for the renders that have a scene graph
+        spatial = [{} for _ in clip_scores]
+        with_graph = [k for k, graph in enumerate(scene_graphs) if graph]
+        if with_graph:
+            batch = self.spatial_evaluator.evaluate_batch([scene_graphs[k] for k in with_graph], [constraints[k] for k in with_graph])
+            for k, spatial_results in zip(with_graph, batch):
+                spatial[k] = spatial_results
+
+        return [self._combine(score, spatial_results) for score, spatial_results in zip(clip_scores, spatial)]
+
+    def _combine(self, clip_score: float, spatial_results: Dict[str, Any]) -> Dict[str, Any]:
         # Combine scores (heuristic: penalize CLIP score if spatial constraints fail)
         final_score = clip_score
         if spatial_results.get("spatial_drift_score", 0.0) > 0:
@@ -0,0 +1,113 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+from typing import Dict, Any, Optional
+
+from aiohttp import web
+
+
+class MockVLMServer:
+    """
+    Local stand-in for an OpenAI-style chat completions endpoint, for
+    exercising VLMJudge without the real API.
+
+    Each request waits `latency_s` (+/- `jitter_s`) and then fails with
+    probability `error_rate` (a 500 or a 429 with Retry-After) or returns a
+    verdict whose score is a stable function of the request text.
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = 8089, latency_s: float = 0.5, jitter_s: float = 0.1, error_rate: float = 0.0, seed: Optional[int] = None):
+        self.host = host
+        self.port = port
+        self.latency_s = latency_s
+        self.jitter_s = jitter_s
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1/chat/completions"
+
+    def make_app(self) -> web.Application:
+        app = web.Application(client_max_size=64 * 1024 ** 2)
+        app.router.add_post("/v1/chat/completions", self.handle)
+        return app
+
+    async def start(self):
+        self._runner = web.AppRunner(self.make_app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        if self.port == 0:
+            self.port = self._runner.addresses[0][1]
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            payload = await request.json()
+            await asyncio.sleep(max(0.0, self.latency_s + self.rng.uniform(-self.jitter_s, self.jitter_s)))
+
+            if self.rng.random() < self.error_rate:
+                self.errors += 1
+                if self.rng.random() < 0.5:
+                    return web.json_response({"error": {"message": "Rate limit reached"}}, status=429, headers={"Retry-After": "0.1"})
+                return web.json_response({"error": {"message": "Internal server error"}}, status=500)
+
+            return web.json_response(self._completion(payload))
+        finally:
+            self.in_flight -= 1
+
+    def _completion(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        text = json.dumps(payload.get("messages", []), sort_keys=True)
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        score = round(digest[0] / 255, 3)
+        verdict = {"score": score, "feedback": f"Mock verdict ({score:.2f})."}
+        return {
+            "id": "mock-" + digest.hex()[:12],
+            "object": "chat.completion",
+            "model": payload.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": json.dumps(verdict)},
+                "finish_reason": "stop"
+            }]
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local mock VLM judge endpoint.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.5, help="Mean response latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Uniform latency jitter in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 429/500")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = MockVLMServer(args.host, args.port, args.latency, args.jitter, args.error_rate, args.seed)
+    print(f"Mock VLM server listening on {server.url}")
+    web.run_app(server.make_app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+from itertools import chain
+from typing import Dict, Any, List, Optional, Sequence
+import numpy as np
+
+from mvld.sandbox.scene_graph import SceneGraphArrays
+
+
+class PackedSceneGraphs:
+    """
+    Many scene graphs packed into flat NumPy columns.
+
+    Mobjects of scene `i` occupy rows `offsets[i]:offsets[i + 1]` of
+    `positions` (x, y, z), `sizes` (width, height), `type_ids` and
+    `color_ids`. Type and color strings are interned in `types`/`colors`;
+    `type_keys` maps every type id to the id of its lowercased name in
+    `type_names`, which is what type constraints match against. Scenes
+    whose graph is missing or empty are packed with no rows and
+    `valid[i] = False`.
+    """
+    def __init__(self, scene_graphs: Sequence[Optional[List[Dict[str, Any]]]]):
+        type_index: Dict[str, int] = {}
+        color_index: Dict[str, int] = {}
+        lengths = np.fromiter((len(g) if g else 0 for g in scene_graphs), dtype=np.int64, count=len(scene_graphs))
+        mobjects = [m for g in scene_graphs if g for m in g]
+
+        type_ids = [type_index.setdefault(m["type"], len(type_index)) for m in mobjects]
+        color_ids = [color_index.setdefault(m.get("color", "none"), len(color_index)) for m in mobjects]
+
+        # float64 so constraint checks see exactly the values evaluate() sees
+        num_mobjects = len(mobjects)
+        positions = np.fromiter(
+            chain.from_iterable(m["position"] for m in mobjects), dtype=np.float64, count=3 * num_mobjects
+        ).reshape(-1, 3)
+        sizes = np.fromiter(
+            chain.from_iterable((m["width"], m["height"]) for m in mobjects), dtype=np.float64, count=2 * num_mobjects
+        ).reshape(-1, 2)
+
+        self._set_columns(
+            lengths, positions, sizes,
+            np.fromiter(type_ids, dtype=np.int32, count=num_mobjects),
+            np.fromiter(color_ids, dtype=np.int32, count=num_mobjects),
+            list(type_index), list(color_index)
+        )
+
+    @classmethod
+    def from_arrays(cls, scene_graphs: Sequence[Optional[SceneGraphArrays]]) -> "PackedSceneGraphs":
+        """
+        Packs array-backed scene graphs by concatenating their columns; no
+        per-mobject Python work. Evaluating the result matches evaluating
+        each graph's `to_json()`.
+        """
+        present = [g for g in scene_graphs if g is not None and len(g)]
+        lengths = np.fromiter((len(g) if g is not None else 0 for g in scene_graphs), dtype=np.int64, count=len(scene_graphs))
+
+        packed = cls.__new__(cls)
+        if not present:
+            packed._set_columns(lengths, np.zeros((0, 3)), np.zeros((0, 2)), np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32), [], [])
+            return packed
+
+        row_counts = np.asarray([len(g) for g in present], dtype=np.int64)
+        type_ids, types = cls._merge_ids(present, row_counts, "type_ids", "types")
+        color_ids, colors = cls._merge_ids(present, row_counts, "color_ids", "colors")
+
+        packed._set_columns(
+            lengths,
+            np.concatenate([g.position for g in present]).astype(np.float64),
+            np.stack([
+                np.concatenate([g.width for g in present]),
+                np.concatenate([g.height for g in present])
+            ], axis=1).astype(np.float64),
+            type_ids, color_ids, types, colors
+        )
+        return packed
+
+    @staticmethod
+    def _merge_ids(graphs: List[SceneGraphArrays], row_counts: np.ndarray, ids_attr: str, table_attr: str):
+        # Concatenate every graph's local string table, shift each graph's
+        # ids by its table's start, then intern the concatenated table once
+        tables = [getattr(g, table_attr) for g in graphs]
+        table_sizes = np.asarray([len(t) for t in tables], dtype=np.int64)
+        starts = np.cumsum(table_sizes) - table_sizes
+
+        index: Dict[str, int] = {}
+        to_global = np.asarray([index.setdefault(v, len(index)) for t in tables for v in t], dtype=np.int32)
+        local = np.concatenate([getattr(g, ids_attr) for g in graphs]).astype(np.int64)
+        return to_global[local + np.repeat(starts, row_counts)], list(index)
+
+    def _set_columns(self, lengths: np.ndarray, positions: np.ndarray, sizes: np.ndarray, type_ids: np.ndarray, color_ids: np.ndarray, types: List[str], colors: List[str]):
+        self.num_scenes = len(lengths)
+        self.valid = lengths > 0
+        self.offsets = np.zeros(self.num_scenes + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.offsets[1:])
+        self.scene_index = np.repeat(np.arange(self.num_scenes, dtype=np.int64), lengths)
+
+        self.positions = positions
+        self.sizes = sizes
+        self.type_ids = type_ids
+        self.color_ids = color_ids
+        self.types = types
+        self.colors = colors
+
+        self._name_index: Dict[str, int] = {}
+        self.type_keys = np.asarray([self._name_index.setdefault(t.lower(), len(self._name_index)) for t in self.types], dtype=np.int32)
+        self.type_names = list(self._name_index)
+        self.object_keys = self.type_keys[self.type_ids] if len(self.type_ids) else np.zeros(0, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return self.num_scenes
+
+    @property
+    def counts(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def key_of(self, type_name: str) -> int:
+        """
+        Id of a (case-insensitive) type name, or -1 if no scene contains it.
+        """
+        return self._name_index.get(type_name.lower(), -1)
+
+    def key_counts(self) -> np.ndarray:
+        """
+        (num_scenes, num_type_names) matrix of mobject counts per type name.
+        """
+        width = max(len(self.type_names), 1)
+        flat = np.bincount(self.scene_index * width + self.object_keys, minlength=self.num_scenes * width)
+        return flat.reshape(self.num_scenes, width)
+
+    def scene_types(self) -> List[List[str]]:
+        """
+        Type names of every scene's mobjects, in scene graph order.
+        """
+        names = [self.types[t] for t in self.type_ids.tolist()]
+        offsets = self.offsets.tolist()
+        return [names[offsets[i]:offsets[i + 1]] for i in range(self.num_scenes)]
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+
+class VerdictCache:
+    """
+    Persistent SQLite cache of JSON verdicts (VLM judgements, pair checks).
+
+    Keys are hashes of whatever identifies a verdict; see `make_key`.
+    Entries older than `ttl_s` are treated as misses and dropped, and the
+    least recently used entries are evicted once there are more than
+    `max_entries`. Safe to share between threads.
+    """
+    def __init__(self, path: str = "results/cache/verdicts.sqlite", ttl_s: Optional[float] = 30 * 24 * 3600, max_entries: Optional[int] = 1_000_000):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS verdicts (key TEXT PRIMARY KEY, verdict TEXT, created REAL, last_access REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS verdicts_last_access ON verdicts (last_access)")
+        self._db.commit()
+        self._count = self._db.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0]
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        payload = json.dumps(parts, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT verdict, created FROM verdicts WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            verdict, created = row
+            if self.ttl_s is not None and now - created > self.ttl_s:
+                self._db.execute("DELETE FROM verdicts WHERE key = ?", (key,))
+                self._db.commit()
+                self._count -= 1
+                self.expired += 1
+                self.misses += 1
+                return None
+
+            self._db.execute("UPDATE verdicts SET last_access = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.hits += 1
+        return json.loads(verdict)
+
+    def put(self, key: str, verdict: Dict[str, Any]):
+        now = time.time()
+        with self._lock:
+            exists = self._db.execute("SELECT 1 FROM verdicts WHERE key = ?", (key,)).fetchone() is not None
+            self._db.execute(
+                "INSERT OR REPLACE INTO verdicts (key, verdict, created, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(verdict), now, now)
+            )
+            if not exists:
+                self._count += 1
+            self._evict()
+            self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": self._count
+        }
+
+    def purge_expired(self) -> int:
+        """
+        Deletes every entry past its TTL and returns how many were removed.
+        """
+        if self.ttl_s is None:
+            return 0
+        with self._lock:
+            removed = self._db.execute("DELETE FROM verdicts WHERE created < ?", (time.time() - self.ttl_s,)).rowcount
+            self._db.commit()
+            self._count -= removed
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM verdicts")
+            self._db.commit()
+            self._count = 0
+
+    def _evict(self):
+        # Caller holds the lock
+        if self.max_entries is None or self._count <= self.max_entries:
+            return
+        excess = self._count - self.max_entries
+        self._db.execute(
+            "DELETE FROM verdicts WHERE key IN (SELECT key FROM verdicts ORDER BY last_access ASC LIMIT ?)",
+            (excess,)
+        )
+        self._count -= excess
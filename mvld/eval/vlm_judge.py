@@ -1,21 +1,129 @@
+import asyncio
 import base64
-import requests
+import hashlib
+import json
+import random
+import re
+import threading
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Sequence, Tuple
+
+import aiohttp
+
+from mvld.eval.verdict_cache import VerdictCache
+
+# Prompt sent with every render. Part of the verdict identity: changing it
+# changes what a score means.
+JUDGE_TEMPLATE = (
+    "Evaluate this Manim render against the prompt: '{prompt}'. Focus on spatial accuracy, "
+    "object counts, and colors. Reply with JSON: {{\"score\": <0 to 1>, \"feedback\": \"<brief feedback>\"}}."
+)
+
+# Responses worth retrying; other 4xx are the request's fault
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
 
 class VLMJudge:
     """
     Uses a Vision-Language Model (VLM) to judge the quality of a Manim render.
+
+    Requests go through one pooled aiohttp session with at most
+    `max_concurrency` in flight. Transient failures (timeouts, connection
+    errors, 429/5xx) are retried up to `max_retries` times with exponential
+    backoff. `judge_render`/`judge_many` are blocking wrappers around the
+    async API for callers without an event loop: they run on one background
+    event loop thread owned by the judge, so every call reuses the same
+    session and its open connections. `close()` (or `with judge:`) shuts
+    both down.
+
+    With a `cache`, verdicts are looked up by (image content hash, prompt,
+    model, JUDGE_TEMPLATE) before any request is made, and successful
+    verdicts are stored. `cache_only` never calls the API: misses come back
+    as errors, for offline re-analysis of past runs.
     """
-    def __init__(self, api_key: str = "MOCK_KEY", model: str = "gpt-4o"):
+    def __init__(self, api_key: str = "MOCK_KEY", model: str = "gpt-4o", api_url: str = "https://api.openai.com/v1/chat/completions", max_concurrency: int = 8, max_retries: int = 3, timeout_s: float = 60.0, backoff_s: float = 0.5, cache: Optional[VerdictCache] = None, cache_only: bool = False):
         self.api_key = api_key
         self.model = model
-        self.api_url = "https://api.openai.com/v1/chat/completions" # Generic URL
+        self.api_url = api_url # Generic URL
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.timeout_s = timeout_s
+        self.backoff_s = backoff_s
+        self.cache = cache
+        self.cache_only = cache_only
+        if cache_only and cache is None:
+            raise ValueError("cache_only requires a verdict cache.")
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
 
     def judge_render(self, image_path: str, prompt: str) -> Dict[str, Any]:
         """
         Sends the image and prompt to a VLM for qualitative feedback.
         """
+        return self._run(self.judge_render_async(image_path, prompt))
+
+    def judge_many(self, image_paths: Sequence[str], prompts: Sequence[str]) -> List[Dict[str, Any]]:
+        """
+        Judges (image, prompt) pairs concurrently; results are in input order.
+        """
+        return self._run(self.judge_many_async(image_paths, prompts))
+
+    def close(self):
+        """
+        Closes the session and stops the background loop, if started.
+        """
+        if self._loop is None:
+            return
+        self._run(self.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop, self._thread = None, None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self):
+        if self._session is not None:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+        self._semaphore = None
+
+    def _run(self, coro):
+        # Lazily start the loop thread the blocking API runs on
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="vlm-judge-loop", daemon=True)
+                self._thread.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def judge_many_async(self, image_paths: Sequence[str], prompts: Sequence[str]) -> List[Dict[str, Any]]:
+        if len(image_paths) != len(prompts):
+            raise ValueError("judge_many needs one prompt per image.")
+        return list(await asyncio.gather(*(
+            self.judge_render_async(image_path, prompt) for image_path, prompt in zip(image_paths, prompts)
+        )))
+
+    async def judge_render_async(self, image_path: Optional[str], prompt: str) -> Dict[str, Any]:
+        if not image_path:
+            # Failed renders have no image; judge them as errors, not a crash of the batch
+            return {"error": "No image to judge", "score": 0.0, "vlm_model": self.model}
+
         if self.api_key == "MOCK_KEY":
             # Return a realistic mock response for researchers
             return {
@@ -25,16 +133,58 @@ class VLMJudge:
                 "vlm_model": self.model
             }
 
-        # Encode image to base64
-        with open(image_path, "rb") as image_file:
-            encoded_image = base64.b64encode(image_file.read()).decode('utf-8')
+        try:
+            image_bytes = Path(image_path).read_bytes()
+        except OSError as e:
+            return {"error": str(e), "score": 0.0, "vlm_model": self.model}
 
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.api_key}"
-        }
+        key = None
+        if self.cache is not None:
+            key = self.cache_key(hashlib.sha256(image_bytes).hexdigest(), prompt)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return {**cached, "cached": True}
+            if self.cache_only:
+                return {"error": "No cached verdict (cache-only mode)", "score": 0.0, "vlm_model": self.model, "cached": False}
+
+        session = self._get_session()
+        async with self._semaphore:
+            verdict = await self._post_with_retries(session, self._build_payload(image_bytes, prompt))
+
+        if key is not None and "error" not in verdict:
+            self.cache.put(key, verdict)
+        return {**verdict, "cached": False}
 
-        payload = {
+    def cache_key(self, image_digest: str, prompt: str) -> str:
+        return VerdictCache.make_key("vlm_judge", image_digest, prompt, self.model, JUDGE_TEMPLATE)
+
+    def cache_stats(self) -> Optional[Dict[str, Any]]:
+        return self.cache.stats() if self.cache is not None else None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Created lazily so it binds to the running event loop; a session
+        # cannot be used from another loop
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            if self._session is not None and not self._session.closed and self._session_loop.is_running():
+                asyncio.run_coroutine_threadsafe(self._session.close(), self._session_loop)
+            self._session_loop = loop
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+                timeout=aiohttp.ClientTimeout(total=self.timeout_s),
+                headers={
+                    "Content-Type": "application/json",
+                    "Authorization": f"Bearer {self.api_key}"
+                }
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    def _build_payload(self, image_bytes: bytes, prompt: str) -> Dict[str, Any]:
+        # Encode image to base64
+        encoded_image = base64.b64encode(image_bytes).decode('utf-8')
+
+        return {
             "model": self.model,
             "messages": [
                 {
@@ -42,12 +192,12 @@ class VLMJudge:
                     "content": [
                         {
                             "type": "text",
-                            "text": f"Evaluate this Manim render against the prompt: '{prompt}'. Focus on spatial accuracy, object counts, and colors. Provide a score from 0 to 1 and brief feedback."
+                            "text": JUDGE_TEMPLATE.format(prompt=prompt)
                         },
                         {
                             "type": "image_url",
                             "image_url": {
-                                "url": f"data:image/jpeg;base64,{encoded_image}"
+                                "url": f"data:image/png;base64,{encoded_image}"
                             }
                         }
                     ]
@@ -56,17 +206,61 @@ class VLMJudge:
             "max_tokens": 300
         }
 
+    async def _post_with_retries(self, session: aiohttp.ClientSession, payload: Dict[str, Any]) -> Dict[str, Any]:
+        error = None
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                async with session.post(self.api_url, json=payload) as response:
+                    if response.status == 200:
+                        return self._parse_response(await response.json(), attempt)
+                    error = f"HTTP {response.status}: {(await response.text())[:200]}"
+                    if response.status not in RETRYABLE_STATUS:
+                        break
+                    retry_after = response.headers.get("Retry-After")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = f"{type(e).__name__}: {e}"
+
+            if attempt < self.max_retries:
+                await asyncio.sleep(self._backoff(attempt, retry_after))
+
+        return {"error": error, "score": 0.0, "vlm_model": self.model, "attempts": attempt + 1}
+
+    def _backoff(self, attempt: int, retry_after: Optional[str]) -> float:
+        if retry_after is not None:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        # Exponential with full jitter so retries from a batch don't sync up
+        return random.uniform(0, self.backoff_s * 2 ** attempt)
+
+    def _parse_response(self, result: Dict[str, Any], attempt: int) -> Dict[str, Any]:
+        verdict = {"raw_response": result, "score": 0.0, "feedback": "", "vlm_model": self.model, "attempts": attempt + 1}
         try:
-            response = requests.post(self.api_url, headers=headers, json=payload)
-            result = response.json()
-            # Parse result (simplified)
-            return {
-                "raw_response": result,
-                "score": 1.0, # Would be parsed from result['choices'][0]['message']['content']
-                "vlm_model": self.model
-            }
-        except Exception as e:
-            return {"error": str(e), "score": 0.0}
+            content = result["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            verdict["error"] = "Malformed VLM response"
+            return verdict
+
+        score, feedback = self._parse_verdict(content)
+        verdict["score"] = score
+        verdict["feedback"] = feedback
+        return verdict
+
+    def _parse_verdict(self, content: str) -> Tuple[float, str]:
+        match = re.search(r"\{.*\}", content, re.DOTALL)
+        if match:
+            try:
+                parsed = json.loads(match.group(0))
+                return min(max(float(parsed.get("score", 0.0)), 0.0), 1.0), str(parsed.get("feedback", ""))
+            except (ValueError, TypeError, AttributeError):
+                pass
+        # Free-text reply: take the first number in [0, 1] as the score
+        for number in re.findall(r"\d*\.?\d+", content):
+            if 0.0 <= float(number) <= 1.0:
+                return float(number), content
+        return 0.0, content
 
 if __name__ == "__main__":
     judge = VLMJudge()
@@ -0,0 +1,356 @@
+import math
+from collections import Counter
+from typing import Dict, Any, Iterable, List
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Quantiles reported by ResultsAggregator.summary()
+REPORT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99)
+
+# Histogram range of ResultsAggregator: CLIP scores are 100 * cosine
+# similarity, so one bin per similarity point
+SCORE_LOW = 0.0
+SCORE_HIGH = 100.0
+SCORE_BINS = 100
+
+
+class RunningStats:
+    """
+    Count, mean, variance, min and max in one pass (Welford), updated a
+    batch at a time and merged across shards with Chan's parallel formula.
+    """
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values: Iterable[float]):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if not len(values):
+            return
+        batch = RunningStats()
+        batch.count = len(values)
+        batch.mean = float(values.mean())
+        batch.m2 = float(((values - batch.mean) ** 2).sum())
+        batch.min = float(values.min())
+        batch.max = float(values.max())
+        self.merge(batch)
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        if other.count == 0:
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self) -> float:
+        # Population variance, like np.var
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"count": self.count, "mean": self.mean, "m2": self.m2, "min": self.min, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RunningStats":
+        stats = cls()
+        stats.count = data["count"]
+        stats.mean = data["mean"]
+        stats.m2 = data["m2"]
+        stats.min = data["min"]
+        stats.max = data["max"]
+        return stats
+
+
+class QuantileSketch:
+    """
+    DDSketch: values are counted in logarithmic buckets whose width is set
+    by `relative_accuracy`, so every quantile estimate is within that
+    relative error of a true sample value. Sketches with the same accuracy
+    merge exactly by adding bucket counts.
+
+    Memory is bounded by `max_buckets` per sign; past that the buckets
+    nearest zero are collapsed, which only degrades the smallest
+    quantiles.
+    """
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048, min_value: float = 1e-9):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(f"relative_accuracy must be in (0, 1), got {relative_accuracy}.")
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        # Magnitudes below min_value are counted as zero
+        self.min_value = min_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def update(self, values: Iterable[float]):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        magnitude = np.abs(values)
+        nonzero = magnitude >= self.min_value
+        self.zero_count += int((~nonzero).sum())
+        self.count += len(values)
+
+        for store, mask in ((self.positive, nonzero & (values > 0)), (self.negative, nonzero & (values < 0))):
+            if not mask.any():
+                continue
+            keys = np.ceil(np.log(magnitude[mask]) / self._log_gamma).astype(np.int64)
+            unique, counts = np.unique(keys, return_counts=True)
+            for key, count in zip(unique.tolist(), counts.tolist()):
+                store[key] = store.get(key, 0) + count
+            self._collapse(store)
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy.")
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in other_store.items():
+                store[key] = store.get(key, 0) + count
+            self._collapse(store)
+        self.zero_count += other.zero_count
+        self.count += other.count
+        return self
+
+    def quantile(self, q: float) -> float:
+        if not 0 <= q <= 1:
+            raise ValueError(f"Quantile must be in [0, 1], got {q}.")
+        if self.count == 0:
+            return math.nan
+
+        rank = q * (self.count - 1)
+        seen = 0
+        # Ascending value order: most negative, zero, then positive
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.positive)) if self.positive else 0.0
+
+    def quantiles(self, qs: Iterable[float]) -> Dict[str, float]:
+        return {f"p{round(q * 100, 2):g}": self.quantile(q) for q in qs}
+
+    def _value(self, key: int) -> float:
+        # Midpoint (in relative terms) of bucket (gamma^(key-1), gamma^key]
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def _collapse(self, store: Dict[int, int]):
+        if len(store) <= self.max_buckets:
+            return
+        keys = sorted(store)
+        excess = keys[:len(keys) - self.max_buckets + 1]
+        store[excess[-1]] += sum(store.pop(k) for k in excess[:-1])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "max_buckets": self.max_buckets,
+            "min_value": self.min_value,
+            "positive": {str(k): v for k, v in self.positive.items()},
+            "negative": {str(k): v for k, v in self.negative.items()},
+            "zero_count": self.zero_count,
+            "count": self.count
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QuantileSketch":
+        sketch = cls(data["relative_accuracy"], data["max_buckets"], data["min_value"])
+        sketch.positive = {int(k): v for k, v in data["positive"].items()}
+        sketch.negative = {int(k): v for k, v in data["negative"].items()}
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        return sketch
+
+
+class Histogram:
+    """
+    Fixed-bin histogram over [low, high), with separate underflow and
+    overflow counts. Histograms with the same bins merge by addition.
+    """
+    def __init__(self, low: float = 0.0, high: float = 1.0, bins: int = 20):
+        if not high > low or bins < 1:
+            raise ValueError(f"Invalid histogram range [{low}, {high}) with {bins} bins.")
+        self.low = low
+        self.high = high
+        self.bins = bins
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+
+    @property
+    def edges(self) -> np.ndarray:
+        return np.linspace(self.low, self.high, self.bins + 1)
+
+    def update(self, values: Iterable[float]):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        self.underflow += int((values < self.low).sum())
+        self.overflow += int((values >= self.high).sum())
+        inside = values[(values >= self.low) & (values < self.high)]
+        index = ((inside - self.low) * (self.bins / (self.high - self.low))).astype(np.int64)
+        self.counts += np.bincount(np.minimum(index, self.bins - 1), minlength=self.bins)
+
+    def merge(self, other: "Histogram") -> "Histogram":
+        if (other.low, other.high, other.bins) != (self.low, self.high, self.bins):
+            raise ValueError("Cannot merge histograms with different bins.")
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "low": self.low,
+            "high": self.high,
+            "bins": self.bins,
+            "counts": self.counts.tolist(),
+            "underflow": self.underflow,
+            "overflow": self.overflow
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Histogram":
+        hist = cls(data["low"], data["high"], data["bins"])
+        hist.counts = np.asarray(data["counts"], dtype=np.int64)
+        hist.underflow = data["underflow"]
+        hist.overflow = data["overflow"]
+        return hist
+
+
+class ResultsAggregator:
+    """
+    One-pass, bounded-memory summary of pipeline results: sample and
+    render-status counts, plus running stats, a quantile sketch and a
+    histogram of the scores of successful renders.
+
+    Feed it record batches (or column dicts) with `update_batch`. Partial
+    aggregates from shards or workers combine with `merge`, and round-trip
+    through `to_dict`/`from_dict` so they can be written to disk first.
+    """
+    def __init__(self, low: float = SCORE_LOW, high: float = SCORE_HIGH, bins: int = SCORE_BINS, relative_accuracy: float = 0.01):
+        self.total = 0
+        self.render_successes = 0
+        self.status_counts: Dict[str, int] = {}
+        self.scores = RunningStats()
+        self.sketch = QuantileSketch(relative_accuracy)
+        self.histogram = Histogram(low, high, bins)
+
+    def update_batch(self, batch):
+        """
+        Adds a pyarrow RecordBatch/Table or a dict of columns with
+        `render_success`, `score` and optionally `render_status`.
+        """
+        if isinstance(batch, dict):
+            success = np.asarray([bool(s) for s in batch["render_success"]], dtype=bool)
+            scores = np.asarray([np.nan if s is None else s for s in batch["score"]], dtype=np.float64)
+            statuses = Counter(str(s) for s in batch.get("render_status") or [None] * len(success))
+        else:
+            success = pc.fill_null(batch.column("render_success"), False).to_numpy(zero_copy_only=False)
+            scores = pc.fill_null(pc.cast(batch.column("score"), pa.float64()), math.nan).to_numpy(zero_copy_only=False)
+            statuses = Counter()
+            if "render_status" in batch.column_names:
+                for item in pc.value_counts(batch.column("render_status")).to_pylist():
+                    statuses[str(item["values"])] += item["counts"]
+            else:
+                statuses["None"] = len(success)
+
+        self.total += len(success)
+        self.render_successes += int(success.sum())
+        for status, count in statuses.items():
+            self.status_counts[status] = self.status_counts.get(status, 0) + count
+
+        ok = scores[success]
+        ok = ok[~np.isnan(ok)]
+        self.scores.update(ok)
+        self.sketch.update(ok)
+        self.histogram.update(ok)
+
+    def update(self, entries: Iterable[Dict[str, Any]]):
+        entries = list(entries)
+        self.update_batch({
+            name: [e.get(name) for e in entries] for name in ("render_success", "score", "render_status")
+        })
+
+    def merge(self, other: "ResultsAggregator") -> "ResultsAggregator":
+        self.total += other.total
+        self.render_successes += other.render_successes
+        for status, count in other.status_counts.items():
+            self.status_counts[status] = self.status_counts.get(status, 0) + count
+        self.scores.merge(other.scores)
+        self.sketch.merge(other.sketch)
+        self.histogram.merge(other.histogram)
+        return self
+
+    def summary(self, quantiles: Iterable[float] = REPORT_QUANTILES) -> Dict[str, Any]:
+        # Geometry-only runs render without a score, so success is counted apart
+        successes = self.scores.count
+        return {
+            "total_samples": self.total,
+            "render_success_rate": self.render_successes / self.total if self.total else 0,
+            "mean_clip_score": self.scores.mean if successes else 0,
+            "score_std": self.scores.std,
+            "score_min": self.scores.min if successes else None,
+            "score_max": self.scores.max if successes else None,
+            "score_quantiles": self.sketch.quantiles(quantiles) if successes else {},
+            # Scores outside the histogram range, which its bins do not show
+            "score_underflow": self.histogram.underflow,
+            "score_overflow": self.histogram.overflow,
+            "render_status": dict(sorted(self.status_counts.items()))
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "render_successes": self.render_successes,
+            "status_counts": self.status_counts,
+            "scores": self.scores.to_dict(),
+            "sketch": self.sketch.to_dict(),
+            "histogram": self.histogram.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ResultsAggregator":
+        agg = cls()
+        agg.total = data["total"]
+        agg.render_successes = data["render_successes"]
+        agg.status_counts = dict(data["status_counts"])
+        agg.scores = RunningStats.from_dict(data["scores"])
+        agg.sketch = QuantileSketch.from_dict(data["sketch"])
+        agg.histogram = Histogram.from_dict(data["histogram"])
+        return agg
+
+    @classmethod
+    def merge_all(cls, aggregators: List["ResultsAggregator"]) -> "ResultsAggregator":
+        merged = cls.from_dict(aggregators[0].to_dict()) if aggregators else cls()
+        for agg in aggregators[1:]:
+            merged.merge(agg)
+        return merged
+
+
+if __name__ == "__main__":
+    agg = ResultsAggregator()
+    print("Results Aggregator ready.")
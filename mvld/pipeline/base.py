@@ -23,10 +23,10 @@ class PipelineRegistry:
         return wrapper
 
     @classmethod
-    def get(cls, name: str) -> BasePipeline:
+    def get(cls, name: str, **kwargs) -> BasePipeline:
         if name not in cls._pipelines:
             raise ValueError(f"Pipeline '{name}' not found in registry.")
-        return cls._pipelines[name]()
+        return cls._pipelines[name](**kwargs)
 
     @classmethod
     def list_pipelines(cls) -> List[str]:
@@ -1,34 +1,45 @@
 import json
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from rich.console import Console
 
+from mvld.pipeline.results_store import ResultsStore
+
 console = Console()
 
 class NegativeMiner:
     """
     Identifies "hard negatives": samples where code runs but visual output is wrong.
     """
-    def __init__(self, results_path: str = "results/rft/rft_results.json"):
-        self.results_path = Path(results_path)
+    def __init__(self, results_path: Optional[str] = None, store_dir: str = "results/store", runs: Optional[List[str]] = None):
+        # Reads from the columnar results store; `runs` limits mining to those runs.
+        # A `results_path` (rft_results.jsonl or legacy .json) is imported
+        # into the store first and mined as its own run.
+        self.results_path = results_path
+        self.store = ResultsStore(store_dir)
+        self.runs = runs
 
     def mine_hard_negatives(self, max_score: float = 0.5, output_path: str = "results/hard_negatives.json") -> List[Dict[str, Any]]:
         """
         Filters RFT results for successful renders with low CLIP similarity.
         """
-        if not self.results_path.exists():
-            console.print(f"[bold red]Results not found at {self.results_path}[/bold red]")
-            return []
+        runs = self.runs
+        if self.results_path is not None:
+            run_id = self.store.import_results_file(self.results_path)
+            if run_id is None:
+                console.print(f"[bold red]Results not found at {self.results_path}[/bold red]")
+                return []
+            runs = [run_id]
 
-        with open(self.results_path, "r") as f:
-            results = json.load(f)
+        if not self.store.runs():
+            console.print(f"[bold red]No results in store at {self.store.root}[/bold red]")
+            return []
 
-        hard_negatives = [
-            r for r in results 
-            if r["render_success"] and r["score"] <= max_score
-        ]
+        # The filter is pushed down to the scan; only matching rows are decoded
+        total = self.store.count(runs=runs)
+        hard_negatives = list(self.store.iter_query("render_success and score <= max_score", runs=runs, params={"max_score": max_score}))
 
-        console.print(f"Mined {len(hard_negatives)} hard negatives (Score <= {max_score}) out of {len(results)} total samples.")
+        console.print(f"Mined {len(hard_negatives)} hard negatives (Score <= {max_score}) out of {total} total samples.")
         
         # Save results
         out = Path(output_path)
@@ -1,4 +1,8 @@
+from pathlib import Path
+from typing import Dict, Any, List, Optional
 from mvld.sandbox.executor import ManimSandbox
+from mvld.sandbox.profiles import DEFAULT_PROFILE
+from mvld.eval.verdict_cache import VerdictCache
 from mvld.eval.vlm_judge import VLMJudge
 from rich.console import Console
 
@@ -8,52 +12,83 @@ class RefinementLoop:
     """
     Orchestrates a loop between a Coder (LLM) and a Critic (VLM).
     """
-    def __init__(self, output_dir: str = "results/refinement"):
-        self.sandbox = ManimSandbox(output_dir=output_dir)
-        self.judge = VLMJudge()
+    def __init__(self, output_dir: str = "results/refinement", profile: str = DEFAULT_PROFILE, verdict_cache_path: Optional[str] = "results/cache/vlm_verdicts.sqlite"):
+        self.sandbox = ManimSandbox(output_dir=output_dir, profile=profile)
+        self.judge = VLMJudge(cache=VerdictCache(verdict_cache_path) if verdict_cache_path else None)
         self.max_iterations = 3
 
     def run_refinement(self, prompt: str, initial_code: str):
         """
         Iteratively refines code based on visual feedback.
         """
-        current_code = initial_code
-        history = []
+        return self.run_refinement_batch([prompt], [initial_code])[0]
+
+    def run_refinement_batch(self, prompts: List[str], initial_codes: List[str]) -> List[List[Dict[str, Any]]]:
+        """
+        Refines several programs side by side: each iteration renders every
+        unfinished program in one `map_scripts` call and judges the renders
+        in one `judge_many` call. Returns one history per program.
+        """
+        if len(prompts) != len(initial_codes):
+            raise ValueError("run_refinement_batch needs one prompt per program.")
+        scripts_dir = self.sandbox.output_dir / "refine_scripts"
+        scripts_dir.mkdir(parents=True, exist_ok=True)
+        current = list(initial_codes)
+        histories: List[List[Dict[str, Any]]] = [[] for _ in prompts]
+        active = list(range(len(prompts)))
 
         for i in range(self.max_iterations):
-            console.print(f"[bold cyan]Iteration {i+1}:[/bold cyan] Rendering and Judging...")
-            
-            # 1. Render
-            temp_script = Path("temp_refine.py")
-            temp_script.write_text(current_code)
-            res = self.sandbox.run_script(temp_script)
-            
-            if not res["success"]:
-                feedback = f"Execution Error: {res['error']}"
-                score = 0.0
-            else:
-                # 2. Judge (Critic)
-                judge_res = self.judge.judge_render(res["image_path"], prompt)
-                feedback = judge_res["feedback"]
-                score = judge_res["score"]
-
-            console.print(f"Score: [green]{score}[/green] | Feedback: {feedback}")
-            
-            history.append({
-                "iteration": i,
-                "code": current_code,
-                "score": score,
-                "feedback": feedback
-            })
-
-            if score >= 0.95:
-                console.print("[bold green]Threshold met![/bold green]")
+            if not active:
                 break
+            console.print(f"[bold cyan]Iteration {i+1}:[/bold cyan] Rendering and Judging {len(active)} programs...")
+
+            # 1. Render
+            scripts = []
+            for k in active:
+                script = scripts_dir / f"refine_{k}.py"
+                script.write_text(current[k])
+                scripts.append(script)
+            renders = list(self.sandbox.map_scripts(scripts))
+
+            # 2. Judge (Critic) every successful render in one batch
+            rendered = [(k, res) for k, res in zip(active, renders) if res["success"]]
+            verdicts = dict(zip(
+                (k for k, _ in rendered),
+                self.judge.judge_many([res["image_path"] for _, res in rendered], [prompts[k] for k, _ in rendered])
+            ))
+
+            still_active = []
+            for k, res in zip(active, renders):
+                if k in verdicts:
+                    feedback = verdicts[k].get("feedback") or verdicts[k].get("error", "")
+                    score = verdicts[k]["score"]
+                else:
+                    feedback = f"Execution Error: {res['error']}"
+                    score = 0.0
+
+                console.print(f"[{k}] Score: [green]{score}[/green] | Feedback: {feedback}")
+
+                histories[k].append({
+                    "iteration": i,
+                    "code": current[k],
+                    "score": score,
+                    "feedback": feedback
+                })
+
+                if score >= 0.95:
+                    console.print(f"[bold green][{k}] Threshold met![/bold green]")
+                    continue
+
+                # 3. Request Fix (Simulated call to Coder LLM)
+                current[k] = self._mock_llm_fix(current[k], feedback)
+                still_active.append(k)
+            active = still_active
 
-            # 3. Request Fix (Simulated call to Coder LLM)
-            current_code = self._mock_llm_fix(current_code, feedback)
+        return histories
 
-        return history
+    def close(self):
+        self.judge.close()
+        self.sandbox.close()
 
     def _mock_llm_fix(self, code: str, feedback: str) -> str:
         """
@@ -0,0 +1,117 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Set, Union
+
+# RFT results are written one JSON object per line, in completion order
+RESULTS_FILE = "rft_results.jsonl"
+
+
+class ResultsWriter:
+    """
+    Append-only JSONL writer for per-sample pipeline results.
+
+    Every entry is written as soon as it is ready; the file is flushed and
+    fsynced every `fsync_every` entries or `fsync_interval_s` seconds,
+    whichever comes first, and on close. With `resume`, entries already on
+    disk are kept, their ids are available in `completed`, and a partially
+    written last line from a crash is truncated away.
+    """
+    def __init__(self, path: Union[str, Path], resume: bool = False, fsync_every: int = 64, fsync_interval_s: float = 5.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fsync_every = fsync_every
+        self.fsync_interval_s = fsync_interval_s
+        self.completed: Set[Any] = set()
+
+        if resume and self.path.exists():
+            self._recover()
+        self._file = open(self.path, "a" if resume else "w", encoding="utf-8")
+        self.written = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.completed)
+
+    def write(self, entry: Dict[str, Any]):
+        self._file.write(json.dumps(entry) + "\n")
+        self.completed.add(entry.get("id"))
+        self.written += 1
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval_s:
+            self.sync()
+
+    def sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+    def _recover(self):
+        # Keep every complete line; drop a torn tail left by a crash
+        valid_bytes = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                self.completed.add(entry.get("id"))
+                valid_bytes += len(line)
+        with open(self.path, "r+b") as f:
+            f.truncate(valid_bytes)
+
+
+def resolve_results_path(path: Union[str, Path]) -> Path:
+    """
+    Returns `path`, or its .jsonl/.json sibling if only that one exists, so
+    consumers accept both the streaming format and legacy result files.
+    """
+    path = Path(path)
+    if path.exists():
+        return path
+    for suffix in (".jsonl", ".json"):
+        sibling = path.with_suffix(suffix)
+        if sibling.exists():
+            return sibling
+    return path
+
+
+def iter_results(path: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """
+    Streams result entries from a .jsonl file (skipping a torn last line)
+    or from a legacy JSON list.
+    """
+    path = resolve_results_path(path)
+    if path.suffix != ".jsonl":
+        with open(path, "r") as f:
+            yield from json.load(f)
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break
+            try:
+                yield json.loads(line)
+            except ValueError:
+                break
+
+
+def load_results(path: Union[str, Path]) -> List[Dict[str, Any]]:
+    return list(iter_results(path))
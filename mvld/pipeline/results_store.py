@@ -0,0 +1,228 @@
+import ast
+import json
+import shutil
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Union
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from mvld.pipeline.results import iter_results, resolve_results_path
+
+# Column layout of one RFT result row. `score` is the CLIP score (0-100) and
+# `spatial_score` the spatial reward (0-1); either is null when it was not
+# computed. `full_eval` is nested and varies by scoring mode, so it is kept
+# as a JSON string.
+RESULTS_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("instruction", pa.string()),
+    ("code", pa.string()),
+    ("render_success", pa.bool_()),
+    ("render_status", pa.string()),
+    ("image_path", pa.string()),
+    ("score", pa.float64()),
+    ("spatial_score", pa.float64()),
+    ("full_eval", pa.string()),
+])
+
+PARTITIONING = ds.partitioning(pa.schema([("run", pa.string())]), flavor="hive")
+
+
+class ResultsStore:
+    """
+    Parquet store of pipeline results, partitioned by run
+    (`<root>/run=<run_id>/part-*.parquet`).
+
+    Queries take a filter written as a Python expression over column names,
+    e.g. `render_success and score <= 0.5` or `run in ["a", "b"]`; values
+    from code go in `params` and are referenced by name
+    (`score <= max_score`, params={"max_score": 0.5}). The
+    filter and column selection are handed to the Arrow scanner, so row
+    groups are pruned by their statistics and only the requested columns
+    are read.
+    """
+    def __init__(self, root: str = "results/store"):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def runs(self) -> List[str]:
+        return sorted(p.name.split("=", 1)[1] for p in self.root.glob("run=*") if p.is_dir())
+
+    def write_run(self, run_id: str, entries: Iterable[Dict[str, Any]], batch_rows: int = 8192, rows_per_file: int = 1_000_000) -> int:
+        """
+        Replaces the partition for `run_id` with `entries`, streamed in
+        record batches. Returns the number of rows written.
+        """
+        run_dir = self.root / f"run={run_id}"
+        tmp_dir = self.root / f".run={run_id}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+
+        state = {"writer": None, "part": 0, "rows_in_file": 0, "total": 0}
+
+        def flush(batch: List[Dict[str, Any]]):
+            # One row group per batch; roll over to a new file at rows_per_file
+            if state["writer"] is None or state["rows_in_file"] >= rows_per_file:
+                if state["writer"] is not None:
+                    state["writer"].close()
+                state["writer"] = pq.ParquetWriter(str(tmp_dir / f"part-{state['part']:05d}.parquet"), RESULTS_SCHEMA)
+                state["part"] += 1
+                state["rows_in_file"] = 0
+            state["writer"].write_batch(self._to_batch(batch))
+            state["rows_in_file"] += len(batch)
+            state["total"] += len(batch)
+
+        batch = []
+        try:
+            for entry in entries:
+                batch.append(entry)
+                if len(batch) >= batch_rows:
+                    flush(batch)
+                    batch = []
+            if batch or state["writer"] is None:
+                flush(batch)
+        finally:
+            if state["writer"] is not None:
+                state["writer"].close()
+
+        shutil.rmtree(run_dir, ignore_errors=True)
+        tmp_dir.rename(run_dir)
+        return state["total"]
+
+    def import_results(self, run_id: str, results_path: Union[str, Path]) -> int:
+        """
+        Loads a rft_results.jsonl (or legacy .json) file as run `run_id`.
+        """
+        return self.write_run(run_id, iter_results(results_path))
+
+    def import_results_file(self, results_path: Union[str, Path]) -> Optional[str]:
+        """
+        Imports a results file as the run named after its directory, the
+        run id RFTPipeline stores it under, and returns that id; None if
+        the file does not exist.
+        """
+        path = resolve_results_path(results_path)
+        if not path.exists():
+            return None
+        run_id = path.resolve().parent.name
+        self.import_results(run_id, path)
+        return run_id
+
+    def dataset(self) -> ds.Dataset:
+        return ds.dataset(str(self.root), format="parquet", schema=RESULTS_SCHEMA.append(pa.field("run", pa.string())), partitioning=PARTITIONING, ignore_prefixes=[".", "_"])
+
+    def scanner(self, where: Optional[str] = None, columns: Optional[List[str]] = None, runs: Optional[List[str]] = None, batch_size: int = 65536, params: Optional[Dict[str, Any]] = None) -> ds.Scanner:
+        expression = parse_filter(where, params) if where else None
+        if runs:
+            run_filter = ds.field("run").isin(runs)
+            expression = run_filter if expression is None else expression & run_filter
+        return self.dataset().scanner(columns=columns, filter=expression, batch_size=batch_size)
+
+    def query(self, where: Optional[str] = None, columns: Optional[List[str]] = None, runs: Optional[List[str]] = None, params: Optional[Dict[str, Any]] = None) -> pa.Table:
+        return self.scanner(where, columns, runs, params=params).to_table()
+
+    def iter_query(self, where: Optional[str] = None, columns: Optional[List[str]] = None, runs: Optional[List[str]] = None, params: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Streams matching rows as dicts, one record batch at a time, with
+        `full_eval` decoded back into the dict the pipeline wrote.
+        """
+        for batch in self.scanner(where, columns, runs, params=params).to_batches():
+            for row in batch.to_pylist():
+                if row.get("full_eval") is not None:
+                    row["full_eval"] = json.loads(row["full_eval"])
+                yield row
+
+    def count(self, where: Optional[str] = None, runs: Optional[List[str]] = None, params: Optional[Dict[str, Any]] = None) -> int:
+        return self.scanner(where, [], runs, params=params).count_rows()
+
+    def _to_batch(self, entries: List[Dict[str, Any]]) -> pa.RecordBatch:
+        columns = {name: [] for name in RESULTS_SCHEMA.names}
+        for entry in entries:
+            for name in RESULTS_SCHEMA.names:
+                value = entry.get(name)
+                if name == "full_eval" and value is not None:
+                    value = json.dumps(value)
+                columns[name].append(value)
+        return pa.RecordBatch.from_pydict(columns, schema=RESULTS_SCHEMA)
+
+
+_COMPARISONS = {
+    ast.Eq: lambda a, b: a == b,
+    ast.NotEq: lambda a, b: a != b,
+    ast.Lt: lambda a, b: a < b,
+    ast.LtE: lambda a, b: a <= b,
+    ast.Gt: lambda a, b: a > b,
+    ast.GtE: lambda a, b: a >= b,
+}
+
+
+def parse_filter(where: str, params: Optional[Dict[str, Any]] = None) -> ds.Expression:
+    """
+    Compiles a filter such as `render_success and score <= 0.5` into an
+    Arrow dataset expression. Supports column names, literals, comparisons
+    (chained too), `in`/`not in` lists, `is None`/`is not None`, and
+    `and`/`or`/`not`. Names found in `params` stand for their values
+    (numpy scalars included) instead of columns.
+    """
+    try:
+        tree = ast.parse(where, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid filter '{where}': {e.msg}")
+    return _compile(tree.body, where, params or {})
+
+
+def _param(value: Any) -> Any:
+    # numpy scalars and arrays become plain Python values Arrow accepts
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if isinstance(value, (list, tuple)):
+        return [_param(v) for v in value]
+    return value
+
+
+def _compile(node: ast.AST, where: str, params: Dict[str, Any]):
+    if isinstance(node, ast.BoolOp):
+        values = [_compile(v, where, params) for v in node.values]
+        result = values[0]
+        for value in values[1:]:
+            result = (result & value) if isinstance(node.op, ast.And) else (result | value)
+        return result
+
+    if isinstance(node, ast.UnaryOp):
+        operand = _compile(node.operand, where, params)
+        if isinstance(node.op, ast.Not):
+            return ~operand
+        if isinstance(node.op, ast.USub) and not isinstance(operand, ds.Expression):
+            return -operand
+
+    if isinstance(node, ast.Compare):
+        result = None
+        left = _compile(node.left, where, params)
+        for op, comparator in zip(node.ops, node.comparators):
+            right = _compile(comparator, where, params)
+            if isinstance(op, (ast.In, ast.NotIn)):
+                if not isinstance(right, (list, tuple)):
+                    raise ValueError(f"Invalid filter '{where}': 'in' needs a list of literals.")
+                term = left.isin(list(right))
+                term = ~term if isinstance(op, ast.NotIn) else term
+            elif isinstance(op, (ast.Is, ast.IsNot)) and right is None:
+                term = left.is_null() if isinstance(op, ast.Is) else left.is_valid()
+            elif type(op) in _COMPARISONS:
+                term = _COMPARISONS[type(op)](left, right)
+            else:
+                raise ValueError(f"Invalid filter '{where}': unsupported operator {type(op).__name__}.")
+            result = term if result is None else result & term
+            left = right
+        return result
+
+    if isinstance(node, ast.Name):
+        if node.id in params:
+            return _param(params[node.id])
+        return ds.field(node.id)
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, (ast.List, ast.Tuple)):
+        return [_compile(e, where, params) for e in node.elts]
+
+    raise ValueError(f"Invalid filter '{where}': unsupported expression '{ast.unparse(node)}'.")
@@ -1,79 +1,230 @@
 from pathlib import Path
-from typing import List, Dict, Any
-import json
+from typing import List, Dict, Any, Optional, Tuple
 from rich.console import Console
 from rich.progress import Progress
 
+from mvld.sandbox.budget import RenderBudget
+from mvld.sandbox.cache import RenderCache
 from mvld.sandbox.executor import ManimSandbox
+from mvld.sandbox.profiles import DEFAULT_PROFILE
 from mvld.eval.evaluator import VisualEvaluator
+from mvld.data.augmenter import CoordinateAugmenter
 from mvld.data.dataset import MVLDDataset
+from mvld.data.dedup import DedupIndex
 from mvld.pipeline.base import BasePipeline, PipelineRegistry
+from mvld.pipeline.results import RESULTS_FILE, ResultsWriter
+from mvld.pipeline.results_store import ResultsStore
 
 console = Console()
 
 @PipelineRegistry.register("rft")
 class RFTPipeline(BasePipeline):
-    def __init__(self, output_dir: str = "results/rft"):
+    def __init__(self, output_dir: str = "results/rft", workers: int = 0, eval_batch_size: int = 32, text_cache_dir: str = "results/cache/text_embeddings", image_store_dir: str = "results/cache/image_embeddings", render_cache_dir: Optional[str] = "results/cache/renders", profile: str = DEFAULT_PROFILE, render_budget: Optional[RenderBudget] = None, store_dir: Optional[str] = "results/store", run_id: Optional[str] = None):
         self.output_dir = Path(output_dir)
+        self.store = ResultsStore(store_dir) if store_dir else None
+        self.run_id = run_id or self.output_dir.name
+        self.eval_batch_size = eval_batch_size
         self.output_dir.mkdir(parents=True, exist_ok=True)
-        self.sandbox = ManimSandbox(output_dir=str(self.output_dir / "media"))
-        self.evaluator = VisualEvaluator()
+        render_cache = RenderCache(render_cache_dir) if render_cache_dir else None
+        self.sandbox = ManimSandbox(output_dir=str(self.output_dir / "media"), workers=workers, cache=render_cache, profile=profile, budget=render_budget)
+        self.evaluator = VisualEvaluator(text_cache_dir=text_cache_dir, image_store_dir=image_store_dir)
         self.dataset_handler = MVLDDataset()
+        self.augmenter = CoordinateAugmenter()
 
-    def run_baseline(self, num_samples: int = 5):
+    def run(self, num_samples: int = 5, geometry_only: bool = False, resume: bool = False, dedup: bool = False, **kwargs) -> Dict[str, Any]:
+        num_results = self.run_baseline(num_samples, geometry_only=geometry_only, resume=resume, dedup=dedup)
+        return {
+            "status": "success",
+            "num_results": num_results,
+            "results_path": str(self.output_dir / RESULTS_FILE),
+            "run_id": self.run_id,
+            "cache_stats": {
+                **self.evaluator.clip_scorer.cache_stats(),
+                "renders": self.sandbox.cache.stats() if self.sandbox.cache is not None else None
+            },
+            "render_status": self.sandbox.budget_stats()
+        }
+
+    def run_baseline(self, num_samples: int = 5, geometry_only: bool = False, resume: bool = False, dedup: bool = False) -> int:
         """
-        Runs the RFT baseline loop.
+        Runs the RFT baseline loop and returns the number of results on disk.
+        The entries themselves are not returned (this used to return the
+        list and write rft_results.json); read them back with
+        `mvld.pipeline.results.iter_results`, which also reads old .json files.
+
+        Each entry has the CLIP score (0-100) in `score` and the spatial
+        reward (1 - spatial drift against the positions the sample's code
+        places its mobjects at, 0-1) in `spatial_score`; the placements do
+        not affect the CLIP `overall_score` in `full_eval`. With
+        `geometry_only`, samples are executed without rasterization and
+        only `spatial_score` is set.
+
+        Results are appended to rft_results.jsonl as each scoring batch
+        completes, so memory stays constant. With `resume`, samples whose
+        ids are already in that file are skipped. With `dedup`, samples that
+        duplicate an earlier sample (exactly or nearly, see DedupIndex) are
+        not rendered at all. Once the loop finishes the
+        JSONL file is loaded into the results store as run `run_id`.
         """
         console.print(f"[bold green]Starting RFT Baseline with {num_samples} samples...[/bold green]")
         
         dataset = self.dataset_handler.create_dummy_dataset(num_samples)
-        results = []
+        results_path = self.output_dir / RESULTS_FILE
 
-        with Progress() as progress:
-            task = progress.add_task("[cyan]Processing samples...", total=num_samples)
+        with ResultsWriter(results_path, resume=resume) as writer, Progress() as progress:
+            todo = [i for i in range(len(dataset)) if i not in writer.completed]
+            if dedup:
+                keep = DedupIndex().keep_mask(dataset["instruction"], dataset["code"])
+                console.print(f"Dedup: skipping {int((~keep).sum())} duplicate samples.")
+                todo = [i for i in todo if keep[i]]
+            if resume and writer.completed:
+                console.print(f"Resuming: {len(dataset) - len(todo)} samples already done, {len(todo)} to go.")
+
+            render_task = progress.add_task("[cyan]Rendering samples...", total=len(todo))
+            score_task = progress.add_task("[magenta]Scoring samples...", total=len(todo))
             
-            for i, item in enumerate(dataset):
-                instruction = item["instruction"]
-                code = item["code"]
-                
-                # 1. Execute
-                script_path = self.output_dir / f"sample_{i}.py"
-                with open(script_path, "w") as f:
-                    f.write(code)
-                
-                render_res = self.sandbox.run_script(script_path)
-                
-                # 2. Evaluate
-                score_res = {}
-                if render_res["success"] and render_res["image_path"]:
-                    score_res = self.evaluator.evaluate_render(
-                        render_res["image_path"], 
-                        instruction,
-                        scene_graph=render_res.get("scene_graph")
-                    )
-
-                
-                # 3. Collect
-                entry = {
-                    "id": i,
-                    "instruction": instruction,
-                    "code": code,
-                    "render_success": render_res["success"],
-                    "image_path": render_res["image_path"],
-                    "score": score_res.get("clip_similarity", 0.0),
-                    "full_eval": score_res
-                }
-                results.append(entry)
-                progress.update(task, advance=1)
-
-        # Save results
-        results_path = self.output_dir / "rft_results.json"
-        with open(results_path, "w") as f:
-            json.dump(results, f, indent=2)
+            # 1. Execute (spread over the sandbox's worker pool when it has one)
+            renders = self.sandbox.map_scripts(
+                (self._write_script(i, dataset[i]["code"]) for i in todo),
+                geometry_only=geometry_only
+            )
+
+            # 2. Evaluate in batches of renders, 3. Append in sample order
+            pending = []
+            for i, render_res in zip(todo, renders):
+                pending.append((i, dataset[i], render_res))
+                progress.update(render_task, advance=1)
+
+                if len(pending) >= self.eval_batch_size:
+                    for entry in self._score_batch(pending, geometry_only):
+                        writer.write(entry)
+                    progress.update(score_task, advance=len(pending))
+                    pending = []
+
+            if pending:
+                for entry in self._score_batch(pending, geometry_only):
+                    writer.write(entry)
+                progress.update(score_task, advance=len(pending))
+
+            num_results = len(writer)
         
-        console.print(f"[bold blue]RFT Baseline Complete![/bold blue] Results saved to {results_path}")
-        return results
+        console.print(f"[bold blue]RFT Baseline Complete![/bold blue] {num_results} results in {results_path}")
+        if self.store is not None:
+            stored = self.store.import_results(self.run_id, results_path)
+            console.print(f"Stored {stored} results as run '{self.run_id}' in {self.store.root}")
+        self.evaluator.clip_scorer.close()
+        text_stats = self.evaluator.clip_scorer.cache_stats()["text_embeddings"]
+        console.print(
+            f"Text embedding cache: {text_stats['hits']} hits "
+            f"({text_stats['disk_hits']} from disk), {text_stats['misses']} misses, "
+            f"hit rate {text_stats['hit_rate']:.1%}"
+        )
+        if self.sandbox.cache is not None:
+            render_stats = self.sandbox.cache.stats()
+            console.print(
+                f"Render cache: {render_stats['hits']} hits, {render_stats['misses']} misses, "
+                f"hit rate {render_stats['hit_rate']:.1%} ({render_stats['entries']} entries, "
+                f"{render_stats['bytes'] / 1024 ** 2:.1f} MiB)"
+            )
+        status_stats = self.sandbox.budget_stats()
+        console.print("Render status: " + ", ".join(
+            f"{status} {stats['count']} (mean {stats['mean_s']:.2f}s, max {stats['max_s']:.2f}s)"
+            for status, stats in sorted(status_stats.items())
+        ))
+        return num_results
+
+    def _write_script(self, i: int, code: str) -> Path:
+        script_path = self.output_dir / f"sample_{i}.py"
+        with open(script_path, "w") as f:
+            f.write(code)
+        return script_path
+
+    def _score_batch(self, pending: List[Tuple[int, Dict[str, Any], Dict[str, Any]]], geometry_only: bool = False) -> List[Dict[str, Any]]:
+        """
+        Scores a chunk of rendered samples with one batched CLIP pass and
+        returns their result entries in order.
+        """
+        spatial = self._placement_rewards(pending)
+        if geometry_only:
+            return self._score_spatial(pending, spatial)
+
+        scorable = [
+            (i, item, render_res) for i, item, render_res in pending
+            if render_res["success"] and render_res["image_path"]
+        ]
+
+        # overall_score stays the CLIP reward; placements only feed spatial_score
+        evals = {}
+        if scorable:
+            score_list = self.evaluator.evaluate_renders(
+                [render_res["image_path"] for _, _, render_res in scorable],
+                [item["instruction"] for _, item, _ in scorable],
+                scene_graphs=[render_res.get("scene_graph") for _, _, render_res in scorable],
+                batch_size=self.eval_batch_size
+            )
+            evals = {i: score_res for (i, _, _), score_res in zip(scorable, score_list)}
+
+        return [
+            self._make_entry(
+                i, item, render_res, evals.get(i, {}),
+                evals.get(i, {}).get("clip_similarity", 0.0),
+                self._spatial_score(spatial.get(k))
+            )
+            for k, (i, item, render_res) in enumerate(pending)
+        ]
+
+    def _score_spatial(self, pending: List[Tuple[int, Dict[str, Any], Dict[str, Any]]], spatial: Dict[int, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # No CLIP pass, so `score` stays empty rather than mixing scales
+        entries = []
+        for k, (i, item, render_res) in enumerate(pending):
+            score_res = {}
+            spatial_score = self._spatial_score(spatial.get(k))
+            if k in spatial:
+                score_res = {"spatial": spatial[k], "overall_score": spatial_score}
+            entries.append(self._make_entry(i, item, render_res, score_res, None, spatial_score))
+        return entries
+
+    def _placement_rewards(self, pending: List[Tuple[int, Dict[str, Any], Dict[str, Any]]]) -> Dict[int, Dict[str, Any]]:
+        """
+        SpatialEvaluator results against each sample's placements (see
+        `_constraints`), keyed by position in `pending`, for the renders
+        that produced a scene graph.
+        """
+        scorable = [
+            k for k, (_, _, render_res) in enumerate(pending)
+            if render_res["success"] and render_res.get("scene_graph") is not None
+        ]
+        return dict(zip(scorable, self.evaluator.spatial_evaluator.evaluate_batch(
+            [pending[k][2]["scene_graph"] for k in scorable],
+            [self._constraints(pending[k][1]) for k in scorable]
+        )))
+
+    def _constraints(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Spatial constraints of a sample: every mobject its code places at a
+        constant position must show up there in the scene graph.
+        """
+        return {"positions": self.augmenter.extract_placements(item["code"])}
+
+    @staticmethod
+    def _spatial_score(spatial: Optional[Dict[str, Any]]) -> Optional[float]:
+        if not spatial:
+            return None
+        return 1.0 - spatial["spatial_drift_score"]
+
+    def _make_entry(self, i: int, item: Dict[str, Any], render_res: Dict[str, Any], score_res: Dict[str, Any], score: Optional[float], spatial_score: Optional[float]) -> Dict[str, Any]:
+        return {
+            "id": i,
+            "instruction": item["instruction"],
+            "code": item["code"],
+            "render_success": render_res["success"],
+            "render_status": render_res.get("status"),
+            "image_path": render_res["image_path"],
+            "score": score,
+            "spatial_score": spatial_score,
+            "full_eval": score_res
+        }
 
 if __name__ == "__main__":
-    pipeline = RFTPipeline()
+    pipeline = RFTPipeline(workers=2)
     pipeline.run_baseline(3)
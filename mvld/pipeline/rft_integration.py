@@ -1,44 +1,61 @@
 import json
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datasets import Dataset
 from rich.console import Console
 
+from mvld.data.dataset import MVLDDataset
+from mvld.pipeline.results_store import ResultsStore
+
 console = Console()
 
 class RFTIntegrator:
     """
     Automates the loop: Load RFT results -> Filter -> Create SFT Dataset.
     """
-    def __init__(self, results_path: str = "results/rft/rft_results.json"):
-        self.results_path = Path(results_path)
+    def __init__(self, results_path: Optional[str] = None, store_dir: str = "results/store", runs: Optional[List[str]] = None):
+        # Reads from the columnar results store; `runs` limits integration to those runs.
+        # A `results_path` (rft_results.jsonl or legacy .json) is imported
+        # into the store first and integrated as its own run.
+        self.results_path = results_path
+        self.store = ResultsStore(store_dir)
+        self.runs = runs
 
-    def integrate_results(self, threshold: float = 0.7, output_path: str = "data/refined_sft") -> Dataset:
+    def integrate_results(self, threshold: float = 0.7, output_path: str = "data/refined_sft", dedup: bool = False) -> Dataset:
         """
         Loads RFT results and filters samples by score to create a high-quality dataset.
+        With `dedup`, exact and near-duplicate samples are dropped, keeping the
+        highest-scoring copy.
         """
-        if not self.results_path.exists():
-            console.print(f"[bold red]Results not found at {self.results_path}[/bold red]")
+        runs = self.runs
+        if self.results_path is not None:
+            run_id = self.store.import_results_file(self.results_path)
+            if run_id is None:
+                console.print(f"[bold red]Results not found at {self.results_path}[/bold red]")
+                return Dataset.from_list([])
+            runs = [run_id]
+
+        if not self.store.runs():
+            console.print(f"[bold red]No results in store at {self.store.root}[/bold red]")
             return Dataset.from_list([])
 
-        with open(self.results_path, "r") as f:
-            results = json.load(f)
+        # Successful renders scoring above threshold; the filter and column
+        # projection run in the Parquet scan and the table backs the dataset
+        total = self.store.count(runs=runs)
+        table = self.store.query(
+            "render_success and score >= threshold",
+            columns=["instruction", "code", "score"],
+            runs=runs,
+            params={"threshold": threshold}
+        )
 
-        console.print(f"Loaded {len(results)} samples from RFT results.")
-        
-        # Filter: successful render and score above threshold
-        refined_data = [
-            {
-                "instruction": r["instruction"],
-                "code": r["code"],
-                "score": r["score"]
-            }
-            for r in results if r["render_success"] and r["score"] >= threshold
-        ]
-
-        console.print(f"Filtered to {len(refined_data)} samples with CLIP score >= {threshold}.")
+        console.print(f"Loaded {total} samples from RFT results.")
+        console.print(f"Filtered to {table.num_rows} samples with CLIP score >= {threshold}.")
         
-        dataset = Dataset.from_list(refined_data)
+        dataset = Dataset(table)
+        if dedup:
+            # Sort so the first occurrence DedupIndex keeps is the best one
+            dataset = MVLDDataset().deduplicate(dataset.sort("score", reverse=True))
         
         # Save for SFT training
         dataset_path = Path(output_path)
@@ -1,12 +1,34 @@
 from manim import *
 import json
+import os
 from pathlib import Path
 
+from mvld.sandbox.scene_graph import SCENE_GRAPH_FILE, SceneGraphArrays
+
+# Set by ManimSandbox to a per-job file. When present, the scene reports its
+# scene graph and output image there instead of the shared scene_graph.sgb.
+MANIFEST_ENV = "MVLD_JOB_MANIFEST"
+# Set for geometry-only sandbox jobs: construct() runs with animations
+# skipped so no frame is ever rasterized; only the scene graph is produced.
+GEOMETRY_ONLY_ENV = "MVLD_GEOMETRY_ONLY"
+
 class MVLDScene(Scene):
     """
     Custom Scene class that automatically extracts the scene graph 
     metadata after rendering.
     """
+    def __init__(self, *args, **kwargs):
+        if os.environ.get(GEOMETRY_ONLY_ENV):
+            kwargs["skip_animations"] = True
+        super().__init__(*args, **kwargs)
+
+    def render(self, preview: bool = False):
+        super().render(preview)
+
+        manifest_path = os.environ.get(MANIFEST_ENV)
+        if manifest_path:
+            self.write_manifest(Path(manifest_path))
+
     def tear_down(self):
         super().tear_down()
         self.extract_scene_graph()
@@ -14,7 +36,7 @@ class MVLDScene(Scene):
     def extract_scene_graph(self):
         """
         Introspects the current mobjects in the scene and saves 
-        their metadata to a JSON file.
+        their metadata to a compact binary record (see SceneGraphArrays).
         """
         scene_graph = []
         for mobject in self.mobjects:
@@ -38,18 +60,89 @@ class MVLDScene(Scene):
             
             scene_graph.append(data)
 
+        self.scene_graph = scene_graph
+
+        # Sandbox jobs get the graph through their manifest (see render)
+        if os.environ.get(MANIFEST_ENV):
+            return
+
         # Save to file
         # Manim's media_dir can be accessed via config
-        output_path = Path(config.media_dir) / "scene_graph.json"
+        output_path = Path(config.media_dir) / SCENE_GRAPH_FILE
         
         # Ensure directory exists (might not if no media was saved)
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(output_path, "w") as f:
-            json.dump(scene_graph, f, indent=2)
+        SceneGraphArrays.from_json(scene_graph).save(output_path)
         
         # print(f"Scene graph saved to {output_path}")
 
+    def write_manifest(self, manifest_path: Path):
+        """
+        Appends this scene's artifacts to the job manifest. A script with
+        several scenes produces one record per scene, in render order. The
+        scene graph goes to a binary sidecar next to the manifest (see
+        SceneGraphArrays) and the record points at it.
+        """
+        manifest = {"scenes": []}
+        if manifest_path.exists():
+            with open(manifest_path, "r") as f:
+                manifest = json.load(f)
+
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        scene_graph_file = None
+        if getattr(self, "scene_graph", None) is not None:
+            scene_graph_file = manifest_path.with_name(f"{manifest_path.stem}_{len(manifest['scenes'])}.sgb")
+            SceneGraphArrays.from_json(self.scene_graph).save(scene_graph_file)
+
+        image_path = self._output_image_path()
+        if image_path is None:
+            image_path = self._save_final_frame()
+        manifest["scenes"].append({
+            "scene": self.__class__.__name__,
+            "scene_graph_file": str(scene_graph_file) if scene_graph_file else None,
+            "image_path": str(image_path) if image_path else None
+        })
+
+        tmp_path = manifest_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+        tmp_path.replace(manifest_path)
+
+    def _output_image_path(self):
+        """
+        The image file this render wrote: the last numbered frame for
+        `--format png` animations, otherwise the saved final frame.
+        """
+        file_writer = getattr(self.renderer, "file_writer", None)
+        image_file_path = getattr(file_writer, "image_file_path", None)
+        if image_file_path is None:
+            return None
+
+        image_file_path = Path(image_file_path)
+        frame_count = getattr(file_writer, "frame_count", 0)
+        if config.format == "png" and frame_count:
+            frame = str(frame_count - 1).zfill(config.zero_pad) if config.zero_pad else str(frame_count - 1)
+            last_frame = image_file_path.parent / f"{image_file_path.stem}{frame}{image_file_path.suffix}"
+            if last_frame.exists():
+                return last_frame
+
+        return image_file_path if image_file_path.exists() else None
+
+    def _save_final_frame(self):
+        """
+        Saves the final frame of a scene that wrote none (a static scene with
+        `--write_to_movie False` never calls play, so no frame is output) and
+        returns its path. Geometry-only and dry runs stay without an image.
+        """
+        file_writer = getattr(self.renderer, "file_writer", None)
+        if file_writer is None or config.dry_run or os.environ.get(GEOMETRY_ONLY_ENV):
+            return None
+
+        self.renderer.update_frame(self)
+        file_writer.save_final_image(self.camera.get_image())
+        return self._output_image_path()
+
     def _get_color_str(self, mobject) -> str:
         if hasattr(mobject, "color"):
             try:
@@ -0,0 +1,163 @@
+import os
+import signal
+import threading
+from typing import Dict, Any, Optional
+
+try:
+    import resource
+except ImportError:  # Windows: wall-clock timeout only
+    resource = None
+
+# Result statuses reported by ManimSandbox
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+STATUS_TIMEOUT = "timeout"
+STATUS_CPU_LIMIT = "cpu_limit"
+STATUS_OOM = "oom"
+
+# Markers Python/manim print when an allocation fails under RLIMIT_AS
+OOM_MARKERS = ("MemoryError", "Cannot allocate memory", "std::bad_alloc", "out of memory")
+
+# A SIGKILLed job within this many CPU seconds of `cpu_seconds` was stopped
+# by the RLIMIT_CPU hard limit (soft + 1), not by the OOM killer
+CPU_LIMIT_MARGIN_S = 1.0
+
+
+class RenderBudget:
+    """
+    Per-job resource limits for sandbox renders.
+
+    `timeout_s` is wall-clock time enforced by the parent, which kills the
+    job's whole process group. `cpu_seconds` and `memory_bytes` are applied
+    in the job itself as RLIMIT_CPU and RLIMIT_AS. Any limit set to None is
+    not enforced.
+    """
+    def __init__(self, timeout_s: Optional[float] = 120.0, cpu_seconds: Optional[int] = 120, memory_bytes: Optional[int] = 4 * 1024 ** 3):
+        self.timeout_s = timeout_s
+        self.cpu_seconds = cpu_seconds
+        self.memory_bytes = memory_bytes
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "timeout_s": self.timeout_s,
+            "cpu_seconds": self.cpu_seconds,
+            "memory_bytes": self.memory_bytes
+        }
+
+    def apply_limits(self):
+        """
+        Sets the rlimits on the calling process. Runs inside the render job
+        (as a Popen preexec_fn or at the top of a pool child).
+        """
+        if resource is None:
+            return
+        if self.cpu_seconds is not None:
+            # SIGXCPU at the soft limit, SIGKILL one second later
+            resource.setrlimit(resource.RLIMIT_CPU, (self.cpu_seconds, self.cpu_seconds + 1))
+        if self.memory_bytes is not None:
+            resource.setrlimit(resource.RLIMIT_AS, (self.memory_bytes, self.memory_bytes))
+
+    def classify(self, returncode: int, stderr: str, timed_out: bool, cpu_time: Optional[float] = None) -> str:
+        """
+        Maps how a job ended to one of the STATUS_* values. `cpu_time` is
+        the CPU seconds the job used (see CpuTimeSampler), None if unknown.
+        """
+        if timed_out:
+            return STATUS_TIMEOUT
+        if returncode == 0:
+            return STATUS_OK
+        sigxcpu = getattr(signal, "SIGXCPU", None)
+        if sigxcpu is not None and returncode in (-sigxcpu, 128 + sigxcpu):
+            return STATUS_CPU_LIMIT
+        if self.memory_bytes is not None and any(marker in (stderr or "") for marker in OOM_MARKERS):
+            return STATUS_OOM
+        if returncode in (-signal.SIGKILL, 128 + signal.SIGKILL):
+            # Killed without our timeout firing: the RLIMIT_CPU hard limit
+            # for a job that ignored SIGXCPU, the OOM killer, or someone else
+            if cpu_time is None:
+                return STATUS_ERROR
+            if self.cpu_seconds is not None and cpu_time >= self.cpu_seconds - CPU_LIMIT_MARGIN_S:
+                return STATUS_CPU_LIMIT
+            if self.memory_bytes is not None:
+                return STATUS_OOM
+        return STATUS_ERROR
+
+
+class CpuTimeSampler:
+    """
+    Samples a running job's CPU time (all threads, from /proc/<pid>/stat)
+    on a background thread, so the last value is still known after the job
+    was SIGKILLed. `cpu_time` stays None where /proc is not available.
+    """
+    def __init__(self, pid: int, interval_s: float = 0.1):
+        self.pid = pid
+        self.interval_s = interval_s
+        self.cpu_time: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="mvld-cpu-sampler", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def sample(self) -> Optional[float]:
+        try:
+            with open(f"/proc/{self.pid}/stat", "r") as f:
+                stat = f.read()
+        except OSError:
+            return None
+        # utime and stime are fields 14 and 15; the command name may hold spaces
+        fields = stat[stat.rfind(")") + 2:].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+    def _run(self):
+        while True:
+            cpu_time = self.sample()
+            if cpu_time is not None:
+                self.cpu_time = cpu_time
+            if self._stop.wait(self.interval_s):
+                return
+
+
+def kill_process_group(pid: int):
+    """
+    SIGKILLs a job and everything it spawned (LaTeX, ffmpeg, ...). Jobs are
+    started in their own session, so their pgid equals their pid.
+    """
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(pid, signal.SIGKILL)
+        else:
+            os.kill(pid, signal.SIGTERM)
+    except (ProcessLookupError, PermissionError):
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except (ProcessLookupError, AttributeError):
+            pass
+
+
+class BudgetStats:
+    """
+    Thread-safe per-status counters and elapsed times for tuning budgets.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def record(self, status: str, elapsed: float):
+        with self._lock:
+            entry = self._stats.setdefault(status, {"count": 0, "total_s": 0.0, "max_s": 0.0})
+            entry["count"] += 1
+            entry["total_s"] += elapsed
+            entry["max_s"] = max(entry["max_s"], elapsed)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                status: {**entry, "mean_s": entry["total_s"] / entry["count"]}
+                for status, entry in self._stats.items()
+            }
@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from importlib import metadata
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from mvld.sandbox.scene_graph import SCENE_GRAPH_FILE, SceneGraphArrays
+
+
+def manim_version() -> str:
+    try:
+        return metadata.version("manim")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def _link_or_copy(src: Path, dest: Path):
+    """
+    Places `src` at `dest` (replacing it) as a hard link, or a copy across
+    filesystems.
+    """
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f".{dest.name}.{threading.get_ident()}.tmp")
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copy2(src, tmp)
+    os.replace(tmp, dest)
+
+
+class RenderCache:
+    """
+    Content-addressed cache of successful renders.
+
+    Entries are keyed by a hash of (code, scene name, render config, manim
+    version) and stored as `entries/<key>/` holding the final image and the
+    scene graph (as a SceneGraphArrays record). A small SQLite index tracks entry sizes and last access;
+    the least recently used entries are evicted once the cache exceeds
+    `max_bytes` or `max_entries`. Safe to share between the sandbox's
+    dispatcher threads.
+
+    Hits hand out the image as a hard link (or copy) in the caller's
+    `image_dir`, never a path inside the cache, so evicting an entry cannot
+    remove an image a result still points to.
+    """
+    def __init__(self, root: str = "results/cache/renders", max_bytes: int = 5 * 1024 ** 3, max_entries: Optional[int] = None):
+        self.root = Path(root)
+        (self.root / "entries").mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.root / "index.sqlite"), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, size INTEGER, last_access REAL)"
+        )
+        self._db.commit()
+
+    @staticmethod
+    def make_key(code: str, scene_name: Optional[str], render_config: Dict[str, Any]) -> str:
+        payload = json.dumps({
+            "code": code,
+            "scene": scene_name or "",
+            "config": render_config,
+            "manim": manim_version()
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, image_dir: Optional[Path] = None) -> Optional[Dict[str, Any]]:
+        """
+        Returns a render result dict for `key`, or None on a miss. The
+        cached image is linked into `image_dir` under the name the render
+        gave it; without `image_dir` the result has no image.
+        """
+        entry_dir = self.root / "entries" / key
+        with self._lock:
+            row = self._db.execute("SELECT key FROM entries WHERE key = ?", (key,)).fetchone()
+            meta_path = entry_dir / "meta.json"
+            if row is None or not meta_path.exists():
+                self.misses += 1
+                return None
+
+            self._db.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            self.hits += 1
+
+            # Under the lock so eviction cannot remove the entry meanwhile
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            image_path = None
+            if meta.get("image_name") and image_dir is not None:
+                image_path = Path(image_dir) / meta.get("image_file", meta["image_name"])
+                _link_or_copy(entry_dir / meta["image_name"], image_path)
+            scene_graph = meta.get("scene_graph")
+            if meta.get("scene_graph_file"):
+                scene_graph = SceneGraphArrays.load(entry_dir / meta["scene_graph_file"]).to_json()
+        return {
+            "success": True,
+            "status": "ok",
+            "error": "",
+            "image_path": str(image_path) if image_path else None,
+            "scene_graph": scene_graph,
+            "stdout": "",
+            "elapsed": 0.0
+        }
+
+    def put(self, key: str, result: Dict[str, Any]):
+        """
+        Stores a successful render result and evicts old entries if needed.
+        """
+        entry_dir = self.root / "entries" / key
+        tmp_dir = self.root / "entries" / f".{key}.{threading.get_ident()}.tmp"
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+        tmp_dir.mkdir(parents=True)
+
+        meta = {"scene_graph_file": None, "image_name": None, "image_file": None}
+        if result.get("scene_graph") is not None:
+            meta["scene_graph_file"] = SCENE_GRAPH_FILE
+            SceneGraphArrays.from_json(result["scene_graph"]).save(tmp_dir / SCENE_GRAPH_FILE)
+        if result.get("image_path"):
+            image = Path(result["image_path"])
+            meta["image_name"] = "image" + image.suffix
+            meta["image_file"] = image.name
+            shutil.copy2(image, tmp_dir / meta["image_name"])
+        with open(tmp_dir / "meta.json", "w") as f:
+            json.dump(meta, f)
+
+        size = sum(p.stat().st_size for p in tmp_dir.iterdir())
+
+        with self._lock:
+            if entry_dir.exists():
+                shutil.rmtree(tmp_dir)
+                return
+            tmp_dir.rename(entry_dir)
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, size, last_access) VALUES (?, ?, ?)",
+                (key, size, time.time())
+            )
+            self._db.commit()
+            self._evict()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+            count, total = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "entries": count,
+            "bytes": total
+        }
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+            self._db.commit()
+            shutil.rmtree(self.root / "entries", ignore_errors=True)
+            (self.root / "entries").mkdir(parents=True, exist_ok=True)
+
+    def _evict(self):
+        # Caller holds the lock
+        count, total = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        while count and (total > self.max_bytes or (self.max_entries is not None and count > self.max_entries)):
+            key, size = self._db.execute(
+                "SELECT key, size FROM entries ORDER BY last_access ASC LIMIT 1"
+            ).fetchone()
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            shutil.rmtree(self.root / "entries" / key, ignore_errors=True)
+            count -= 1
+            total -= size
+        self._db.commit()
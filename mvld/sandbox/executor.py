@@ -1,94 +1,310 @@
 import subprocess
 import os
 import json
+import struct
+from collections import deque
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterable, Iterator
 import tempfile
+import time
+import uuid
+
+from mvld.sandbox.budget import BudgetStats, CpuTimeSampler, RenderBudget, STATUS_ERROR, STATUS_TIMEOUT, kill_process_group
+from mvld.sandbox.cache import RenderCache
+from mvld.sandbox.pool import RenderWorkerPool
+from mvld.sandbox.profiles import get_profile, profile_args
+from mvld.sandbox.scene_graph import load_scene_graph
+
+# Per-job manifest channel; must match mvld.sandbox.base.MANIFEST_ENV
+MANIFEST_ENV = "MVLD_JOB_MANIFEST"
+# Geometry-only switch; must match mvld.sandbox.base.GEOMETRY_ONLY_ENV
+GEOMETRY_ONLY_ENV = "MVLD_GEOMETRY_ONLY"
 
 class ManimSandbox:
-    def __init__(self, output_dir: str = "media"):
+    def __init__(self, output_dir: str = "media", workers: int = 0, cache: Optional[RenderCache] = None, profile: Optional[str] = None, budget: Optional[RenderBudget] = None):
         self.output_dir = Path(output_dir)
+        # Per-job wall-clock/CPU/memory limits; RenderBudget(None, None, None) disables them
+        self.budget = budget if budget is not None else RenderBudget()
+        self.stats = BudgetStats()
+        # None renders at manim's defaults; see mvld.sandbox.profiles
+        self.profile = profile
+        if profile is not None:
+            get_profile(profile)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        # workers=0 keeps the cold `manim` CLI subprocess per render
+        self.pool = RenderWorkerPool(workers) if workers > 0 else None
+        self.cache = cache
 
-    def run_script(self, script_path: Path, scene_name: str = None) -> Dict[str, Any]:
+    def run_script(self, script_path: Path, scene_name: str = None, geometry_only: bool = False) -> Dict[str, Any]:
         """
         Runs a Manim script and returns the result metadata.
+
+        With `geometry_only`, the scene's construct() runs and its scene graph
+        is extracted, but no frame is rasterized or written (`image_path` is
+        None). Use it for stages that only need spatial rewards.
+
+        The result's `status` is "ok", "error", or the budget that stopped the
+        job ("timeout", "cpu_limit", "oom"); `elapsed` is its wall time in seconds.
+        """
+        if self.cache is None:
+            return self._render(script_path, scene_name, geometry_only)
+
+        key = RenderCache.make_key(Path(script_path).read_text(), scene_name, self.render_config(geometry_only))
+        # Same image path a render of this script would produce
+        result = self.cache.get(key, image_dir=self.output_dir / "images" / Path(script_path).stem)
+        hit = result is not None
+        if not hit:
+            result = self._render(script_path, scene_name, geometry_only)
+            if result["success"]:
+                self.cache.put(key, result)
+
+        result["cache"] = {"hit": hit, **self.cache.stats()}
+        return result
+
+    def render_config(self, geometry_only: bool = False) -> Dict[str, Any]:
+        """
+        Settings that affect the rendered output; part of the render cache key.
+        """
+        return {
+            "format": "png",
+            "write_to_movie": False,
+            "geometry_only": geometry_only,
+            "profile": get_profile(self.profile) if self.profile else None
+        }
+
+    def budget_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Job counts and wall times per result status, for tuning the budget.
+        """
+        return self.stats.snapshot()
+
+    def _render(self, script_path: Path, scene_name: Optional[str], geometry_only: bool = False) -> Dict[str, Any]:
+        start = time.perf_counter()
+        if self.pool is not None:
+            result = self._run_in_pool(script_path, scene_name, geometry_only)
+        else:
+            result = self._run_subprocess(script_path, scene_name, geometry_only)
+
+        result["elapsed"] = time.perf_counter() - start
+        self.stats.record(result["status"], result["elapsed"])
+        return result
+
+    def _run_subprocess(self, script_path: Path, scene_name: Optional[str], geometry_only: bool = False) -> Dict[str, Any]:
+        cmd = ["manim", *self._build_args(script_path, scene_name, self.output_dir, geometry_only)]
+        manifest_path = self._new_manifest_path()
+
+        try:
+            # New session so a timeout kills manim and everything it spawned
+            proc = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                env={**os.environ, **self._job_env(manifest_path, geometry_only)},
+                start_new_session=True,
+                preexec_fn=self.budget.apply_limits if os.name == "posix" else None
+            )
+            try:
+                with CpuTimeSampler(proc.pid) as sampler:
+                    stdout, stderr = proc.communicate(timeout=self.budget.timeout_s)
+            except subprocess.TimeoutExpired as e:
+                kill_process_group(proc.pid)
+                e.output, e.stderr = proc.communicate()
+                return self._timeout_result(e, manifest_path)
+            result = subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
+            result.cpu_time = sampler.cpu_time
+            return self._collect_result(result, manifest_path)
+        except Exception as e:
+            return self._error_result(e)
+
+    def submit_script(self, script_path: Path, scene_name: str = None, geometry_only: bool = False) -> Future:
+        """
+        Schedules a render on the worker pool and returns a Future of the
+        same result dict `run_script` produces.
+        """
+        if self.pool is None:
+            raise RuntimeError("submit_script requires a sandbox created with workers > 0.")
+        return self.pool.submit(self.run_script, script_path, scene_name, geometry_only)
+
+    def map_scripts(self, script_paths: Iterable[Path], scene_name: str = None, geometry_only: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Renders scripts and yields their result dicts in input order. With a
+        worker pool the renders run concurrently ahead of the consumer, at
+        most two per worker, so `script_paths` may be a lazy iterator of any
+        length.
+        """
+        if self.pool is None:
+            for script_path in script_paths:
+                yield self.run_script(script_path, scene_name, geometry_only)
+            return
+
+        futures = deque()
+        for script_path in script_paths:
+            futures.append(self.submit_script(script_path, scene_name, geometry_only))
+            if len(futures) >= 2 * self.pool.size:
+                yield futures.popleft().result()
+        while futures:
+            yield futures.popleft().result()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+    def _run_in_pool(self, script_path: Path, scene_name: Optional[str], geometry_only: bool = False) -> Dict[str, Any]:
+        with self.pool.slot() as slot:
+            media_dir = self.output_dir / f"worker_{slot}"
+            try:
+                args = self._build_args(Path(script_path).resolve(), scene_name, media_dir.resolve(), geometry_only)
+                args += ["--config_file", str(self._write_slot_config(media_dir))]
+                manifest_path = self._new_manifest_path()
+                result = self.pool.run(args, env=self._job_env(manifest_path, geometry_only), budget=self.budget)
+                return self._collect_result(result, manifest_path)
+            except subprocess.TimeoutExpired as e:
+                return self._timeout_result(e, manifest_path)
+            except Exception as e:
+                return self._error_result(e)
+
+    def _timeout_result(self, e: subprocess.TimeoutExpired, manifest_path: Path) -> Dict[str, Any]:
+        self._remove_job_files(manifest_path)
+        stderr = e.stderr.decode(errors="replace") if isinstance(e.stderr, bytes) else (e.stderr or "")
+        stdout = e.output.decode(errors="replace") if isinstance(e.output, bytes) else (e.output or "")
+        return {
+            "success": False,
+            "status": STATUS_TIMEOUT,
+            "error": (stderr + "\n" if stderr else "") + f"Render exceeded the {e.timeout:g}s wall-clock budget and was killed.",
+            "image_path": None,
+            "scene_graph": None,
+            "stdout": stdout
+        }
+
+    def _error_result(self, e: Exception) -> Dict[str, Any]:
+        return {
+            "success": False,
+            "status": STATUS_ERROR,
+            "error": str(e),
+            "image_path": None,
+            "scene_graph": None
+        }
+
+    def _write_slot_config(self, media_dir: Path) -> Path:
+        """
+        Writes the manim.cfg for a worker slot. Scratch files (Tex/text
+        caches, partial movies) stay in the slot's media dir while
+        frames go to the shared images dir, so image paths are the same as
+        for a serial render.
         """
+        media_dir.mkdir(parents=True, exist_ok=True)
+        cfg_path = media_dir / "manim.cfg"
+        images_dir = (self.output_dir / "images").resolve()
+        cfg = f"[CLI]\nimages_dir = {images_dir}/{{module_name}}\n"
+        if not cfg_path.exists() or cfg_path.read_text() != cfg:
+            cfg_path.write_text(cfg)
+        return cfg_path
+
+    def _build_args(self, script_path: Path, scene_name: Optional[str], media_dir: Path, geometry_only: bool = False) -> List[str]:
         if not scene_name:
             # Try to infer scene name or use -a for all
             scene_arg = ""
         else:
             scene_arg = scene_name
 
-        # Command to run manim
         # We use -v ERROR to reduce noise
         # We use --format png --write_to_movie False to get the last frame as image
-        cmd = [
-            "manim", 
+        args = [
             str(script_path), 
             scene_arg,
             "-v", "ERROR",
             "--format", "png",
             "--write_to_movie", "False",
-            "--media_dir", str(self.output_dir)
+            "--media_dir", str(media_dir)
         ]
+        if self.profile is not None:
+            args += profile_args(self.profile)
+        if geometry_only:
+            # No output files at all; MVLDScene also skips animation frames
+            args.append("--dry_run")
+        return args
 
-        try:
-            result = subprocess.run(
-                cmd, 
-                capture_output=True, 
-                text=True, 
-                check=False
-            )
-            
-            success = result.returncode == 0
-            error_log = result.stderr if not success else ""
-            
-            # Find the output image
-            image_path = self._find_latest_image(script_path.stem)
-            
-            # Find and load scene graph
-            scene_graph = self._load_scene_graph()
-
-            return {
-                "success": success,
-                "error": error_log,
-                "image_path": str(image_path) if image_path else None,
-                "scene_graph": scene_graph,
-                "stdout": result.stdout
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-                "image_path": None,
-                "scene_graph": None
-            }
-
-    def _load_scene_graph(self) -> Optional[List[Dict[str, Any]]]:
-        # Path is defined in MVLDScene.extract_scene_graph
-        graph_path = self.output_dir / "scene_graph.json"
-        if not graph_path.exists():
-            return None
+    def _job_env(self, manifest_path: Path, geometry_only: bool) -> Dict[str, str]:
+        env = {MANIFEST_ENV: str(manifest_path)}
+        if geometry_only:
+            env[GEOMETRY_ONLY_ENV] = "1"
+        return env
+
+    def _new_manifest_path(self) -> Path:
+        """
+        A unique result channel for one render job; MVLDScene writes the
+        job's scene graph and image path there.
+        """
+        jobs_dir = self.output_dir / "jobs"
+        jobs_dir.mkdir(parents=True, exist_ok=True)
+        return (jobs_dir / f"{uuid.uuid4().hex}.json").resolve()
+
+    def _collect_result(self, result: subprocess.CompletedProcess, manifest_path: Path) -> Dict[str, Any]:
+        success = result.returncode == 0
+        error_log = result.stderr if not success else ""
         
+        # Read exactly what this job reported (last scene wins for multi-scene
+        # scripts). Scenes that report nothing, like plain Scene subclasses,
+        # have no image: scanning the shared images dir could return another
+        # job's frame.
+        scene_graph = None
+        image_path = None
+        record = self._read_manifest(manifest_path)
+        if record is not None:
+            scene_graph = record.get("scene_graph")
+            if record.get("image_path"):
+                image_path = self._normalize_image_path(Path(record["image_path"]))
+
+        return {
+            "success": success,
+            "status": self.budget.classify(result.returncode, result.stderr, timed_out=False,
+                                           cpu_time=getattr(result, "cpu_time", None)),
+            "error": error_log,
+            "image_path": str(image_path) if image_path else None,
+            "scene_graph": scene_graph,
+            "stdout": result.stdout
+        }
+
+    def _read_manifest(self, manifest_path: Path) -> Optional[Dict[str, Any]]:
+        """
+        The last scene record of a job manifest, with its scene graph loaded
+        from the sidecar. The manifest and sidecars are removed.
+        """
+        if not manifest_path.exists():
+            return None
+
         try:
-            with open(graph_path, "r") as f:
-                return json.load(f)
+            with open(manifest_path, "r") as f:
+                scenes = json.load(f).get("scenes", [])
         except:
-            return None
+            scenes = []
 
-    def _find_latest_image(self, script_stem: str) -> Optional[Path]:
+        record = None
+        if scenes:
+            record = dict(scenes[-1])
+            if record.get("scene_graph") is None and record.get("scene_graph_file"):
+                try:
+                    record["scene_graph"] = load_scene_graph(record["scene_graph_file"])
+                except (OSError, ValueError, struct.error):
+                    record["scene_graph"] = None
+        self._remove_job_files(manifest_path)
+        return record
 
-        image_dir = self.output_dir / "images" / script_stem
-        if not image_dir.exists():
-            return None
-        
-        png_files = list(image_dir.glob("*.png"))
-        if not png_files:
-            return None
-        
-        # Return the most recently modified png
-        return max(png_files, key=os.path.getmtime)
+    def _remove_job_files(self, manifest_path: Path):
+        # The manifest plus the scene graph sidecars MVLDScene wrote for it
+        for path in manifest_path.parent.glob(f"{manifest_path.stem}_*.sgb"):
+            path.unlink(missing_ok=True)
+        manifest_path.unlink(missing_ok=True)
+
+    def _normalize_image_path(self, image_path: Path) -> Path:
+        # Pool workers report absolute paths; express them relative to
+        # output_dir like a serial render so result files stay identical
+        try:
+            return self.output_dir / image_path.relative_to(self.output_dir.resolve())
+        except ValueError:
+            return image_path
 
     def extract_scene_graph(self, script_content: str) -> List[Dict[str, Any]]:
         """
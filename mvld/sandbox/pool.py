@@ -0,0 +1,147 @@
+import multiprocessing
+import os
+import queue
+import subprocess
+import sys
+import tempfile
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from mvld.sandbox.budget import CpuTimeSampler, RenderBudget, kill_process_group
+
+# Imported once by the fork server. Every render job is forked from that warm
+# interpreter, so manim/numpy/cairo and the MVLDScene star-import are never
+# re-imported per sample.
+PRELOAD_MODULES = ["manim", "manim.__main__", "mvld.sandbox.base"]
+
+
+def _render_job(cli_args: List[str], cwd: str, env: Dict[str, str], stdout_path: str, stderr_path: str, budget: Optional[RenderBudget] = None):
+    """
+    Body of a forked render child. Runs the manim CLI in-process with the
+    given arguments and exits with the same code the `manim` binary would.
+    """
+    # Own process group, so a timeout can kill anything the scene spawned
+    if hasattr(os, "setsid"):
+        os.setsid()
+    if budget is not None:
+        budget.apply_limits()
+
+    # Capture fd-level output so rich/manim logging ends up in the same
+    # stdout/stderr strings that subprocess.run(capture_output=True) gives.
+    for fd, path in ((1, stdout_path), (2, stderr_path)):
+        handle = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        os.dup2(handle, fd)
+        os.close(handle)
+
+    os.chdir(cwd)
+    os.environ.update(env)
+
+    code = 0
+    try:
+        from manim.__main__ import main
+        main.main(args=cli_args, prog_name="manim", standalone_mode=False)
+    except SystemExit as e:
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+    os._exit(code)
+
+
+def _get_context():
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("forkserver")
+        ctx.set_forkserver_preload(PRELOAD_MODULES)
+        return ctx
+    # No fork server on this platform: still isolate each job, just cold.
+    return multiprocessing.get_context("spawn")
+
+
+class RenderWorkerPool:
+    """
+    Pool of warm render workers backed by a multiprocessing fork server.
+
+    The fork server imports manim once; each job is a fresh child forked from
+    it, so a crashing or leaking scene never affects later jobs. Each of the
+    `size` slots owns its own media directory.
+    """
+    def __init__(self, size: int = 2):
+        if size < 1:
+            raise ValueError("RenderWorkerPool size must be at least 1.")
+        self.size = size
+        self._ctx = _get_context()
+        self._slots = queue.Queue()
+        for slot in range(size):
+            self._slots.put(slot)
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="mvld-render")
+
+    @contextmanager
+    def slot(self) -> Iterator[int]:
+        """
+        Reserves a worker slot for the duration of one job.
+        """
+        slot = self._slots.get()
+        try:
+            yield slot
+        finally:
+            self._slots.put(slot)
+
+    def run(self, cli_args: List[str], env: Optional[Dict[str, str]] = None, budget: Optional[RenderBudget] = None) -> subprocess.CompletedProcess:
+        """
+        Runs `manim <cli_args>` in a child forked from the warm fork server.
+
+        If the job outlives `budget.timeout_s`, its process group is killed
+        and subprocess.TimeoutExpired is raised with the output captured so far.
+        """
+        with tempfile.TemporaryDirectory(prefix="mvld-job-") as tmp:
+            stdout_path = Path(tmp) / "stdout"
+            stderr_path = Path(tmp) / "stderr"
+
+            proc = self._ctx.Process(
+                target=_render_job,
+                args=(cli_args, os.getcwd(), env or {}, str(stdout_path), str(stderr_path), budget)
+            )
+            proc.start()
+            with CpuTimeSampler(proc.pid) as sampler:
+                proc.join(budget.timeout_s if budget is not None else None)
+
+            timed_out = proc.is_alive()
+            if timed_out:
+                kill_process_group(proc.pid)
+                proc.join()
+
+            returncode = proc.exitcode
+            stdout = stdout_path.read_text(errors="replace") if stdout_path.exists() else ""
+            stderr = stderr_path.read_text(errors="replace") if stderr_path.exists() else ""
+
+        if timed_out:
+            raise subprocess.TimeoutExpired(["manim", *cli_args], budget.timeout_s, output=stdout, stderr=stderr)
+        if returncode < 0:
+            stderr = (stderr + "\n" if stderr else "") + f"Render worker terminated by signal {-returncode}."
+
+        completed = subprocess.CompletedProcess(["manim", *cli_args], returncode, stdout, stderr)
+        # Read by RenderBudget.classify to tell a CPU-limit SIGKILL from an OOM kill
+        completed.cpu_time = sampler.cpu_time
+        return completed
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """
+        Schedules `fn` on one of the pool's dispatcher threads.
+        """
+        return self._executor.submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,62 @@
+from typing import Dict, Any, List
+
+# Named render settings passed to manim as CLI flags. Background is kept
+# identical across profiles because it shifts CLIP scores on its own.
+RENDER_PROFILES: Dict[str, Dict[str, Any]] = {
+    # CLIP resizes the short side to 224px and center-crops, so anything
+    # above a 224px short side is thrown away by the scorer. 400x225 is the
+    # smallest 16:9 frame that never gets upsampled.
+    "score": {
+        "pixel_width": 400,
+        "pixel_height": 225,
+        "frame_rate": 15,
+        "background_color": "#000000"
+    },
+    "preview": {
+        "pixel_width": 854,
+        "pixel_height": 480,
+        "frame_rate": 30,
+        "background_color": "#000000"
+    },
+    # manim's own defaults (1080p60)
+    "publication": {
+        "pixel_width": 1920,
+        "pixel_height": 1080,
+        "frame_rate": 60,
+        "background_color": "#000000"
+    },
+}
+
+# Reference profile for drift measurements
+REFERENCE_PROFILE = "publication"
+
+# Largest mean |CLIP score - reference CLIP score| (CLIP similarity points,
+# i.e. 100 * cosine) a profile may introduce to be used for scoring. This is
+# a budget, not a measurement: scripts/bench_render_profiles.py measures the
+# drift of every profile (it needs manim and CLIP) and exits non-zero when
+# DEFAULT_PROFILE exceeds it or too few scenes were scored to tell. Run it
+# after changing a profile and record the result here.
+CLIP_DRIFT_TOLERANCE = 0.5
+
+# Cheapest profile meant to stay within CLIP_DRIFT_TOLERANCE; used by the
+# RFT pipeline, the refinement loop and the CLI unless overridden. Its drift
+# has not been measured yet (see above).
+DEFAULT_PROFILE = "score"
+
+
+def get_profile(name: str) -> Dict[str, Any]:
+    if name not in RENDER_PROFILES:
+        raise ValueError(f"Render profile '{name}' not found. Available: {', '.join(RENDER_PROFILES)}")
+    return RENDER_PROFILES[name]
+
+
+def profile_args(name: str) -> List[str]:
+    """
+    manim CLI flags that apply the named profile.
+    """
+    profile = get_profile(name)
+    return [
+        "--resolution", f"{profile['pixel_width']},{profile['pixel_height']}",
+        "--frame_rate", str(profile["frame_rate"]),
+        "--background_color", profile["background_color"]
+    ]
@@ -0,0 +1,189 @@
+import json
+import struct
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Union
+import numpy as np
+
+# File MVLDScene writes next to the media when no job manifest is set
+SCENE_GRAPH_FILE = "scene_graph.sgb"
+
+# Record layout (little-endian): header, u32-length-prefixed UTF-8 strings
+# (types, colors, then per-row extras if flagged), then the columns
+# type_ids u16, color_ids u16, position f32x3, width, height f32,
+# z_index i32 or f32, radius f32.
+MAGIC = b"MVSG"
+FORMAT_VERSION = 1
+FLAG_INT_Z = 1
+FLAG_EXTRAS = 2
+HEADER = struct.Struct("<4sBBIHH")
+STRING_LENGTH = struct.Struct("<I")
+# Type and color ids are u16, and so are the string table sizes
+MAX_STRINGS = 0xFFFF
+
+# Keys MVLDScene.extract_scene_graph emits, in order. Anything else a scene
+# graph carries is kept verbatim in the `extras` column.
+KNOWN_KEYS = ("type", "position", "color", "width", "height", "z_index", "radius")
+
+
+class SceneGraphArrays:
+    """
+    Column-oriented scene graph: one row per mobject.
+
+    Geometry (`position` (N, 3), `width`, `height`, `radius`) is float32;
+    `radius` is NaN for mobjects without one. Type and color strings are
+    interned into `types`/`colors` and referenced by uint16 ids. `z_index`
+    keeps its integer dtype when every value is integral.
+
+    Stored as a fixed-layout binary record (SCENE_GRAPH_FILE) that is read
+    back as zero-copy `np.frombuffer` views. `from_json`/`to_json` convert
+    to and from the list-of-dicts form the evaluators use. Strings, ints
+    and key sets round-trip exactly; floats come back as their float32
+    values, so a second conversion is the identity.
+    """
+    def __init__(self, types: List[str], colors: List[str], type_ids: np.ndarray, color_ids: np.ndarray, position: np.ndarray, width: np.ndarray, height: np.ndarray, z_index: np.ndarray, radius: np.ndarray, extras: Optional[List[str]] = None):
+        self.types = types
+        self.colors = colors
+        self.type_ids = type_ids
+        self.color_ids = color_ids
+        self.position = position
+        self.width = width
+        self.height = height
+        self.z_index = z_index
+        self.radius = radius
+        # JSON object per row with the non-standard keys ("" if none), or None
+        self.extras = extras
+
+    def __len__(self) -> int:
+        return len(self.type_ids)
+
+    @classmethod
+    def from_json(cls, scene_graph: List[Dict[str, Any]]) -> "SceneGraphArrays":
+        type_index: Dict[str, int] = {}
+        color_index: Dict[str, int] = {}
+        type_ids = [type_index.setdefault(m["type"], len(type_index)) for m in scene_graph]
+        color_ids = [color_index.setdefault(m["color"], len(color_index)) for m in scene_graph]
+        if len(type_index) > MAX_STRINGS or len(color_index) > MAX_STRINGS:
+            raise ValueError(f"Scene graph has more than {MAX_STRINGS} distinct types or colors.")
+
+        z_values = [m["z_index"] for m in scene_graph]
+        z_dtype = np.int32 if all(isinstance(z, int) for z in z_values) else np.float32
+
+        extras = [
+            {k: v for k, v in m.items() if k not in KNOWN_KEYS} for m in scene_graph
+        ]
+        has_extras = any(extras)
+
+        return cls(
+            types=list(type_index),
+            colors=list(color_index),
+            type_ids=np.asarray(type_ids, dtype=np.uint16),
+            color_ids=np.asarray(color_ids, dtype=np.uint16),
+            position=np.asarray([m["position"] for m in scene_graph], dtype=np.float32).reshape(-1, 3),
+            width=np.asarray([m["width"] for m in scene_graph], dtype=np.float32),
+            height=np.asarray([m["height"] for m in scene_graph], dtype=np.float32),
+            z_index=np.asarray(z_values, dtype=z_dtype),
+            radius=np.asarray([m.get("radius", np.nan) for m in scene_graph], dtype=np.float32),
+            extras=[json.dumps(e) if e else "" for e in extras] if has_extras else None
+        )
+
+    def to_json(self) -> List[Dict[str, Any]]:
+        types = [self.types[t] for t in self.type_ids.tolist()]
+        colors = [self.colors[c] for c in self.color_ids.tolist()]
+        position = self.position.tolist()
+        width = self.width.tolist()
+        height = self.height.tolist()
+        z_index = self.z_index.tolist()
+        radius = self.radius.tolist()
+
+        scene_graph = []
+        for i in range(len(self)):
+            data = {
+                "type": types[i],
+                "position": position[i],
+                "color": colors[i],
+                "width": width[i],
+                "height": height[i],
+                "z_index": z_index[i]
+            }
+            if radius[i] == radius[i]:  # not NaN
+                data["radius"] = radius[i]
+            if self.extras is not None and self.extras[i]:
+                data.update(json.loads(self.extras[i]))
+            scene_graph.append(data)
+        return scene_graph
+
+    def save(self, path: Union[str, Path]):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "SceneGraphArrays":
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+    def to_bytes(self) -> bytes:
+        """
+        Encodes the fixed-layout record: header, string tables, then the
+        columns back to back (32 bytes per mobject).
+        """
+        n = len(self)
+        flags = (FLAG_INT_Z if self.z_index.dtype.kind == "i" else 0) | (FLAG_EXTRAS if self.extras is not None else 0)
+        parts = [HEADER.pack(MAGIC, FORMAT_VERSION, flags, n, len(self.types), len(self.colors))]
+        for text in self.types + self.colors + (self.extras or []):
+            encoded = text.encode("utf-8")
+            parts.append(STRING_LENGTH.pack(len(encoded)))
+            parts.append(encoded)
+        parts += [
+            self.type_ids.astype("<u2").tobytes(),
+            self.color_ids.astype("<u2").tobytes(),
+            self.position.astype("<f4").tobytes(),
+            self.width.astype("<f4").tobytes(),
+            self.height.astype("<f4").tobytes(),
+            self.z_index.astype("<i4" if flags & FLAG_INT_Z else "<f4").tobytes(),
+            self.radius.astype("<f4").tobytes()
+        ]
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "SceneGraphArrays":
+        magic, version, flags, n, num_types, num_colors = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"Not a scene graph record (version {FORMAT_VERSION}).")
+
+        offset = HEADER.size
+        strings = []
+        for _ in range(num_types + num_colors + (n if flags & FLAG_EXTRAS else 0)):
+            (length,) = STRING_LENGTH.unpack_from(data, offset)
+            offset += STRING_LENGTH.size
+            strings.append(data[offset:offset + length].decode("utf-8"))
+            offset += length
+
+        def column(dtype: str, count: int) -> np.ndarray:
+            nonlocal offset
+            array = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+            offset += array.nbytes
+            return array
+
+        return cls(
+            types=strings[:num_types],
+            colors=strings[num_types:num_types + num_colors],
+            type_ids=column("<u2", n),
+            color_ids=column("<u2", n),
+            position=column("<f4", 3 * n).reshape(-1, 3),
+            width=column("<f4", n),
+            height=column("<f4", n),
+            z_index=column("<i4" if flags & FLAG_INT_Z else "<f4", n),
+            radius=column("<f4", n),
+            extras=strings[num_types + num_colors:] if flags & FLAG_EXTRAS else None
+        )
+
+
+def load_scene_graph(path: Union[str, Path]) -> List[Dict[str, Any]]:
+    """
+    Reads a scene graph file in either format (.sgb record or legacy .json).
+    """
+    path = Path(path)
+    if path.suffix == ".sgb":
+        return SceneGraphArrays.load(path).to_json()
+    with open(path, "r") as f:
+        return json.load(f)
@@ -0,0 +1,112 @@
+"""
+Measures how far each render profile moves CLIP scores away from the
+reference (full resolution) profile, and how long each profile takes.
+
+Exits with code 1 when the default profile's mean drift exceeds
+CLIP_DRIFT_TOLERANCE, or when fewer than `--min-scored` of the scenes
+rendered and scored under both it and the reference (drift unmeasured).
+
+    python scripts/bench_render_profiles.py --num-samples 50 --workers 4
+"""
+import json
+import random
+import statistics
+import time
+from pathlib import Path
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from mvld.data.generator import SyntheticGenerator
+from mvld.eval.evaluator import CLIPScorer
+from mvld.sandbox.executor import ManimSandbox
+from mvld.sandbox.profiles import CLIP_DRIFT_TOLERANCE, DEFAULT_PROFILE, REFERENCE_PROFILE, RENDER_PROFILES
+
+console = Console()
+
+
+def main(
+    num_samples: int = typer.Option(50, "--num-samples", "-n", help="Synthetic scenes to render per profile"),
+    workers: int = typer.Option(4, "--workers", "-w", help="Warm render workers"),
+    seed: int = typer.Option(0, "--seed", help="Seed for the synthetic scenes"),
+    min_scored: float = typer.Option(0.9, "--min-scored", help="Fraction of scenes the default profile must be compared on"),
+    output_dir: Path = typer.Option("results/bench/profiles", "--output-dir", "-o", help="Render and report directory"),
+):
+    random.seed(seed)
+    gen = SyntheticGenerator()
+    samples = [gen.generate_random_scene(num_objects=random.randint(1, 4)) for _ in range(num_samples)]
+
+    scripts_dir = output_dir / "scripts"
+    scripts_dir.mkdir(parents=True, exist_ok=True)
+    script_paths = []
+    for i, sample in enumerate(samples):
+        path = scripts_dir / f"bench_{i}.py"
+        path.write_text(sample["code"])
+        script_paths.append(path)
+
+    scorer = CLIPScorer()
+    prompts = [sample["instruction"] for sample in samples]
+    scores, timings = {}, {}
+
+    for name in RENDER_PROFILES:
+        sandbox = ManimSandbox(output_dir=str(output_dir / name), workers=workers, profile=name)
+        start = time.perf_counter()
+        renders = list(sandbox.map_scripts(script_paths))
+        timings[name] = time.perf_counter() - start
+        sandbox.close()
+
+        scores[name] = [None] * num_samples
+        ok = [i for i, r in enumerate(renders) if r["success"] and r["image_path"]]
+        batch = scorer.score_batch([renders[i]["image_path"] for i in ok], [prompts[i] for i in ok])
+        for i, score in zip(ok, batch):
+            scores[name][i] = score
+
+    reference = scores[REFERENCE_PROFILE]
+    report = {"tolerance": CLIP_DRIFT_TOLERANCE, "reference": REFERENCE_PROFILE, "profiles": {}}
+
+    table = Table(title=f"Render profiles vs '{REFERENCE_PROFILE}' ({num_samples} scenes)")
+    for column in ["profile", "resolution", "fps", "render s/sample", "mean |drift|", "max |drift|", "within tolerance"]:
+        table.add_column(column)
+
+    for name, profile in RENDER_PROFILES.items():
+        drift = [abs(s - r) for s, r in zip(scores[name], reference) if s is not None and r is not None]
+        mean_drift = statistics.fmean(drift) if drift else float("nan")
+        max_drift = max(drift) if drift else float("nan")
+        within = bool(drift) and mean_drift <= CLIP_DRIFT_TOLERANCE
+
+        report["profiles"][name] = {
+            **profile,
+            "seconds_per_sample": timings[name] / num_samples,
+            "mean_abs_drift": mean_drift,
+            "max_abs_drift": max_drift,
+            "scored_samples": len(drift),
+            "within_tolerance": within
+        }
+        table.add_row(
+            name + (" (default)" if name == DEFAULT_PROFILE else ""),
+            f"{profile['pixel_width']}x{profile['pixel_height']}",
+            str(profile["frame_rate"]),
+            f"{timings[name] / num_samples:.3f}",
+            f"{mean_drift:.3f}",
+            f"{max_drift:.3f}",
+            "yes" if within else "NO"
+        )
+
+    console.print(table)
+    with open(output_dir / "profile_drift.json", "w") as f:
+        json.dump(report, f, indent=2)
+    console.print(f"Report saved to {output_dir / 'profile_drift.json'}")
+
+    default = report["profiles"][DEFAULT_PROFILE]
+    if default["scored_samples"] < min_scored * num_samples:
+        console.print(f"[bold red]Only {default['scored_samples']}/{num_samples} scenes scored under both '{DEFAULT_PROFILE}' and '{REFERENCE_PROFILE}'; drift not measured.[/bold red]")
+        raise typer.Exit(code=1)
+    if not default["within_tolerance"]:
+        console.print(f"[bold red]Default profile '{DEFAULT_PROFILE}' drifts {default['mean_abs_drift']:.3f} on average, over the {CLIP_DRIFT_TOLERANCE} tolerance.[/bold red]")
+        raise typer.Exit(code=1)
+    console.print(f"Default profile '{DEFAULT_PROFILE}': mean drift {default['mean_abs_drift']:.3f}, max {default['max_abs_drift']:.3f} (tolerance {CLIP_DRIFT_TOLERANCE}).")
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,125 @@
+"""
+Measures SVG path geometry throughput on a synthetic path corpus: path
+data parsing, vectorized bounding boxes, and the batched end-to-end call
+SVGLoader makes against one call per path.
+
+    python scripts/bench_svg_paths.py --num-paths 100000
+"""
+import json
+import random
+import time
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from mvld.data.loaders import PATH_BATCH
+from mvld.data.svg_path import bounding_boxes, parse_paths, path_geometry
+
+console = Console()
+
+
+def random_path(rng: random.Random, max_commands: int) -> str:
+    """
+    Path data in the mixed styles real exports use: absolute and relative
+    commands, implicit repeats, compact number separators and arc flags.
+    """
+    def num() -> str:
+        return f"{rng.uniform(-100, 100):.{rng.choice((0, 1, 2, 3))}f}"
+
+    def pairs(n: int) -> str:
+        return " ".join(f"{num()},{num()}" for _ in range(n))
+
+    parts = [f"M{num()} {num()}"]
+    for _ in range(rng.randint(1, max_commands)):
+        command = rng.choice("LLHVCCCSQTAZ")
+        letter = command.lower() if rng.random() < 0.5 else command
+        if command == "L":
+            parts.append(letter + pairs(rng.randint(1, 3)))
+        elif command in "HV":
+            parts.append(letter + num())
+        elif command == "C":
+            parts.append(letter + pairs(3))
+        elif command in "SQ":
+            parts.append(letter + pairs(2))
+        elif command == "T":
+            parts.append(letter + pairs(1))
+        elif command == "A":
+            parts.append(f"{letter}{abs(float(num())) + 1} {abs(float(num())) + 1} {num()} {rng.randint(0, 1)}{rng.randint(0, 1)}{num()} {num()}")
+        else:
+            parts.append(letter + f"M{num()} {num()}")
+    return "".join(parts)
+
+
+def main(
+    num_paths: int = typer.Option(100_000, "--num-paths", "-n", help="Paths in the synthetic corpus"),
+    max_commands: int = typer.Option(24, "--max-commands", help="Maximum drawing commands per path"),
+    per_path_sample: int = typer.Option(2000, "--per-path-sample", help="Paths timed with one call each"),
+    seed: int = typer.Option(0, "--seed", help="Corpus seed"),
+    output_dir: Path = typer.Option("results/bench/svg_paths", "--output-dir", "-o", help="Report directory"),
+):
+    rng = random.Random(seed)
+    corpus = [random_path(rng, max_commands) for _ in range(num_paths)]
+    megabytes = sum(len(d) for d in corpus) / 1e6
+
+    start = time.perf_counter()
+    segments = parse_paths(corpus)
+    parse_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    boxes = bounding_boxes(segments)
+    bbox_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for offset in range(0, num_paths, PATH_BATCH):
+        path_geometry(corpus[offset:offset + PATH_BATCH])
+    batched_s = time.perf_counter() - start
+
+    sample = corpus[:per_path_sample]
+    start = time.perf_counter()
+    single: List = [path_geometry([d])[0] for d in sample]
+    per_path_s = (time.perf_counter() - start) * num_paths / max(len(sample), 1)
+
+    # Batching must not change results
+    for d, geometry, box in zip(sample, single, boxes):
+        if geometry is None:
+            assert np.isnan(box).all(), d
+        else:
+            assert np.allclose(geometry["bbox"], box), d
+
+    num_segments = len(segments)
+    rows = {
+        "parse_paths": parse_s,
+        "bounding_boxes": bbox_s,
+        f"path_geometry, batches of {PATH_BATCH}": batched_s,
+        "path_geometry, one call per path (extrapolated)": per_path_s,
+    }
+    table = Table(title=f"SVG path geometry ({num_paths} paths, {num_segments} segments, {megabytes:.1f} MB of path data)")
+    for column in ["stage", "seconds", "paths/s", "segments/s", "MB/s"]:
+        table.add_column(column)
+    for name, seconds in rows.items():
+        table.add_row(name, f"{seconds:.2f}", f"{num_paths / seconds:,.0f}", f"{num_segments / seconds:,.0f}", f"{megabytes / seconds:.1f}")
+    console.print(table)
+
+    report = {
+        "num_paths": num_paths,
+        "num_segments": num_segments,
+        "segment_counts": {
+            "lines": len(segments.lines), "quads": len(segments.quads),
+            "cubics": len(segments.cubics), "arcs": len(segments.arcs)
+        },
+        "megabytes": megabytes,
+        "seconds": rows,
+        "paths_per_s": {name: num_paths / seconds for name, seconds in rows.items()}
+    }
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with open(output_dir / "report.json", "w") as f:
+        json.dump(report, f, indent=2)
+    console.print(f"Report saved to {output_dir / 'report.json'}")
+
+
+if __name__ == "__main__":
+    typer.run(main)
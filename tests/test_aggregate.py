@@ -0,0 +1,121 @@
+import json
+
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from mvld.pipeline.aggregate import Histogram, QuantileSketch, ResultsAggregator, RunningStats
+
+
+def clip_scores(rng, n):
+    # CLIP similarities of real renders sit around 20-35
+    return rng.normal(27.0, 4.0, n)
+
+
+def columns(scores, success):
+    return {
+        "render_success": success.tolist(),
+        "score": [None if np.isnan(s) else float(s) for s in scores],
+        "render_status": ["ok" if ok else "error" for ok in success.tolist()]
+    }
+
+
+def test_merge_matches_single_pass():
+    rng = np.random.default_rng(0)
+    scores = clip_scores(rng, 3000)
+    success = rng.random(3000) > 0.2
+
+    whole = ResultsAggregator()
+    whole.update_batch(columns(scores, success))
+    parts = []
+    for chunk in np.array_split(np.arange(3000), 7):
+        part = ResultsAggregator()
+        part.update_batch(columns(scores[chunk], success[chunk]))
+        # Partials go through disk in the report workflow
+        parts.append(ResultsAggregator.from_dict(json.loads(json.dumps(part.to_dict()))))
+    merged = ResultsAggregator.merge_all(parts)
+
+    a, b = whole.summary(), merged.summary()
+    assert a["total_samples"] == b["total_samples"] == 3000
+    assert a["render_status"] == b["render_status"]
+    assert b["mean_clip_score"] == pytest.approx(scores[success].mean())
+    assert b["score_std"] == pytest.approx(scores[success].std())
+    assert a["score_quantiles"] == b["score_quantiles"]
+    assert np.array_equal(whole.histogram.counts, merged.histogram.counts)
+
+
+def test_quantiles_within_relative_accuracy():
+    rng = np.random.default_rng(1)
+    scores = clip_scores(rng, 5000)
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    sketch.update(scores)
+    for q in (0.05, 0.5, 0.95, 0.99):
+        exact = np.quantile(scores, q, method="lower")
+        assert abs(sketch.quantile(q) - exact) <= 0.011 * abs(exact) + 0.05
+
+
+def test_histogram_covers_clip_scores():
+    rng = np.random.default_rng(2)
+    scores = clip_scores(rng, 1000)
+    agg = ResultsAggregator()
+    agg.update_batch(columns(scores, np.ones(1000, dtype=bool)))
+
+    summary = agg.summary()
+    assert agg.histogram.counts.sum() == 1000
+    assert summary["score_underflow"] == 0
+    assert summary["score_overflow"] == 0
+
+
+def test_out_of_range_scores_are_reported():
+    agg = ResultsAggregator(low=0.0, high=1.0, bins=10)
+    agg.update_batch(columns(np.array([-0.5, 0.25, 0.95, 1.0, 30.0, np.nan]), np.ones(6, dtype=bool)))
+
+    summary = agg.summary()
+    assert agg.histogram.counts.sum() == 2
+    assert summary["score_underflow"] == 1
+    assert summary["score_overflow"] == 2
+    assert summary["render_success_rate"] == 1.0
+
+
+def test_success_rate_counts_unscored_renders():
+    # Geometry-only runs render successfully without a CLIP score
+    agg = ResultsAggregator()
+    agg.update([
+        {"render_success": True, "score": None, "render_status": "ok"},
+        {"render_success": True, "score": None, "render_status": "ok"},
+        {"render_success": True, "score": None, "render_status": "ok"},
+        {"render_success": False, "score": None, "render_status": "error"}
+    ])
+    merged = ResultsAggregator.from_dict(json.loads(json.dumps(agg.to_dict()))).merge(ResultsAggregator())
+
+    for summary in (agg.summary(), merged.summary()):
+        assert summary["render_success_rate"] == 0.75
+        assert summary["mean_clip_score"] == 0
+        assert summary["score_quantiles"] == {}
+
+
+def test_record_batches_match_dicts():
+    rng = np.random.default_rng(3)
+    scores = clip_scores(rng, 200)
+    scores[::9] = np.nan
+    success = rng.random(200) > 0.3
+    data = columns(scores, success)
+
+    from_dict, from_arrow = ResultsAggregator(), ResultsAggregator()
+    from_dict.update_batch(data)
+    from_arrow.update_batch(pa.RecordBatch.from_pydict(data))
+    assert from_dict.summary() == from_arrow.summary()
+
+
+def test_mismatched_parts_do_not_merge():
+    with pytest.raises(ValueError):
+        Histogram(0.0, 100.0, 100).merge(Histogram(0.0, 1.0, 20))
+    with pytest.raises(ValueError):
+        QuantileSketch(0.01).merge(QuantileSketch(0.02))
+
+
+def test_running_stats_merge_empty():
+    stats = RunningStats()
+    stats.update([])
+    stats.merge(RunningStats())
+    assert stats.count == 0 and stats.variance == 0.0
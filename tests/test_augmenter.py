@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from mvld.data.augmenter import CoordinateAugmenter
+from mvld.data.generator import SyntheticGenerator
+
+
+@pytest.mark.parametrize("code, expected", [
+    ("circle.shift(LEFT * 2 + UP).move_to([0.5, -0.2, 0])", [[-2, 1, 0], [0.5, -0.2, 0]]),
+    ("sq.shift(UP, RIGHT * 0.5).shift([1, 2])", [[0.5, 1, 0], [1, 2, 0]]),
+    ("b = Square().next_to(a, DOWN * 2, buff=0.5)", [[0, -2, 0]]),
+    ("Dot(point=[1, 2, 0]); Dot([3, 4])", [[1, 2, 0], [3, 4, 0]]),
+    ("sq.move_to(np.array([1.5, -1, 0]) / 2)", [[0.75, -0.5, 0]]),
+    ("title.to_edge(UP); Arrow(start=LEFT * 2, end=-LEFT)", [[0, 1, 0], [-2, 0, 0], [1, 0, 0]]),
+    # Repeats are reported once, in first-seen order
+    ("a.shift(RIGHT); b.move_to([1, 0, 0]); c.shift(LEFT)", [[1, 0, 0], [-1, 0, 0]]),
+])
+def test_placement_coordinates(code, expected):
+    assert CoordinateAugmenter().extract_coordinates(code) == expected
+
+
+@pytest.mark.parametrize("code", [
+    "ax = Axes(x_range=[-3, 3], y_range=[0, 5])",
+    "plane = NumberPlane(x_range=(-7, 7, 1), y_range=(-4, 4, 1))",
+    "t = Text('A', color=[1, 0, 0]); values = [2, 3]; arr = np.array([1, 2, 3])",
+    "bars = BarChart(values=[3, 5, 1]).scale(0.5)",
+    "UPPER = 1; x = UPPER * 2",
+])
+def test_number_lists_outside_placements_are_ignored(code):
+    assert CoordinateAugmenter().extract_coordinates(code) == []
+
+
+def test_axes_ranges_do_not_reach_the_instruction():
+    code = "ax = Axes(x_range=[-3, 3], y_range=[0, 5])\ndot = Dot(ax.c2p(1, 2)).shift([1, 2, 0])"
+    augmenter = CoordinateAugmenter()
+    assert augmenter.augment_instruction("Plot a point.", code) == "Plot a point. with coordinates: [1.00, 2.00]"
+    assert augmenter.augment_instruction("Draw axes.", "Axes(x_range=[-3, 3])") == "Draw axes."
+
+
+def test_unparseable_code_falls_back_to_patterns():
+    coords = CoordinateAugmenter().extract_coordinates("c.move_to([1, 2, 3]) LEFT (")
+    assert coords == [[1, 2, 3], [-1, 0, 0]]
+
+
+def test_max_coordinates():
+    code = "; ".join(f"c.shift([{i}, 0, 0])" for i in range(8))
+    assert len(CoordinateAugmenter(max_coordinates=3).extract_coordinates(code)) == 3
+
+
+def test_batch_notes_match_the_augmenter():
+    augmenter = CoordinateAugmenter()
+    samples = SyntheticGenerator().generate_batch(np.random.default_rng(0), 50)
+    plain = SyntheticGenerator().generate_batch(np.random.default_rng(0), 50, augment=False)
+
+    batch = augmenter.augment_batch({"instruction": [s["instruction"] for s in plain], "code": [s["code"] for s in plain]})
+    assert batch["instruction"] == [s["instruction"] for s in samples]
+
+
+def test_extract_placements():
+    code = "a = Square(color=BLUE).shift(LEFT * 2).set_color(RED)\nb = Circle().next_to(a, UP)\nax = Axes(x_range=[-3, 3])"
+    assert CoordinateAugmenter().extract_placements(code) == [{"type": "Square", "position": [-2.0, 0.0, 0.0]}]
@@ -0,0 +1,96 @@
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+from mvld.sandbox.budget import (
+    CpuTimeSampler, RenderBudget, kill_process_group,
+    STATUS_CPU_LIMIT, STATUS_ERROR, STATUS_OK, STATUS_OOM, STATUS_TIMEOUT
+)
+
+posix_only = pytest.mark.skipif(not os.path.exists("/proc/self/stat"), reason="needs POSIX rlimits and /proc")
+
+SIGKILL = -signal.SIGKILL
+
+
+@pytest.mark.parametrize("budget_kwargs, returncode, stderr, timed_out, cpu_time, expected", [
+    ({}, SIGKILL, "", True, None, STATUS_TIMEOUT),
+    ({}, 0, "", False, None, STATUS_OK),
+    ({}, 1, "Traceback ...", False, 0.5, STATUS_ERROR),
+    ({}, -getattr(signal, "SIGXCPU", 24), "", False, None, STATUS_CPU_LIMIT),
+    ({}, 1, "MemoryError", False, 0.5, STATUS_OOM),
+    ({"memory_bytes": None}, 1, "MemoryError", False, 0.5, STATUS_ERROR),
+    # RLIMIT_CPU hard limit for a job that ignored SIGXCPU
+    ({"cpu_seconds": 10}, SIGKILL, "", False, 10.9, STATUS_CPU_LIMIT),
+    ({"cpu_seconds": 10}, 128 + signal.SIGKILL, "", False, 9.5, STATUS_CPU_LIMIT),
+    # Far from the CPU budget: the OOM killer, if a memory limit was set
+    ({"cpu_seconds": 10}, SIGKILL, "", False, 2.0, STATUS_OOM),
+    ({"cpu_seconds": 10, "memory_bytes": None}, SIGKILL, "", False, 2.0, STATUS_ERROR),
+    ({"cpu_seconds": None}, SIGKILL, "", False, 2.0, STATUS_OOM),
+    # Unknown CPU time: an external kill is as likely as either limit
+    ({}, SIGKILL, "", False, None, STATUS_ERROR),
+])
+def test_classify(budget_kwargs, returncode, stderr, timed_out, cpu_time, expected):
+    budget = RenderBudget(**budget_kwargs)
+    assert budget.classify(returncode, stderr, timed_out, cpu_time=cpu_time) == expected
+
+
+BUSY_LOOP = "import signal; signal.signal(signal.SIGXCPU, signal.SIG_IGN)\nwhile True: pass"
+
+
+@posix_only
+def test_cpu_hard_limit_is_not_reported_as_oom():
+    budget = RenderBudget(timeout_s=30, cpu_seconds=1)
+    proc = subprocess.Popen([sys.executable, "-c", BUSY_LOOP], preexec_fn=budget.apply_limits)
+    with CpuTimeSampler(proc.pid, interval_s=0.05) as sampler:
+        proc.wait(timeout=30)
+
+    assert proc.returncode == SIGKILL
+    assert sampler.cpu_time >= 1.0
+    assert budget.classify(proc.returncode, "", False, cpu_time=sampler.cpu_time) == STATUS_CPU_LIMIT
+
+
+@posix_only
+def test_cpu_time_sampler_tracks_a_busy_child():
+    proc = subprocess.Popen([sys.executable, "-c", "import time\nend = time.time() + 0.5\nwhile time.time() < end: pass"])
+    with CpuTimeSampler(proc.pid, interval_s=0.02) as sampler:
+        proc.wait(timeout=30)
+    assert 0.2 <= sampler.cpu_time <= 5.0
+
+    # A reaped pid leaves the last sample in place; an unknown one reads as None
+    assert CpuTimeSampler(proc.pid).sample() is None
+
+
+def process_state(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            stat = f.read()
+    except OSError:
+        return None
+    return stat[stat.rfind(")") + 2]
+
+
+@posix_only
+def test_kill_process_group_reaches_grandchildren():
+    proc = subprocess.Popen(["sh", "-c", "sleep 30 & echo $!; wait"], stdout=subprocess.PIPE, text=True,
+                            start_new_session=True)
+    grandchild = int(proc.stdout.readline())
+    assert process_state(grandchild) not in (None, "Z")
+
+    kill_process_group(proc.pid)
+    proc.wait(timeout=10)
+    proc.stdout.close()
+
+    deadline = time.time() + 10
+    while process_state(grandchild) not in (None, "Z") and time.time() < deadline:
+        time.sleep(0.05)
+    assert process_state(grandchild) in (None, "Z")
+
+
+def test_kill_process_group_ignores_exited_jobs():
+    proc = subprocess.Popen([sys.executable, "-c", "pass"], start_new_session=True)
+    proc.wait(timeout=30)
+    kill_process_group(proc.pid)
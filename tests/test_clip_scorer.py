@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+clip = pytest.importorskip("clip")
+Image = pytest.importorskip("PIL.Image")
+
+from mvld.eval.embedding_store import ImageEmbeddingStore
+from mvld.eval.evaluator import CLIPScorer
+
+DIM = 8
+
+
+class FakeCLIP:
+    """
+    Stands in for the CLIP model: deterministic features from the pixels and
+    the prompt characters, and a count of encoder calls.
+    """
+    def __init__(self):
+        self.image_calls = 0
+        self.text_calls = 0
+
+    def encode_image(self, images):
+        self.image_calls += 1
+        return images[:, :DIM] + 1.0
+
+    def encode_text(self, tokens):
+        self.text_calls += 1
+        return tokens * 0.01
+
+
+def preprocess(image):
+    return torch.from_numpy(np.asarray(image.convert("RGB"), dtype=np.float32)).flatten()
+
+
+def tokenize(prompts):
+    return torch.tensor([[float(ord(c)) for c in (p * DIM)[:DIM]] for p in prompts])
+
+
+@pytest.fixture
+def scorer_factory(monkeypatch):
+    model = FakeCLIP()
+    monkeypatch.setattr(clip, "load", lambda name, device=None: (model, preprocess))
+    monkeypatch.setattr(clip, "tokenize", tokenize)
+
+    def make(**kwargs):
+        return CLIPScorer(device="cpu", **kwargs)
+    make.model = model
+    return make
+
+
+def write_images(tmp_path, n, seed=0):
+    rng = np.random.default_rng(seed)
+    paths = []
+    for i in range(n):
+        path = tmp_path / f"render_{i}.png"
+        Image.new("RGB", (4, 4), tuple(int(c) for c in rng.integers(0, 256, 3))).save(path)
+        paths.append(str(path))
+    return paths
+
+
+PROMPTS = ["A red circle", "A blue square", "A red circle", "Two dots", "A triangle", "Two dots", "An arrow"]
+
+
+@pytest.mark.parametrize("batch_size", [1, 3, 32])
+def test_score_batch_matches_score(tmp_path, scorer_factory, batch_size):
+    scorer = scorer_factory()
+    paths = write_images(tmp_path, len(PROMPTS))
+
+    expected = [scorer.score(path, prompt) for path, prompt in zip(paths, PROMPTS)]
+    assert scorer.score_batch(paths, PROMPTS, batch_size=batch_size, num_workers=2) == pytest.approx(expected, rel=1e-5)
+
+
+def test_stored_image_embeddings_give_the_same_scores(tmp_path, scorer_factory):
+    paths = write_images(tmp_path, len(PROMPTS))
+    expected = [scorer_factory().score(path, prompt) for path, prompt in zip(paths, PROMPTS)]
+
+    scorer = scorer_factory(image_store=ImageEmbeddingStore(str(tmp_path / "store"), "ViT-B/32"))
+    first = scorer.score_batch(paths, PROMPTS, batch_size=3)
+    calls = scorer_factory.model.image_calls
+    second = scorer.score_batch(paths, PROMPTS, batch_size=3)
+
+    assert first == pytest.approx(expected, rel=1e-5)
+    assert second == pytest.approx(expected, rel=1e-5)
+    # Every image came from the store on the second pass
+    assert scorer_factory.model.image_calls == calls
+    scorer.close()
+
+
+def test_score_batch_checks_lengths(scorer_factory):
+    scorer = scorer_factory()
+    assert scorer.score_batch([], []) == []
+    with pytest.raises(ValueError):
+        scorer.score_batch(["a.png"], [])
@@ -0,0 +1,94 @@
+import ast
+import random
+
+import numpy as np
+import pytest
+
+from mvld.data.contrastive import (
+    OP_SHAPE_SWAP, OPERATORS, SHAPE_KWARGS, STYLE_KWARGS, ContrastiveGenerator, ErrorSeeder
+)
+from mvld.data.generator import SyntheticGenerator
+
+CODE = """from mvld.sandbox.base import MVLDScene
+from manim import *
+class Scene(MVLDScene):
+    def construct(self):
+        circle = Circle(radius=1.5, color=RED).shift([1.5, -2, 0])
+        rect = Rectangle(width=3, height=1, color=BLUE).next_to(circle, LEFT * 2)
+        self.add(circle)
+        self.add(rect)
+"""
+
+
+def shape_calls(code):
+    return [
+        (node.func.id, {kw.arg for kw in node.keywords}, len(node.args))
+        for node in ast.walk(ast.parse(code))
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in SHAPE_KWARGS
+    ]
+
+
+def test_negatives_parse_and_differ():
+    seeder = ErrorSeeder(seed=0)
+    negatives = seeder.generate_negatives(CODE, k=50, rng=random.Random(0))
+
+    # One negative per mutation site
+    assert len(negatives) == len({n for n, _, _ in negatives}) == len(seeder.sites(CODE)) == 9
+    assert {op for _, _, op in negatives} == set(OPERATORS)
+    for negative, description, _ in negatives:
+        ast.parse(negative)
+        assert negative != CODE
+        assert description
+
+
+def test_generated_scenes_always_mutate():
+    seeder = ErrorSeeder(seed=1)
+    for sample in SyntheticGenerator().generate_batch(np.random.default_rng(0), 200):
+        negative, description = seeder.generate_negative(sample["code"])
+        ast.parse(negative)
+        assert negative != sample["code"] and description
+
+
+def test_shape_swaps_keep_constructor_arguments_valid():
+    seeder = ErrorSeeder(seed=0, operators=(OP_SHAPE_SWAP,))
+    negatives = seeder.generate_negatives(CODE, k=50, rng=random.Random(0))
+
+    swapped = {name for negative, _, _ in negatives for name, _, _ in shape_calls(negative)} - {"Circle", "Rectangle"}
+    assert swapped
+    for negative, _, _ in negatives:
+        for name, kwargs, num_args in shape_calls(negative):
+            assert num_args == 0
+            assert kwargs - STYLE_KWARGS <= SHAPE_KWARGS[name], (name, kwargs)
+    # Rectangle(width, height) can only become an Ellipse
+    assert {n for negative, _, _ in negatives for n, kwargs, _ in shape_calls(negative) if "width" in kwargs} <= {"Rectangle", "Ellipse"}
+
+
+@pytest.mark.parametrize("code", ["Circle(1.0)", "Star(**style)", "Dot(point=ORIGIN, weird=1)"])
+def test_unsafe_shape_calls_are_not_swapped(code):
+    seeder = ErrorSeeder(seed=0, operators=(OP_SHAPE_SWAP,))
+    assert seeder.sites(code) == []
+
+
+def test_unmutable_code_yields_no_pair():
+    seeder = ErrorSeeder(seed=0)
+    for code in ["x = 1", "def broken(:", ""]:
+        assert seeder.generate_negative(code) is None
+
+    generator = ContrastiveGenerator(seed=0, negatives_per_sample=2)
+    assert generator.create_triplet("Nothing", "x = 1") is None
+    batch = generator.triplets_batch({"instruction": ["Nothing", "Shapes"], "code": ["x = 1", CODE]})
+    assert batch["prompt"] == ["Shapes", "Shapes"]
+    assert all(rejected != CODE for rejected in batch["rejected"])
+
+
+def test_triplets_do_not_depend_on_batching():
+    generator = ContrastiveGenerator(seed=3, negatives_per_sample=3)
+    samples = SyntheticGenerator().generate_batch(np.random.default_rng(1), 20)
+    whole = generator.triplets_batch({"instruction": [s["instruction"] for s in samples], "code": [s["code"] for s in samples]})
+    pieces = [generator.triplets_batch({"instruction": [s["instruction"]], "code": [s["code"]]}) for s in samples]
+    assert whole["rejected"] == [r for piece in pieces for r in piece["rejected"]]
+
+
+def test_unknown_operator_rejected():
+    with pytest.raises(ValueError):
+        ErrorSeeder(operators=("teleport",))
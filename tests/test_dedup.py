@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from mvld.data.dataset import MVLDDataset
+from mvld.data.dedup import STATUS_EXACT, STATUS_NEAR, STATUS_UNIQUE, DedupIndex, dedup_shards, exact_hash
+from mvld.data.shards import load_shards
+
+HEADER = "from mvld.sandbox.base import MVLDScene\nfrom manim import *\nclass Scene(MVLDScene):\n    def construct(self):\n"
+
+
+def scene(*lines):
+    return HEADER + "\n".join(f"        {line}" for line in lines)
+
+
+def test_exact_duplicates_ignore_whitespace():
+    assert exact_hash("Draw  a circle.", "x = 1\n") == exact_hash("Draw a circle.", "x   =   1")
+
+    index = DedupIndex()
+    code = scene("c = Circle(color=RED).shift([1.0, 2.0, 0])", "self.add(c)")
+    statuses = index.add_batch(["Draw a red circle.", "Draw a  red circle. "], [code, code.replace("\n", "\n\n")])
+    assert statuses == [(STATUS_UNIQUE, 0), (STATUS_EXACT, 0)]
+
+
+def test_near_duplicates_within_number_precision_and_comments():
+    index = DedupIndex()
+    base = scene(*[f"obj_{i} = Square(color=BLUE).shift([{i}.0, {i % 3}.0, 0])\n        self.add(obj_{i})" for i in range(6)])
+    near = base.replace("[5.0, 2.0, 0]", "[5.02, 2.0, 0]") + "\n        # tweak"
+    statuses = index.add_batch(["Draw six blue squares.", "Draw six blue squares."], [base, near])
+    assert statuses[0] == (STATUS_UNIQUE, 0)
+    assert statuses[1] == (STATUS_NEAR, 0)
+
+
+def test_different_scenes_are_kept():
+    index = DedupIndex()
+    codes = [
+        scene("c = Circle(color=RED).shift([1.0, 2.0, 0])", "self.add(c)"),
+        scene("s = Square(color=BLUE).shift([-3.0, 0.5, 0])", "self.add(s)"),
+        scene("t = Triangle(color=GREEN).next_to(ORIGIN, UP)", "self.add(t)"),
+    ]
+    keep = index.keep_mask(["Draw a red circle.", "Draw a blue square.", "Draw a green triangle."], codes)
+    assert keep.tolist() == [True, True, True]
+    assert index.stats()["duplicate_rate"] == 0.0
+
+
+def test_first_occurrence_kept_across_batches():
+    instructions = [f"Sample {i % 5}" for i in range(20)]
+    codes = [scene(f"d = Dot().shift([{i % 5}.0, 0, 0])", "self.add(d)") for i in range(20)]
+    keep = DedupIndex().keep_mask(instructions, codes, batch_size=3)
+    assert np.flatnonzero(keep).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_persisted_index_reloads_saved_rows_only(tmp_path):
+    index = DedupIndex(str(tmp_path / "index"))
+    index.add_batch(["a", "b"], [scene("self.add(Circle())"), scene("self.add(Square())")])
+    index.save()
+    index.add_batch(["c"], [scene("self.add(Triangle())")])
+
+    reloaded = DedupIndex(str(tmp_path / "index"))
+    assert len(reloaded) == 2
+    assert reloaded.add_batch(["a"], [scene("self.add(Circle())")]) == [(STATUS_EXACT, 0)]
+    assert reloaded.add_batch(["c"], [scene("self.add(Triangle())")])[0][0] == STATUS_UNIQUE
+
+    with pytest.raises(ValueError):
+        DedupIndex(str(tmp_path / "index"), num_perm=64)
+
+
+def test_dedup_shards_skips_processed_shards(tmp_path):
+    MVLDDataset().generate_bulk_sharded(60, str(tmp_path / "raw"), seed=0, shard_size=20, workers=1)
+    index = DedupIndex(str(tmp_path / "index"))
+    first = dedup_shards(str(tmp_path / "raw"), str(tmp_path / "dedup"), index)
+
+    rows = load_shards(tmp_path / "dedup")
+    assert first["num_rows"] == len(rows) <= 60
+    assert len(set(zip(rows["instruction"], rows["code"]))) == len(rows)
+
+    again = dedup_shards(str(tmp_path / "raw"), str(tmp_path / "dedup"), DedupIndex(str(tmp_path / "index")))
+    assert again["shards"] == first["shards"]
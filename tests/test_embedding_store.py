@@ -0,0 +1,60 @@
+import json
+
+import numpy as np
+
+from mvld.eval.embedding_store import ImageEmbeddingStore
+
+
+def vectors(n, dim=4, seed=0):
+    return np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+
+
+def test_append_logs_without_rewriting_index(tmp_path):
+    store = ImageEmbeddingStore(str(tmp_path), "ViT-B/32")
+    index_bytes = (tmp_path / store.INDEX_FILE).read_bytes()
+
+    store.append(["a", "b"], vectors(2))
+    store.append(["c", "a"], vectors(2, seed=1))
+
+    assert (tmp_path / store.INDEX_FILE).read_bytes() == index_bytes
+    log = (tmp_path / store.LOG_FILE).read_text().splitlines()
+    assert [json.loads(line)["digest"] for line in log] == ["a", "b", "c"]
+
+
+def test_reopen_replays_log_and_close_compacts_it(tmp_path):
+    data = vectors(3)
+    store = ImageEmbeddingStore(str(tmp_path), "ViT-B/32")
+    store.append(["a", "b", "c"], data)
+    store.remove(["b"])
+
+    reopened = ImageEmbeddingStore(str(tmp_path), "ViT-B/32")
+    assert set(reopened.entries) == {"a", "c"}
+    np.testing.assert_array_equal(reopened.matrix(["a", "c"]), data[[0, 2]])
+
+    reopened.close()
+    assert not (tmp_path / store.LOG_FILE).exists()
+    closed = ImageEmbeddingStore(str(tmp_path), "ViT-B/32")
+    np.testing.assert_array_equal(closed.get("c"), data[2])
+
+
+def test_torn_log_tail_and_unlogged_rows_are_dropped(tmp_path):
+    store = ImageEmbeddingStore(str(tmp_path), "ViT-B/32")
+    store.append(["a"], vectors(1))
+    # A writer that died after writing data but mid-way through the log line
+    with open(tmp_path / store.DATA_FILE, "ab") as f:
+        f.write(vectors(1, seed=2).tobytes())
+    with open(tmp_path / store.LOG_FILE, "a") as f:
+        f.write('{"digest": "b", "ro')
+
+    reopened = ImageEmbeddingStore(str(tmp_path), "ViT-B/32")
+    assert set(reopened.entries) == {"a"}
+    assert (tmp_path / store.DATA_FILE).stat().st_size == 4 * 4
+
+    reopened.append(["c"], vectors(1, seed=3))
+    assert set(ImageEmbeddingStore(str(tmp_path), "ViT-B/32").entries) == {"a", "c"}
+
+
+def test_other_model_invalidates(tmp_path):
+    store = ImageEmbeddingStore(str(tmp_path), "ViT-B/32")
+    store.append(["a"], vectors(1))
+    assert len(ImageEmbeddingStore(str(tmp_path), "ViT-L/14")) == 0
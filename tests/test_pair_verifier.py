@@ -0,0 +1,135 @@
+from pathlib import Path
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from mvld.data.pair_verifier import (
+    PairVerifier, image_difference, scene_graph_difference,
+    REASON_CHOSEN_FAILED, REASON_KEPT, REASON_NO_DIFFERENCE, REASON_REJECTED_FAILED
+)
+from mvld.eval.verdict_cache import VerdictCache
+from mvld.sandbox.executor import ManimSandbox
+
+
+def mobject(x, type="Circle", color="#FF0000", width=2.0):
+    return {"type": type, "color": color, "position": [x, 0.0, 0.0], "width": width, "height": 2.0}
+
+
+class ScriptedSandbox(ManimSandbox):
+    """
+    Sandbox whose renders are looked up by program text instead of running manim.
+    """
+    def __init__(self, output_dir, outcomes):
+        super().__init__(output_dir=output_dir)
+        self.outcomes = outcomes
+        self.rendered = []
+
+    def run_script(self, script_path, scene_name=None, geometry_only=False):
+        code = Path(script_path).read_text()
+        self.rendered.append(code)
+        status, graph, image = self.outcomes[code]
+        return {"success": status == "ok", "status": status, "scene_graph": graph,
+                "image_path": None if geometry_only else image}
+
+
+def write_frame(tmp_path, name, pixel=(0, 0, 0), size=(8, 8)):
+    image = Image.new("RGB", size, (255, 255, 255))
+    image.putpixel((0, 0), pixel)
+    path = tmp_path / f"{name}.png"
+    image.save(path)
+    return str(path)
+
+
+@pytest.fixture
+def outcomes(tmp_path):
+    return {
+        "base": ("ok", [mobject(0.0)], write_frame(tmp_path, "base")),
+        "moved": ("ok", [mobject(1.0)], write_frame(tmp_path, "moved", pixel=(255, 0, 0))),
+        # Same frame as "base": the change is not visible
+        "invisible": ("ok", [mobject(0.0), mobject(0.0, type="Dot", color="#FFFFFF")], write_frame(tmp_path, "invisible")),
+        "nudged": ("ok", [mobject(0.01)], write_frame(tmp_path, "nudged", pixel=(3, 3, 3))),
+        "broken": ("error", None, None),
+        "slow": ("timeout", None, None),
+    }
+
+
+def verify(verifier, pairs):
+    return [verdict for _, verdict in verifier.verify({"chosen": c, "rejected": r} for c, r in pairs)]
+
+
+def test_known_pairs_are_accepted_and_rejected(tmp_path, outcomes):
+    sandbox = ScriptedSandbox(str(tmp_path / "media"), outcomes)
+    verifier = PairVerifier(sandbox, batch_size=3)
+    pairs = [("base", "moved"), ("base", "invisible"), ("base", "nudged"), ("base", "broken"), ("broken", "base")]
+
+    verdicts = verify(verifier, pairs)
+    assert [v["reason"] for v in verdicts] == [
+        REASON_KEPT, REASON_NO_DIFFERENCE, REASON_NO_DIFFERENCE, REASON_REJECTED_FAILED, REASON_CHOSEN_FAILED
+    ]
+    assert [v["keep"] for v in verdicts] == [True, False, False, False, False]
+    assert verdicts[0]["pixel_diff"] == pytest.approx(1 / 64)
+    assert verdicts[0]["scene_graph_diff"] == {"unmatched": 0, "max_displacement": 1.0, "max_resize": 0.0}
+    assert verdicts[1]["scene_graph_diff"]["unmatched"] == 1
+    assert verdicts[3]["rejected_status"] == "error"
+
+    # Each distinct program renders once per batch
+    assert sorted(sandbox.rendered) == sorted(["base", "moved", "invisible", "nudged", "base", "broken"])
+    assert verifier.stats()["kept"] == 1 and verifier.stats()["verified"] == 5
+    assert not list(verifier.scripts_dir.iterdir())
+
+
+def test_scene_graphs_decide_without_frames(tmp_path, outcomes):
+    sandbox = ScriptedSandbox(str(tmp_path / "media"), outcomes)
+    verdicts = verify(PairVerifier(sandbox, geometry_only=True), [("base", "moved"), ("base", "invisible"), ("base", "nudged")])
+
+    assert [v["keep"] for v in verdicts] == [True, True, False]
+    assert all(v["pixel_diff"] is None for v in verdicts)
+
+
+def test_verdicts_are_cached_unless_the_render_may_change(tmp_path, outcomes):
+    sandbox = ScriptedSandbox(str(tmp_path / "media"), outcomes)
+    cache = VerdictCache(str(tmp_path / "verdicts.sqlite"))
+    pairs = [("base", "moved"), ("base", "broken"), ("base", "slow"), ("broken", "moved")]
+
+    first = verify(PairVerifier(sandbox, cache=cache), pairs)
+    sandbox.rendered.clear()
+    verifier = PairVerifier(sandbox, cache=cache)
+    second = verify(verifier, pairs)
+
+    assert second == first
+    # Budget kills and failing chosen programs are verified again
+    assert sorted(sandbox.rendered) == ["base", "broken", "moved", "slow"]
+    assert verifier.stats()["cached_verdicts"] == 2
+
+    # Different thresholds are different verdicts
+    sandbox.rendered.clear()
+    verify(PairVerifier(sandbox, cache=cache, min_pixel_diff=0.5), pairs[:1])
+    assert sorted(sandbox.rendered) == ["base", "moved"]
+
+
+def test_filter_dataset_keeps_visible_pairs(tmp_path, outcomes):
+    datasets = pytest.importorskip("datasets")
+    dataset = datasets.Dataset.from_dict({
+        "chosen": ["base", "base", "base"],
+        "rejected": ["moved", "invisible", "broken"],
+        "prompt": ["p0", "p1", "p2"]
+    })
+    verifier = PairVerifier(ScriptedSandbox(str(tmp_path / "media"), outcomes))
+    assert verifier.filter_dataset(dataset)["prompt"] == ["p0"]
+
+
+def test_scene_graph_difference_ignores_order():
+    chosen = [mobject(0.0), mobject(2.0, type="Square")]
+    assert scene_graph_difference(chosen, chosen[::-1]) == {"unmatched": 0, "max_displacement": 0.0, "max_resize": 0.0}
+    assert scene_graph_difference(chosen, [mobject(0.0), mobject(2.0, type="Square", width=3.0)])["max_resize"] == 1.0
+    assert scene_graph_difference(chosen, [mobject(0.0, color="#0000FF"), chosen[1]])["unmatched"] == 2
+
+
+def test_image_difference(tmp_path):
+    base = write_frame(tmp_path, "a")
+    assert image_difference(base, write_frame(tmp_path, "b")) == 0.0
+    assert image_difference(base, write_frame(tmp_path, "c", pixel=(5, 5, 5)), tolerance=8) == 0.0
+    assert image_difference(base, write_frame(tmp_path, "d", pixel=(5, 5, 5)), tolerance=2) == 1 / 64
+    assert image_difference(base, write_frame(tmp_path, "e", size=(4, 4))) == 1.0
+    assert image_difference(base, str(tmp_path / "missing.png")) is None
@@ -0,0 +1,92 @@
+import os
+import subprocess
+
+import pytest
+
+# Render jobs run the manim CLI in the forked child
+pytest.importorskip("manim")
+
+from mvld.sandbox.budget import RenderBudget
+from mvld.sandbox.pool import RenderWorkerPool
+
+SCENE = """import os
+from manim import *
+
+with open({log!r}, "a") as f:
+    f.write(f"{{os.getpid()}} {{os.getppid()}}\\n")
+{body}
+
+class Probe(Scene):
+    def construct(self):
+        pass
+"""
+
+
+def write_scene(tmp_path, name, body=""):
+    path = tmp_path / f"{name}.py"
+    path.write_text(SCENE.format(log=str(tmp_path / "jobs.log"), body=body))
+    return path
+
+
+def render(pool, tmp_path, script, budget=None):
+    args = [str(script), "Probe", "-v", "ERROR", "--dry_run", "--media_dir", str(tmp_path / "media")]
+    return pool.run(args, budget=budget)
+
+
+def logged_jobs(tmp_path):
+    return [tuple(map(int, line.split())) for line in (tmp_path / "jobs.log").read_text().splitlines()]
+
+
+def test_jobs_fork_from_one_warm_server(tmp_path):
+    pool = RenderWorkerPool(size=1)
+    try:
+        script = write_scene(tmp_path, "ok")
+        results = [render(pool, tmp_path, script) for _ in range(3)]
+    finally:
+        pool.shutdown()
+
+    assert [r.returncode for r in results] == [0, 0, 0]
+    jobs = logged_jobs(tmp_path)
+    # A fresh child per job, all forked from the same (already warm) server
+    assert len({pid for pid, _ in jobs}) == 3
+    assert len({ppid for _, ppid in jobs}) == 1
+    assert jobs[0][1] != os.getpid()
+
+
+def test_worker_is_recycled_after_a_crash(tmp_path):
+    pool = RenderWorkerPool(size=1)
+    try:
+        crash = write_scene(tmp_path, "crash", "os.kill(os.getpid(), 11)")
+        exit_code = write_scene(tmp_path, "exit", "os._exit(3)")
+        ok = write_scene(tmp_path, "ok")
+
+        crashed = render(pool, tmp_path, crash)
+        exited = render(pool, tmp_path, exit_code)
+        recovered = render(pool, tmp_path, ok)
+    finally:
+        pool.shutdown()
+
+    assert crashed.returncode == -11
+    assert "terminated by signal 11" in crashed.stderr
+    assert exited.returncode == 3
+    assert recovered.returncode == 0
+    # The job after the crash still came from the warm server
+    assert len({ppid for _, ppid in logged_jobs(tmp_path)}) == 1
+
+
+def test_timed_out_job_is_killed_and_the_slot_reused(tmp_path):
+    pool = RenderWorkerPool(size=1)
+    try:
+        hang = write_scene(tmp_path, "hang", "import time\ntime.sleep(60)")
+        with pytest.raises(subprocess.TimeoutExpired):
+            render(pool, tmp_path, hang, budget=RenderBudget(timeout_s=2))
+        with pool.slot() as slot:
+            assert slot == 0
+        assert render(pool, tmp_path, write_scene(tmp_path, "ok")).returncode == 0
+    finally:
+        pool.shutdown()
+
+
+def test_pool_needs_a_worker():
+    with pytest.raises(ValueError):
+        RenderWorkerPool(size=0)
@@ -0,0 +1,50 @@
+import json
+
+from mvld.data.pretraining import LayoutPretrainingScript
+from mvld.data.shards import load_manifest, load_shards
+
+
+def write_svgs(root, names):
+    for name in names:
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f'<svg xmlns="http://www.w3.org/2000/svg"><circle cx="{len(name)}" cy="1" r="2"/></svg>')
+
+
+def test_resume_reads_sources_from_the_manifest(tmp_path):
+    src, out = tmp_path / "svg", tmp_path / "shards"
+    write_svgs(src, ["a.svg", "b.svg", "c.svg", "nested/d.svg"])
+    (src / "broken.svg").write_text("<svg><circle")
+
+    script = LayoutPretrainingScript()
+    manifest = script.process_directory_sharded(str(src), str(out), "svg", workers=1, shard_size=2)
+    assert manifest["num_rows"] == 4
+    assert manifest["num_errors"] == 1
+    sources = [name for entry in manifest["shards"].values() for name in entry["sources"]]
+    assert sorted(sources) == ["a.svg", "b.svg", "broken.svg", "c.svg", "nested/d.svg"]
+
+    # Resume must not open completed shards: garble them and add a new file
+    for entry in manifest["shards"].values():
+        (out / entry["path"]).write_bytes(b"not a shard")
+    write_svgs(src, ["e.svg"])
+    again = script.process_directory_sharded(str(src), str(out), "svg", workers=1, shard_size=2)
+
+    new_shards = set(again["shards"]) - set(manifest["shards"])
+    assert [again["shards"][i]["sources"] for i in new_shards] == [["e.svg"]]
+    assert again["num_rows"] == 5
+
+
+def test_sharded_rows_match_in_memory_processing(tmp_path):
+    src = tmp_path / "svg"
+    write_svgs(src, ["x.svg", "y.svg", "deep/z.svg"])
+    script = LayoutPretrainingScript()
+
+    # process_directory stays non-recursive unless asked
+    flat = script.process_directory(str(src), "svg")
+    assert sorted(m["source"] for m in flat["metadata"]) == ["x.svg", "y.svg"]
+
+    in_memory = script.process_directory(str(src), "svg", recursive=True)
+    sharded = script.process_directory(str(src), "svg", output_dir=str(tmp_path / "out"), workers=1, recursive=True)
+    assert sorted(in_memory["scene_graph"]) == sorted(sharded["scene_graph"])
+    assert json.loads(in_memory["scene_graph"][0])
+    assert load_manifest(tmp_path / "out")["num_rows"] == len(load_shards(tmp_path / "out")) == 3
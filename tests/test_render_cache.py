@@ -0,0 +1,36 @@
+from mvld.sandbox.cache import RenderCache
+
+
+def render_result(tmp_path, name, content):
+    image = tmp_path / "media" / "images" / name / "Scene.png"
+    image.parent.mkdir(parents=True, exist_ok=True)
+    image.write_bytes(content)
+    scene_graph = [{"type": "Circle", "position": [1.0, 2.0, 0.0], "color": "#FF0000", "width": 2.0, "height": 2.0, "z_index": 0, "radius": 1.0}]
+    return {"success": True, "status": "ok", "image_path": str(image), "scene_graph": scene_graph}
+
+
+def test_hit_links_image_into_caller_dir(tmp_path):
+    cache = RenderCache(str(tmp_path / "cache"))
+    key = RenderCache.make_key("code", None, {})
+    cache.put(key, render_result(tmp_path, "first", b"png-bytes"))
+
+    image_dir = tmp_path / "run" / "images" / "sample_0"
+    hit = cache.get(key, image_dir=image_dir)
+    assert hit["image_path"] == str(image_dir / "Scene.png")
+    assert (image_dir / "Scene.png").read_bytes() == b"png-bytes"
+    assert hit["scene_graph"][0]["position"] == [1.0, 2.0, 0.0]
+
+
+def test_eviction_keeps_images_handed_out(tmp_path):
+    cache = RenderCache(str(tmp_path / "cache"), max_entries=1)
+    first = RenderCache.make_key("first", None, {})
+    cache.put(first, render_result(tmp_path, "first", b"first"))
+    hit = cache.get(first, image_dir=tmp_path / "run" / "images" / "a")
+
+    cache.put(RenderCache.make_key("second", None, {}), render_result(tmp_path, "second", b"second"))
+
+    assert cache.get(first) is None
+    with open(hit["image_path"], "rb") as f:
+        assert f.read() == b"first"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
@@ -0,0 +1,105 @@
+import json
+
+import numpy as np
+import pytest
+
+from mvld.pipeline.miner import NegativeMiner
+from mvld.pipeline.results_store import ResultsStore, parse_filter
+from mvld.pipeline.rft_integration import RFTIntegrator
+
+
+def entries(run):
+    return [
+        {"id": i, "instruction": f"{run} {i}", "code": "pass", "render_success": i % 4 != 0,
+         "render_status": "ok" if i % 4 else "error", "image_path": None,
+         "score": None if i % 4 == 0 else float(i), "spatial_score": None, "full_eval": {"clip_similarity": float(i)}}
+        for i in range(12)
+    ]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultsStore(str(tmp_path / "store"))
+    store.write_run("a", entries("a"))
+    store.write_run("b", entries("b"), batch_rows=5)
+    return store
+
+
+@pytest.mark.parametrize("where, expected", [
+    ("render_success and score <= 5", {1, 2, 3, 5}),
+    ("score > 2 and score < 7 and not render_success == False", {3, 5, 6}),
+    ("2 < score <= 6", {3, 5, 6}),
+    ("id in [0, 1, 2]", {0, 1, 2}),
+    ("id not in [0, 1, 2] and id < 6", {3, 4, 5}),
+    ("score is None", {0, 4, 8}),
+    ("score is not None and (id == 1 or id == 11)", {1, 11}),
+    ("render_status == 'error'", {0, 4, 8}),
+    ("score >= -1.5 and id < 3", {1, 2}),
+])
+def test_filters_match_python(store, where, expected):
+    rows = store.query(where, columns=["id"], runs=["a"]).column("id").to_pylist()
+    assert set(rows) == expected
+
+
+def test_runs_and_columns(store):
+    assert store.runs() == ["a", "b"]
+    assert store.count() == 24
+    assert store.count("run == 'b' and render_success") == 9
+    table = store.query("id == 3", columns=["instruction", "score"])
+    assert sorted(table.column("instruction").to_pylist()) == ["a 3", "b 3"]
+    assert table.column_names == ["instruction", "score"]
+
+
+def test_iter_query_decodes_full_eval(store):
+    rows = list(store.iter_query("id == 5", runs=["a"]))
+    assert rows[0]["full_eval"] == {"clip_similarity": 5.0}
+    assert rows[0]["run"] == "a"
+
+
+def test_write_run_replaces_partition(store):
+    store.write_run("a", entries("a")[:2])
+    assert store.count(runs=["a"]) == 2
+    assert store.count(runs=["b"]) == 12
+
+
+@pytest.mark.parametrize("where", ["score <=", "len(code) > 3", "score + 1 > 2", "id in 3", "id @ 2"])
+def test_invalid_filters(where):
+    with pytest.raises(ValueError):
+        parse_filter(where)
+
+
+def test_params_stand_in_for_literals(store):
+    params = {"low": np.float32(2.0), "high": np.int64(6), "ids": np.array([3, 5, 9]), "status": "ok"}
+    where = "low < score <= high and id in ids and render_status == status"
+    assert store.query(where, columns=["id"], runs=["a"], params=params).column("id").to_pylist() == [3, 5]
+    assert store.count("score <= high", params=params) == 2 * 5
+    # Without params the name is a column
+    with pytest.raises(Exception):
+        store.count("score <= high")
+
+
+def test_miner_accepts_numpy_thresholds(store, tmp_path):
+    miner = NegativeMiner(store_dir=str(store.root), runs=["a"])
+    mined = miner.mine_hard_negatives(max_score=np.float64(3.0), output_path=str(tmp_path / "hard.json"))
+    assert sorted(e["id"] for e in mined) == [1, 2, 3]
+
+
+@pytest.mark.parametrize("suffix", [".jsonl", ".json"])
+def test_results_path_is_still_accepted(tmp_path, suffix):
+    results_path = tmp_path / "rft" / f"rft_results{suffix}"
+    results_path.parent.mkdir()
+    if suffix == ".json":
+        results_path.write_text(json.dumps(entries("x")))
+    else:
+        results_path.write_text("".join(json.dumps(e) + "\n" for e in entries("x")))
+    store_dir = str(tmp_path / "store")
+    ResultsStore(store_dir).write_run("other", entries("other"))
+
+    mined = NegativeMiner(str(results_path), store_dir=store_dir).mine_hard_negatives(max_score=3.0, output_path=str(tmp_path / "hard.json"))
+    assert sorted(e["id"] for e in mined) == [1, 2, 3]
+    assert {e["run"] for e in mined} == {"rft"}
+
+    dataset = RFTIntegrator(results_path=str(results_path), store_dir=store_dir).integrate_results(threshold=9.0, output_path=str(tmp_path / "sft"))
+    assert sorted(dataset["score"]) == [9.0, 10.0, 11.0]
+
+    assert NegativeMiner(str(tmp_path / "missing.json"), store_dir=store_dir).mine_hard_negatives(output_path=str(tmp_path / "none.json")) == []
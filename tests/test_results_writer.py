@@ -0,0 +1,42 @@
+import json
+
+from mvld.pipeline.results import ResultsWriter, iter_results, load_results
+
+
+def test_resume_truncates_torn_tail(tmp_path):
+    path = tmp_path / "rft_results.jsonl"
+    with ResultsWriter(path) as writer:
+        for i in range(3):
+            writer.write({"id": i, "score": float(i)})
+    # A crash mid-write leaves half a line behind
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"id": 3, "score": 3.0})[:9])
+
+    assert [e["id"] for e in iter_results(path)] == [0, 1, 2]
+
+    with ResultsWriter(path, resume=True) as writer:
+        assert writer.completed == {0, 1, 2}
+        writer.write({"id": 3, "score": 3.0})
+        assert len(writer) == 4
+
+    assert [e["id"] for e in load_results(path)] == [0, 1, 2, 3]
+    assert path.read_text().count("\n") == 4
+
+
+def test_resume_stops_at_corrupt_line(tmp_path):
+    path = tmp_path / "rft_results.jsonl"
+    path.write_text('{"id": 0}\n{"id": 1\n{"id": 2}\n')
+
+    with ResultsWriter(path, resume=True) as writer:
+        assert writer.completed == {0}
+    assert path.read_text() == '{"id": 0}\n'
+
+
+def test_without_resume_starts_over(tmp_path):
+    path = tmp_path / "rft_results.jsonl"
+    path.write_text('{"id": 0}\n')
+
+    with ResultsWriter(path) as writer:
+        assert writer.completed == set()
+        writer.write({"id": 5})
+    assert load_results(path) == [{"id": 5}]
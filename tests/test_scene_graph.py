@@ -0,0 +1,50 @@
+import json
+
+import numpy as np
+import pytest
+
+from mvld.sandbox.scene_graph import HEADER, SceneGraphArrays, load_scene_graph
+
+
+def scene_graph():
+    return [
+        {"type": "Circle", "position": [1.5, -2.0, 0.0], "color": "#FF0000", "width": 2.0, "height": 2.0, "z_index": 0, "radius": 1.0},
+        {"type": "Square", "position": [0.25, 0.5, 0.0], "color": "#0000FF", "width": 1.0, "height": 1.0, "z_index": 3},
+        {"type": "Circle", "position": [0.0, 0.0, 1.0], "color": "#FF0000", "width": 0.5, "height": 0.5, "z_index": 1, "radius": 0.25, "label": "dot"},
+    ]
+
+
+def test_sgb_round_trip(tmp_path):
+    path = tmp_path / "scene_graph.sgb"
+    SceneGraphArrays.from_json(scene_graph()).save(path)
+
+    assert load_scene_graph(path) == scene_graph()
+    arrays = SceneGraphArrays.load(path)
+    assert arrays.types == ["Circle", "Square"]
+    assert arrays.z_index.dtype == np.int32
+    assert np.isnan(arrays.radius[1])
+
+
+def test_float_z_index_and_float32_rounding(tmp_path):
+    graph = [{"type": "Dot", "position": [0.1, 0.2, 0.3], "color": "WHITE", "width": 0.1, "height": 0.1, "z_index": 0.5}]
+    once = SceneGraphArrays.from_bytes(SceneGraphArrays.from_json(graph).to_bytes()).to_json()
+    twice = SceneGraphArrays.from_bytes(SceneGraphArrays.from_json(once).to_bytes()).to_json()
+
+    assert once[0]["z_index"] == 0.5
+    assert once[0]["position"] == pytest.approx([0.1, 0.2, 0.3], abs=1e-7)
+    assert twice == once
+
+
+def test_extras_longer_than_64k_round_trip():
+    graph = scene_graph()
+    graph[0]["label"] = "x" * 70_000
+    assert SceneGraphArrays.from_bytes(SceneGraphArrays.from_json(graph).to_bytes()).to_json() == graph
+
+
+def test_rejects_other_files(tmp_path):
+    with pytest.raises(ValueError):
+        SceneGraphArrays.from_bytes(b"JUNK" + bytes(HEADER.size))
+
+    path = tmp_path / "scene_graph.json"
+    path.write_text(json.dumps(scene_graph()))
+    assert load_scene_graph(path) == scene_graph()
@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+# evaluator.py imports the CLIP stack at module level
+pytest.importorskip("torch")
+pytest.importorskip("clip")
+pytest.importorskip("PIL")
+
+from mvld.eval.evaluator import SpatialEvaluator
+from mvld.eval.scene_batch import PackedSceneGraphs
+from mvld.sandbox.scene_graph import SceneGraphArrays
+
+TYPES = ["Circle", "Square", "circle", "Triangle", "Dot"]
+
+
+def random_scene(rng):
+    if rng.random() < 0.1:
+        return rng.choice([None, []])
+    return [
+        {
+            "type": rng.choice(TYPES),
+            # Grid points plus small offsets, so positions land on and around tolerance edges
+            "position": [rng.randint(-3, 3) + rng.choice([0.0, 0.25, 0.5, -0.5, rng.uniform(-1, 1)]),
+                         rng.randint(-2, 2) + rng.choice([0.0, 0.5, rng.uniform(-1, 1)]), 0.0],
+            "color": rng.choice(["RED", "BLUE"]),
+            "width": 1.0,
+            "height": 1.0,
+            "z_index": 0
+        }
+        for _ in range(rng.randint(1, 6))
+    ]
+
+
+def random_constraints(rng):
+    constraints = {}
+    if rng.random() < 0.5:
+        constraints["count"] = rng.randint(0, 6)
+    if rng.random() < 0.5:
+        constraints["types"] = {rng.choice(TYPES + ["SQUARE", "Star"]): rng.randint(0, 3) for _ in range(rng.randint(1, 3))}
+    if rng.random() < 0.7:
+        constraints["positions"] = []
+        for _ in range(rng.randint(1, 3)):
+            position = {"type": rng.choice(TYPES + ["Star"]), "position": [rng.randint(-3, 3), rng.randint(-2, 2)]}
+            if rng.random() < 0.5:
+                position["tolerance"] = rng.choice([0.0, 0.25, 0.5, 1.0])
+            constraints["positions"].append(position)
+    return constraints
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_evaluate_batch_matches_evaluate(seed):
+    rng = random.Random(seed)
+    evaluator = SpatialEvaluator()
+    scenes = [random_scene(rng) for _ in range(rng.randint(1, 12))]
+    per_scene = [random_constraints(rng) for _ in scenes]
+    shared = random_constraints(rng)
+
+    assert evaluator.evaluate_batch(scenes, per_scene) == [evaluator.evaluate(g, c) for g, c in zip(scenes, per_scene)]
+    assert evaluator.evaluate_batch(scenes, shared) == [evaluator.evaluate(g, shared) for g in scenes]
+    assert evaluator.evaluate_batch(PackedSceneGraphs(scenes), per_scene) == evaluator.evaluate_batch(scenes, per_scene)
+
+    # Array-backed graphs match evaluating their (float32-rounded) JSON
+    arrays = [SceneGraphArrays.from_json(g) if g is not None else None for g in scenes]
+    expected = [evaluator.evaluate(a.to_json() if a is not None else None, c) for a, c in zip(arrays, per_scene)]
+    assert evaluator.evaluate_batch(arrays, per_scene) == expected
+
+
+def test_evaluate_batch_needs_one_constraint_per_scene():
+    with pytest.raises(ValueError):
+        SpatialEvaluator().evaluate_batch([[], []], [{}])
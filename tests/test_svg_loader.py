@@ -0,0 +1,48 @@
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from mvld.data.loaders import PATH_BATCH, SVGLoader
+
+SVG = """<svg xmlns="http://www.w3.org/2000/svg">
+  <circle cx="1" cy="2" r="3"/>
+  <g>
+    <path d="M0 0 Q 5 10 10 0"/>
+    <rect x="1" y="1" width="2" height="4"/>
+    <g><circle cx="5" cy="5" r="1"/></g>
+  </g>
+  <defs><circle cx="9" cy="9" r="9"/></defs>
+  <path d="M 5 5"/>
+</svg>"""
+
+
+def test_streaming_matches_tree_parse(tmp_path):
+    path = tmp_path / "scene.svg"
+    path.write_text(SVG)
+    loader = SVGLoader()
+
+    streamed = list(loader.iter_file(path))
+    assert streamed == loader.parse_string(SVG) == list(loader.iter_string(SVG))
+    assert [p["type"] for p in streamed] == ["circle", "path", "rect", "circle", "path"]
+    assert streamed[1]["bbox"] == [0.0, 0.0, 10.0, 5.0]
+    assert "bbox" not in streamed[4]
+
+
+def test_mixed_primitives_keep_document_order():
+    body = "".join(f'<circle cx="{i}" r="1"/><path d="M{i} 0 l 1 1"/><rect width="{i}" height="1"/>' for i in range(PATH_BATCH))
+    svg = f'<svg xmlns="http://www.w3.org/2000/svg"><g>{body}</g></svg>'
+    loader = SVGLoader()
+    assert list(loader.iter_string(svg)) == loader.parse_string(svg)
+
+
+@pytest.mark.parametrize("element", ['<circle cx="1" r="1"/>', '<path d="M0 0 L 1 1"/>', '<rect width="1" height="1"/>'])
+def test_primitives_arrive_before_the_document_ends(element):
+    # The document is malformed far past the first batch: anything yielded
+    # before the error was streamed, not collected
+    svg = '<svg xmlns="http://www.w3.org/2000/svg">' + element * (4 * PATH_BATCH) + "<broken"
+    stream = SVGLoader().iter_string(svg)
+    first = next(stream)
+    assert first["type"] in ("circle", "path", "rect")
+    with pytest.raises(ET.ParseError):
+        for _ in stream:
+            pass
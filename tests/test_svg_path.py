@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from mvld.data.svg_path import arc_extrema, bounding_boxes, parse_paths, path_geometry
+
+
+def bbox(d):
+    geometry = path_geometry([d])[0]
+    return None if geometry is None else geometry["bbox"]
+
+
+@pytest.mark.parametrize("d, expected", [
+    ("M1 2 L 5 -3", [1, -3, 5, 2]),
+    ("m1 2 l4 -5 h2 v3 z", [1, -3, 7, 2]),
+    ("M10 10 l5 0 z l0 5", [10, 10, 15, 15]),
+    ("M0 0 10 10 20 0", [0, 0, 20, 10]),
+    ("m0 0 10 10 10 -10", [0, 0, 20, 10]),
+    ("M.5.5L1e1-2", [0.5, -2, 10, 0.5]),
+])
+def test_lines_and_relative_commands(d, expected):
+    assert bbox(d) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("d, expected", [
+    # Curve extrema lie between the endpoints, not at the control points
+    ("M0 0 C 0 10 10 10 10 0", [0, 0, 10, 7.5]),
+    ("M0 0 Q 5 10 10 0", [0, 0, 10, 5]),
+    # S/T reflect the previous control point about the current point
+    ("M0 0 C 0 10 10 10 10 0 S 20 -10 20 0", [0, -7.5, 20, 7.5]),
+    ("M0 0 c 0 10 10 10 10 0 s 10 -10 10 0", [0, -7.5, 20, 7.5]),
+    ("M0 0 Q 5 10 10 0 T 20 0", [0, -5, 20, 5]),
+    ("m0 0 q 5 10 10 0 t 10 0", [0, -5, 20, 5]),
+    # Without a previous curve of their kind the control point is the current point
+    ("M0 0 T 10 10", [0, 0, 10, 10]),
+    ("M0 0 S 10 10 20 0", [0, 0, 20, 40 / 9]),
+])
+def test_curve_extrema(d, expected):
+    assert bbox(d) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("d, expected", [
+    ("M0 0 A 5 5 0 0 1 10 0", [0, -5, 10, 0]),
+    ("M0 0 A 5 5 0 0 0 10 0", [0, 0, 10, 5]),
+    ("M0 0 a 5 5 0 0 0 10 0", [0, 0, 10, 5]),
+    # Radii too small for the endpoints are scaled up
+    ("M0 0 A 1 1 0 0 1 10 0", [0, -5, 10, 0]),
+    # Rotated ellipse: the 10-unit radius runs along y
+    ("M0 0 A 10 5 90 0 1 0 20", [0, 0, 5, 20]),
+    # Large arc of a circle through (0, 0) and (10, 0) with radius 10
+    ("M0 0 A 10 10 0 1 1 10 0", [5 - 10, -(10 + np.sqrt(75)), 5 + 10, 0]),
+    # A zero radius makes the arc a straight line
+    ("M0 0 A 0 5 0 0 1 10 0", [0, 0, 10, 0]),
+])
+def test_arc_extrema(d, expected):
+    assert bbox(d) == pytest.approx(expected, abs=1e-9)
+
+
+@pytest.mark.parametrize("d", ["", None, "M 5 5", "m 1 1 m 2 2"])
+def test_paths_that_draw_nothing(d):
+    assert bbox(d) is None
+
+
+def test_batch_matches_single_paths():
+    paths = [
+        "M0 0 C 0 10 10 10 10 0 S 20 -10 20 0", None, "m1 2 l4 -5 h2 v3 z",
+        "M0 0 A 10 5 30 1 0 7 3", "M 5 5", "M0 0 Q 5 10 10 0 T 20 0 t 5 5",
+    ]
+    segments = parse_paths(paths)
+    boxes = bounding_boxes(segments)
+    assert boxes.shape == (len(paths), 4)
+    for d, box in zip(paths, boxes):
+        single = bbox(d)
+        if single is None:
+            assert np.isnan(box).all()
+        else:
+            assert box.tolist() == pytest.approx(single)
+    assert set(segments.cubic_owner.tolist()) == {0}
+    assert set(segments.arc_owner.tolist()) == {3}
+
+
+def test_geometry_keys():
+    geometry = path_geometry(["M 0 0 L 4 2"])[0]
+    assert geometry == {"bbox": [0.0, 0.0, 4.0, 2.0], "center": [2.0, 1.0], "width": 4.0, "height": 2.0}
+
+
+def test_arc_extrema_shape():
+    arcs = parse_paths(["M0 0 A 5 5 0 0 1 10 0", "M0 0 A 5 5 0 0 0 10 0"]).arcs
+    assert arc_extrema(arcs).shape == (len(arcs), 4, 2)
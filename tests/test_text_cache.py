@@ -0,0 +1,60 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from mvld.eval.cache import TextEmbeddingCache
+
+MODEL = "ViT-B/32"
+
+
+def features(value):
+    return torch.tensor([value, value + 1.0, value + 2.0])
+
+
+def test_least_recently_used_prompt_is_evicted():
+    cache = TextEmbeddingCache(max_entries=2)
+    cache.put(MODEL, "a", features(0.0))
+    cache.put(MODEL, "b", features(1.0))
+    assert cache.get(MODEL, "a") is not None  # "b" is now the oldest
+
+    cache.put(MODEL, "c", features(2.0))
+    assert cache.get(MODEL, "b") is None
+    assert torch.equal(cache.get(MODEL, "a"), features(0.0))
+    assert torch.equal(cache.get(MODEL, "c"), features(2.0))
+    assert cache.stats() == {"hits": 3, "disk_hits": 0, "misses": 1, "hit_rate": 0.75, "size": 2}
+
+
+def test_entries_are_keyed_by_model_and_detached():
+    cache = TextEmbeddingCache()
+    original = features(0.0)
+    cache.put(MODEL, "a", original)
+    original += 10.0
+
+    assert torch.equal(cache.get(MODEL, "a"), features(0.0))
+    assert cache.get("RN50", "a") is None
+
+
+def test_disk_tier_survives_between_runs(tmp_path):
+    first = TextEmbeddingCache(max_entries=1, cache_dir=str(tmp_path))
+    first.put(MODEL, "a", features(0.0))
+    first.put(MODEL, "b", features(1.0))
+
+    # Evicted from memory, still on disk
+    assert torch.equal(first.get(MODEL, "a"), features(0.0))
+    assert first.stats()["disk_hits"] == 1
+
+    second = TextEmbeddingCache(cache_dir=str(tmp_path))
+    assert torch.equal(second.get(MODEL, "b"), features(1.0))
+    assert torch.equal(second.get(MODEL, "b"), features(1.0))
+    assert second.get("RN50", "b") is None
+    assert (second.stats()["hits"], second.stats()["disk_hits"], second.stats()["misses"]) == (2, 1, 1)
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_unreadable_disk_entry_is_a_miss(tmp_path):
+    cache = TextEmbeddingCache(cache_dir=str(tmp_path))
+    cache.put(MODEL, "a", features(0.0))
+    for path in tmp_path.glob("*.pt"):
+        path.write_bytes(b"not a tensor")
+
+    assert TextEmbeddingCache(cache_dir=str(tmp_path)).get(MODEL, "a") is None
@@ -0,0 +1,85 @@
+import threading
+import types
+
+import pytest
+
+from mvld.eval import verdict_cache
+from mvld.eval.verdict_cache import VerdictCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = types.SimpleNamespace(t=1000.0)
+    monkeypatch.setattr(verdict_cache, "time", types.SimpleNamespace(time=lambda: now.t))
+    return now
+
+
+def test_verdicts_persist_between_instances(tmp_path):
+    path = str(tmp_path / "verdicts.sqlite")
+    key = VerdictCache.make_key("vlm_judge", "abc", "A red circle")
+    VerdictCache(path).put(key, {"score": 0.5, "feedback": "ok"})
+
+    cache = VerdictCache(path)
+    assert cache.get(key) == {"score": 0.5, "feedback": "ok"}
+    assert cache.get(VerdictCache.make_key("vlm_judge", "abc", "A blue circle")) is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "expired": 0, "hit_rate": 0.5, "entries": 1}
+
+
+def test_make_key():
+    assert VerdictCache.make_key({"a": 1, "b": 2}, "x") == VerdictCache.make_key({"b": 2, "a": 1}, "x")
+    assert VerdictCache.make_key("a", "b") != VerdictCache.make_key("ab")
+    assert VerdictCache.make_key("a", "b") != VerdictCache.make_key("b", "a")
+
+
+def test_expired_verdicts_are_misses(tmp_path, clock):
+    cache = VerdictCache(str(tmp_path / "v.sqlite"), ttl_s=60)
+    cache.put("old", {"score": 0.1})
+    clock.t += 30
+    cache.put("new", {"score": 0.2})
+
+    clock.t += 45
+    assert cache.get("old") is None
+    assert cache.get("new") == {"score": 0.2}
+    assert cache.stats()["expired"] == 1
+    assert cache.stats()["entries"] == 1
+
+    clock.t += 60
+    assert cache.purge_expired() == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_verdicts_are_evicted(tmp_path, clock):
+    cache = VerdictCache(str(tmp_path / "v.sqlite"), ttl_s=None, max_entries=2)
+    for key in ("a", "b"):
+        cache.put(key, {"key": key})
+        clock.t += 1
+    cache.get("a")
+    clock.t += 1
+
+    cache.put("c", {"key": "c"})
+    cache.put("c", {"key": "c", "again": True})  # replacing does not count twice
+    assert cache.get("b") is None
+    assert cache.get("a") == {"key": "a"}
+    assert cache.get("c") == {"key": "c", "again": True}
+    assert cache.stats()["entries"] == 2
+
+    cache.clear()
+    assert cache.stats()["entries"] == 0 and cache.get("a") is None
+
+
+def test_cache_is_shared_between_threads(tmp_path):
+    cache = VerdictCache(str(tmp_path / "v.sqlite"))
+
+    def worker(n):
+        for i in range(25):
+            cache.put(f"{n}-{i}", {"n": n, "i": i})
+            assert cache.get(f"{n}-{i}") == {"n": n, "i": i}
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert cache.stats()["entries"] == 200
+    assert cache.stats()["hits"] == 200
@@ -0,0 +1,85 @@
+import asyncio
+
+from mvld.eval.mock_vlm_server import MockVLMServer
+from mvld.eval.verdict_cache import VerdictCache
+from mvld.eval.vlm_judge import VLMJudge
+
+
+def write_images(tmp_path, n):
+    paths = []
+    for i in range(n):
+        path = tmp_path / f"render_{i}.png"
+        path.write_bytes(f"image {i}".encode())
+        paths.append(str(path))
+    return paths
+
+
+def judge_with_server(server, paths, prompts, **kwargs):
+    async def run():
+        async with server:
+            async with VLMJudge(api_key="test", api_url=server.url, backoff_s=0.001, **kwargs) as judge:
+                return await judge.judge_many_async(paths, prompts)
+    return asyncio.run(run())
+
+
+def test_concurrency_is_capped(tmp_path):
+    server = MockVLMServer(port=0, latency_s=0.05, jitter_s=0.0)
+    paths = write_images(tmp_path, 12)
+    verdicts = judge_with_server(server, paths, ["A red circle"] * 12, max_concurrency=3)
+
+    assert [v.get("error") for v in verdicts] == [None] * 12
+    assert server.requests == 12
+    assert server.max_in_flight == 3
+
+
+def test_server_errors_are_retried(tmp_path):
+    server = MockVLMServer(port=0, latency_s=0.0, jitter_s=0.0, error_rate=0.4, seed=0)
+    paths = write_images(tmp_path, 10)
+    verdicts = judge_with_server(server, paths, ["A blue square"] * 10, max_retries=10)
+
+    assert server.errors > 0
+    assert server.requests == 10 + server.errors
+    assert all("error" not in v and 0.0 <= v["score"] <= 1.0 for v in verdicts)
+    assert sum(v["attempts"] - 1 for v in verdicts) == server.errors
+
+
+def test_second_pass_hits_the_verdict_cache(tmp_path):
+    paths = write_images(tmp_path, 5)
+    prompts = [f"Prompt {i}" for i in range(5)]
+    cache = VerdictCache(str(tmp_path / "verdicts.sqlite"))
+
+    server = MockVLMServer(port=0, latency_s=0.0, jitter_s=0.0)
+    first = judge_with_server(server, paths, prompts, cache=cache)
+    second = judge_with_server(server, paths, prompts, cache=cache)
+
+    assert server.requests == 5
+    assert not any(v["cached"] for v in first)
+    assert all(v["cached"] for v in second)
+    assert [v["score"] for v in second] == [v["score"] for v in first]
+    assert cache.stats()["hits"] == 5
+
+
+def test_missing_images_do_not_abort_the_batch(tmp_path):
+    server = MockVLMServer(port=0, latency_s=0.0, jitter_s=0.0)
+    paths = write_images(tmp_path, 1) + [None, str(tmp_path / "missing.png")]
+    verdicts = judge_with_server(server, paths, ["A triangle"] * 3)
+
+    assert "error" not in verdicts[0]
+    assert all(v["error"] and v["score"] == 0.0 for v in verdicts[1:])
+    assert server.requests == 1
+
+    # The blocking API and the mock key behave the same
+    with VLMJudge() as judge:
+        assert judge.judge_many([None], ["A triangle"])[0]["error"]
+
+
+def test_cache_only_mode_never_calls_the_api(tmp_path):
+    paths = write_images(tmp_path, 2)
+    cache = VerdictCache(str(tmp_path / "verdicts.sqlite"))
+    judge_with_server(MockVLMServer(port=0, latency_s=0.0, jitter_s=0.0), paths[:1], ["A square"], cache=cache)
+
+    server = MockVLMServer(port=0, latency_s=0.0, jitter_s=0.0)
+    verdicts = judge_with_server(server, paths, ["A square"] * 2, cache=cache, cache_only=True)
+    assert server.requests == 0
+    assert verdicts[0]["cached"] and "error" not in verdicts[0]
+    assert verdicts[1]["error"] and not verdicts[1]["cached"]